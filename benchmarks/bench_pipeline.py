@@ -0,0 +1,155 @@
+"""Benchmark the scale/transform pipeline on synthetic PSCompPars shaped catalogues.
+
+Runs offline. Times load_from_csv, the steps convert_scale_clean_df calls (clean_planets,
+group_systems and the unknown radius drop of clean_df, compute_bounds, scale_clean_df)
+and save_to_csv per catalogue size, records
+tracemalloc peak memory of that same path, and writes the results as json so runs
+can be compared between commits:
+
+    poetry run python3 benchmarks/bench_pipeline.py --sizes 1000 100000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from exo_planet.data_func import load_from_csv, save_to_csv
+from exo_planet.scale_transform_data import (
+    _with_known_radius, clean_planets, compute_bounds, convert_scale_clean_df, group_systems, scale_clean_df
+)
+from exo_planet.star_color import teff_to_rgb
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# stages adding up to the total, the others are parts of these timed again on their own
+TOTAL_STAGES = [
+    "load_from_csv", "clean_planets", "group_systems", "drop_unknown_radius", "compute_bounds", "scale_clean_df",
+    "save_to_csv",
+]
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+def synthetic_catalogue(rows: int, seed: int = 0, planets_per_system: float = 1.4) -> pd.DataFrame:
+    """PSCompPars shaped catalogue: string and numeric columns, some missing values, multi planet systems."""
+    rng = np.random.default_rng(seed)
+    systems = max(1, int(rows / planets_per_system))
+    system = np.sort(rng.integers(0, systems, rows))
+
+    def per_system(values):
+        return values[system]
+
+    df = pd.DataFrame({
+        "pl_name": [f"SYN-{s} {chr(98 + i % 24)}" for i, s in enumerate(system)],
+        "hostname": [f"SYN-{s}" for s in system],
+        "pl_rade": rng.lognormal(1.0, 0.8, rows),
+        "st_teff": per_system(rng.normal(5500, 1200, systems).clip(2500, 40000)),
+        "st_rad": per_system(rng.lognormal(0.0, 0.7, systems)),
+        "st_mass": per_system(rng.lognormal(0.0, 0.4, systems)),
+        "ra": per_system(rng.uniform(0, 360, systems)),
+        "dec": per_system(np.rad2deg(np.arcsin(rng.uniform(-1, 1, systems)))),
+        "sy_dist": per_system(rng.lognormal(5.5, 1.2, systems)),
+    })
+    # the archive has gaps, mostly in the physical parameters
+    for col, fraction in (("pl_rade", 0.05), ("st_teff", 0.03), ("st_rad", 0.04), ("sy_dist", 0.01)):
+        df.loc[rng.random(rows) < fraction, col] = np.nan
+    return df
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_pipeline_stages(df: pd.DataFrame) -> dict:
+    """Time each step of convert_scale_clean_df separately, called the way it calls them.
+
+    teff_to_rgb is timed again on its own, it is the colour lookup inside scale_clean_df.
+    """
+    timings = {}
+    # clean_df split into its steps
+    df_planets, timings["clean_planets"] = timed(clean_planets, df)
+    systems, timings["group_systems"] = timed(group_systems, df_planets)
+    df_filtered, timings["drop_unknown_radius"] = timed(_with_known_radius, systems)
+    bounds, timings["compute_bounds"] = timed(compute_bounds, df_filtered)
+    df_scaled_cart, timings["scale_clean_df"] = timed(scale_clean_df, df_filtered, bounds)
+    _, timings["teff_to_rgb"] = timed(teff_to_rgb, df_filtered["st_teff"].to_numpy())
+    return timings, df_scaled_cart
+
+def bench_size(rows: int, workdir: str, repeat: int) -> dict:
+    input_csv = os.path.join(workdir, f"synthetic_{rows}.csv")
+    output_csv = os.path.join(workdir, f"synthetic_{rows}_out.csv")
+    synthetic_catalogue(rows).to_csv(input_csv, index=False)
+
+    runs = []
+    for _ in range(repeat):
+        timings = {}
+        df, timings["load_from_csv"] = timed(load_from_csv, input_csv)
+        stage_timings, df_out = run_pipeline_stages(df)
+        timings.update(stage_timings)
+        _, timings["save_to_csv"] = timed(save_to_csv, df_out, output_csv)
+        timings["total"] = sum(timings[name] for name in TOTAL_STAGES)
+        # the production path in one call, the stages above are the same work split up
+        _, timings["convert_scale_clean_df"] = timed(convert_scale_clean_df, df)
+        runs.append(timings)
+        rows_out = len(df_out)
+        del df, df_out
+
+    # peak memory in a separate run, tracemalloc slows allocations down too much to time under it
+    tracemalloc.start()
+    save_to_csv(convert_scale_clean_df(load_from_csv(input_csv)), output_csv)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # best of repeat per stage, the usual way to keep noise out of regressions
+    stages = {name: min(run[name] for run in runs) for name in runs[0]}
+    result = {
+        "rows": rows,
+        "rows_out": rows_out,
+        "input_bytes": os.path.getsize(input_csv),
+        "seconds": stages,
+        "rows_per_second": rows / stages["total"] if stages["total"] else None,
+        "peak_memory_bytes": peak,
+    }
+    os.remove(input_csv)
+    os.remove(output_csv)
+    return result
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the exoplanet scale/transform pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Catalogue sizes in rows (up to 10000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size, the fastest is reported")
+    parser.add_argument("--output", type=str, default="bench_output.json", help="JSON results filename")
+    parser.add_argument("--workdir", type=str, default=None, help="Directory for the synthetic csv files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        results = []
+        for rows in args.sizes:
+            result = bench_size(rows, workdir, args.repeat)
+            results.append(result)
+            print(f"{rows:>10} rows  total {result['seconds']['total']:.3f}s  peak {result['peak_memory_bytes'] / 2**20:.1f} MiB")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Benchmark results written to {args.output}")
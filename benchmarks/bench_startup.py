@@ -0,0 +1,85 @@
+"""Benchmark interpreter startup of the scale_transform_data CLI and its imports.
+
+Every measurement runs in a fresh python process, so import caches do not hide
+cold start cost. Reports the median wall time of importing the pipeline module,
+of a full uncached local run on a tiny synthetic catalogue and of collecting the test
+suite, plus the slowest imports from -X importtime and whether heavy optional
+dependencies (astroquery, astropy) got loaded at all:
+
+    poetry run python3 benchmarks/bench_startup.py --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+CLI = os.path.join(REPO_DIR, "exo_planet", "scale_transform_data.py")
+HEAVY_MODULES = ["astroquery", "astropy", "matplotlib", "plotly"]
+
+TINY_CSV = """pl_name,hostname,ra,dec,sy_dist,pl_rade,st_rad,st_teff
+a b,a,0.0,0.0,10.0,1.0,1.0,5000
+b b,b,45.0,30.0,20.0,1.5,2.0,5500
+c b,c,90.0,-30.0,30.0,2.0,5.0,6000
+"""
+
+def wall_time(command: list, repeat: int) -> dict:
+    """Median and minimum wall time of running command in a fresh process."""
+    env = {**os.environ, "PYTHONPATH": REPO_DIR}
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, env=env, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return {"median_seconds": statistics.median(times), "min_seconds": min(times)}
+
+def slowest_imports(module: str, top: int) -> list:
+    """Largest cumulative import times in microseconds from python -X importtime."""
+    env = {**os.environ, "PYTHONPATH": REPO_DIR}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_DIR, env=env, check=True, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append({"module": parts[2].strip(), "cumulative_us": int(parts[1])})
+    return sorted(imports, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+
+def heavy_modules_loaded(module: str) -> list:
+    env = {**os.environ, "PYTHONPATH": REPO_DIR}
+    check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=REPO_DIR, env=env, check=True, capture_output=True, text=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark startup time of the exoplanet CLI")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per measurement, the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    parser.add_argument("--output", type=str, default="bench_startup.json", help="JSON results filename")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        input_csv = os.path.join(workdir, "tiny.csv")
+        with open(input_csv, "w") as file:
+            file.write(TINY_CSV)
+
+        report = {
+            "python": sys.version.split()[0],
+            "interpreter": wall_time([sys.executable, "-c", "pass"], args.repeat),
+            "import_pipeline": wall_time([sys.executable, "-c", "import exo_planet.scale_transform_data"], args.repeat),
+            "local_subcommand": wall_time([sys.executable, CLI, "local", input_csv, os.path.join(workdir, "out.csv"), "--no-cache"], args.repeat),
+            "test_collection": wall_time([sys.executable, "-m", "pytest", "-q", "--collect-only", "tests"], args.repeat),
+            "heavy_modules_loaded": heavy_modules_loaded("exo_planet.scale_transform_data"),
+            "slowest_imports": slowest_imports("exo_planet.scale_transform_data", args.top),
+        }
+
+    for name in ("interpreter", "import_pipeline", "local_subcommand", "test_collection"):
+        print(f"{name:<18} {report[name]['median_seconds']:.3f}s")
+    print(f"heavy modules loaded: {report['heavy_modules_loaded'] or 'none'}")
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Startup benchmark written to {args.output}")
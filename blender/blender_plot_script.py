@@ -1,19 +1,41 @@
 import bpy
-import csv
+import numpy as np
 
 csv_file_hardcode = "/Users/dalioshin/projects/exo-planet/data/corrected_output_2025-11-13.csv"
 
+# build one instanced point cloud instead of one object per star
+use_point_cloud = True
+# optional per segment visibility from the visibility subcommand, only used with the point cloud
+visibility_file_hardcode = None
+# optional edge list from the graph subcommand, drawn as one object of connection lines
+graph_file_hardcode = None
+# optional spike ball buffers from the spikes subcommand, drawn as one object of lines
+spike_file_hardcode = None
+
+def load_star_data(path):
+    """Load pipeline output (csv or npy) as a structured array with named columns"""
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.genfromtxt(path, delimiter=",", names=True)
+
+def star_colors_linear(star_data):
+    """(n, 4) linear RGBA per star from the sRGB color_r/g/b columns, None for output written without them"""
+    if "color_r" not in star_data.dtype.names:
+        return None
+    srgb = np.stack([star_data[col] for col in ("color_r", "color_g", "color_b")], axis=1).astype(np.float32) / 255
+    rgba = np.ones((len(star_data), 4), dtype=np.float32)
+    rgba[:, :3] = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    return rgba
+
 # assume data cleaning done before blender script
 def draw_sphere_from_data(path):
-    # load data from csv
-    with open(path, 'r') as file:
-        reader = csv.reader(file)
-        next(reader)
-        star_data = [list(map(float, row[4:])) for row in reader]
+    star_data = load_star_data(path)
     
     star_count = len(star_data)
+    colors = star_colors_linear(star_data)
     
-    material = create_glow_material()
+    # one shared material, each copy carries its own colour in the object color
+    material = create_glow_material("color", 'OBJECT') if colors is not None else create_glow_material()
     
     # create a archetype unit sphere object that all others will be copies of
     # copies are more efficient here than adding a new object
@@ -27,8 +49,9 @@ def draw_sphere_from_data(path):
     archetype_sphere.hide_set(True)
     archetype_sphere.hide_render = True
     
-    for i, row in enumerate(star_data):
-        st_rad, st_temp, x, y, z = row
+    columns = ("st_rad", "st_teff", "x", "y", "z")
+    for i, row in enumerate(zip(*(star_data[col] for col in columns))):
+        st_rad, st_temp, x, y, z = map(float, row)
         
         # for each star system make a copy and adjust metrics to fit data
         new_sphere = archetype_sphere.copy()
@@ -37,13 +60,243 @@ def draw_sphere_from_data(path):
         new_sphere.hide_set(False)
         new_sphere.hide_render = False
         new_sphere.modifiers["Wireframe"].thickness = st_rad * 0.01
+        if colors is not None:
+            new_sphere.color = colors[i]
         
         bpy.context.collection.objects.link(new_sphere)
         
         print(f"{i} of {star_count}")
                 
-def create_glow_material():
-    """Create a material that glows yellow in the render"""
+def draw_point_cloud_from_data(path):
+    """Build every star as a vertex of one mesh and instance the wireframe sphere on it with geometry nodes"""
+    star_data = load_star_data(path)
+    stars = create_star_points("Stars", star_data)
+    instancer = stars.modifiers.new(type='NODES', name="StarInstances")
+    instancer.node_group = create_star_instance_nodes(create_star_material(star_data))
+    
+    print(f"{len(star_data)} stars loaded")
+    return stars
+
+def draw_culled_point_cloud_from_data(path, visibility_path):
+    """One point cloud per camera path segment holding only the stars visible in it, at their level of detail.
+    
+    visibility_path is the npz written by the visibility subcommand of scale_transform_data.py,
+    every segment object is keyframed to only show up (and render) during its own frames.
+    """
+    star_data = load_star_data(path)
+    visibility = np.load(visibility_path)
+    node_group = create_star_instance_nodes(create_star_material(star_data), use_lod=True)
+    
+    offsets = visibility["offsets"]
+    segments = []
+    for i, (frame_start, frame_end) in enumerate(zip(visibility["segment_start"], visibility["segment_end"])):
+        rows = visibility["indices"][offsets[i]:offsets[i + 1]]
+        segment = create_star_points(f"Stars_{frame_start}_{frame_end}", star_data, rows, visibility["lod"][offsets[i]:offsets[i + 1]])
+        instancer = segment.modifiers.new(type='NODES', name="StarInstances")
+        instancer.node_group = node_group
+        
+        # hidden outside of its frame range
+        for frame, hidden in ((frame_start - 1, True), (frame_start, False), (frame_end, False), (frame_end + 1, True)):
+            segment.hide_viewport = hidden
+            segment.hide_render = hidden
+            segment.keyframe_insert(data_path="hide_viewport", frame=int(frame))
+            segment.keyframe_insert(data_path="hide_render", frame=int(frame))
+        segments.append(segment)
+        
+        print(f"segment {i + 1} of {len(offsets) - 1}: {len(rows)} stars")
+    return segments
+
+def draw_connections_from_data(path, graph_path):
+    """One mesh holding every connection of the graph subcommand as an edge, swept into thin tubes by geometry nodes
+    
+    Each edge gets a "length" attribute (scaled to [0, 1]) for driving pulses or fades in the material.
+    """
+    star_data = load_star_data(path)
+    graph = np.load(graph_path)
+    edges = graph["edges"]
+    lengths = graph["lengths"]
+    
+    mesh = bpy.data.meshes.new("Connections")
+    mesh.vertices.add(len(star_data))
+    coords = np.empty((len(star_data), 3), dtype=np.float32)
+    coords[:, 0] = star_data["x"]
+    coords[:, 1] = star_data["y"]
+    coords[:, 2] = star_data["z"]
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set("vertices", np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    
+    attribute = mesh.attributes.new(name="length", type='FLOAT', domain='EDGE')
+    scaled = lengths / lengths.max() if len(lengths) else lengths
+    attribute.data.foreach_set("value", np.ascontiguousarray(scaled, dtype=np.float32))
+    mesh.update()
+    
+    connections = bpy.data.objects.new("Connections", mesh)
+    bpy.context.collection.objects.link(connections)
+    lines = connections.modifiers.new(type='NODES', name="ConnectionLines")
+    lines.node_group = create_line_nodes(create_glow_material())
+    
+    print(f"{len(edges)} connections loaded")
+    return connections
+
+def draw_spike_ball(spike_path, thickness=0.005):
+    """One mesh holding every spike of the spikes subcommand, filled with a single bulk call per buffer
+    
+    The per vertex star colour goes into a "star_color" attribute read by the line material.
+    """
+    spikes = np.load(spike_path)
+    vertices = spikes["vertices"]
+    edges = spikes["edges"]
+    srgb = spikes["colors"][:, :3].astype(np.float32) / 255
+    colors = np.ones((len(vertices), 4), dtype=np.float32)
+    colors[:, :3] = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    
+    mesh = bpy.data.meshes.new("SpikeBall")
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(vertices, dtype=np.float32).ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set("vertices", np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    attribute = mesh.attributes.new(name="star_color", type='FLOAT_COLOR', domain='POINT')
+    attribute.data.foreach_set("color", colors.ravel())
+    mesh.update()
+    
+    spike_ball = bpy.data.objects.new("SpikeBall", mesh)
+    bpy.context.collection.objects.link(spike_ball)
+    lines = spike_ball.modifiers.new(type='NODES', name="SpikeLines")
+    # the swept tubes keep the point attributes of the edges they were made from
+    lines.node_group = create_line_nodes(create_glow_material("star_color", 'GEOMETRY'), thickness)
+    
+    print(f"{len(edges)} spikes loaded")
+    return spike_ball
+
+def create_line_nodes(material, thickness=0.02):
+    """Geometry nodes sweeping every mesh edge with a thin profile, loose star vertices are dropped"""
+    tree = bpy.data.node_groups.new("ConnectionLines", 'GeometryNodeTree')
+    tree.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    tree.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = tree.nodes
+    links = tree.links
+    
+    group_in = nodes.new("NodeGroupInput")
+    group_out = nodes.new("NodeGroupOutput")
+    edges = nodes.new("GeometryNodeMeshToCurve")
+    profile = nodes.new("GeometryNodeCurvePrimitiveCircle")
+    profile.inputs['Resolution'].default_value = 4
+    profile.inputs['Radius'].default_value = thickness / 2
+    tubes = nodes.new("GeometryNodeCurveToMesh")
+    set_material = nodes.new("GeometryNodeSetMaterial")
+    set_material.inputs['Material'].default_value = material
+    
+    links.new(group_in.outputs['Geometry'], edges.inputs['Mesh'])
+    links.new(edges.outputs['Curve'], tubes.inputs['Curve'])
+    links.new(profile.outputs['Curve'], tubes.inputs['Profile Curve'])
+    links.new(tubes.outputs['Mesh'], set_material.inputs['Geometry'])
+    links.new(set_material.outputs['Geometry'], group_out.inputs['Geometry'])
+    return tree
+
+def create_star_points(name, star_data, rows=None, lod=None):
+    """Mesh object with a vertex per star (or per selected row) filled in bulk from numpy arrays"""
+    if rows is not None:
+        star_data = star_data[rows]
+    star_count = len(star_data)
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(star_count)
+    coords = np.empty((star_count, 3), dtype=np.float32)
+    coords[:, 0] = star_data["x"]
+    coords[:, 1] = star_data["y"]
+    coords[:, 2] = star_data["z"]
+    mesh.vertices.foreach_set("co", coords.ravel())
+    
+    # per vertex attributes read by the geometry nodes and shaders
+    for attribute_name, column in (("radius", "st_rad"), ("st_teff", "st_teff")):
+        attribute = mesh.attributes.new(name=attribute_name, type='FLOAT', domain='POINT')
+        attribute.data.foreach_set("value", np.ascontiguousarray(star_data[column], dtype=np.float32))
+    colors = star_colors_linear(star_data)
+    if colors is not None:
+        attribute = mesh.attributes.new(name="star_color", type='FLOAT_COLOR', domain='POINT')
+        attribute.data.foreach_set("color", colors.ravel())
+    if lod is not None:
+        attribute = mesh.attributes.new(name="lod", type='INT', domain='POINT')
+        attribute.data.foreach_set("value", np.ascontiguousarray(lod, dtype=np.int32))
+    mesh.update()
+    
+    stars = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(stars)
+    return stars
+
+def create_star_instance_nodes(material, use_lod=False):
+    """Geometry nodes that put a wireframe ico sphere scaled by the radius attribute on every point
+    
+    With use_lod the lod point attribute picks the sphere: 0 the full wireframe sphere,
+    1 a coarser wireframe, 2 a bare icosahedron without the wireframe sweep.
+    """
+    tree = bpy.data.node_groups.new("StarInstances", 'GeometryNodeTree')
+    tree.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    tree.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = tree.nodes
+    links = tree.links
+    
+    group_in = nodes.new("NodeGroupInput")
+    group_out = nodes.new("NodeGroupOutput")
+    
+    def sphere_mesh(subdivisions, wire):
+        # same unit sphere as the archetype in draw_sphere_from_data
+        sphere = nodes.new("GeometryNodeMeshIcoSphere")
+        sphere.inputs['Radius'].default_value = 1
+        sphere.inputs['Subdivisions'].default_value = subdivisions
+        mesh = sphere.outputs['Mesh']
+        if wire:
+            # sweep the sphere edges with a thin profile to match the wireframe modifier thickness of 0.01,
+            # the instance scale then grows it with st_rad like the per object modifier did
+            edges = nodes.new("GeometryNodeMeshToCurve")
+            profile = nodes.new("GeometryNodeCurvePrimitiveCircle")
+            profile.inputs['Resolution'].default_value = 4
+            profile.inputs['Radius'].default_value = 0.005
+            wireframe = nodes.new("GeometryNodeCurveToMesh")
+            links.new(mesh, edges.inputs['Mesh'])
+            links.new(edges.outputs['Curve'], wireframe.inputs['Curve'])
+            links.new(profile.outputs['Curve'], wireframe.inputs['Profile Curve'])
+            mesh = wireframe.outputs['Mesh']
+        set_material = nodes.new("GeometryNodeSetMaterial")
+        set_material.inputs['Material'].default_value = material
+        links.new(mesh, set_material.inputs['Geometry'])
+        return set_material.outputs['Geometry']
+    
+    radius = nodes.new("GeometryNodeInputNamedAttribute")
+    radius.data_type = 'FLOAT'
+    radius.inputs['Name'].default_value = "radius"
+    instance = nodes.new("GeometryNodeInstanceOnPoints")
+    
+    if use_lod:
+        # the sphere at the index given by the lod attribute is instanced on each point
+        to_instance = nodes.new("GeometryNodeGeometryToInstance")
+        for subdivisions, wire in ((2, True), (1, True), (1, False)):
+            links.new(sphere_mesh(subdivisions, wire), to_instance.inputs['Geometry'])
+        lod = nodes.new("GeometryNodeInputNamedAttribute")
+        lod.data_type = 'INT'
+        lod.inputs['Name'].default_value = "lod"
+        instance.inputs['Pick Instance'].default_value = True
+        links.new(to_instance.outputs['Instances'], instance.inputs['Instance'])
+        links.new(lod.outputs['Attribute'], instance.inputs['Instance Index'])
+    else:
+        links.new(sphere_mesh(2, True), instance.inputs['Instance'])
+    
+    links.new(group_in.outputs['Geometry'], instance.inputs['Points'])
+    links.new(radius.outputs['Attribute'], instance.inputs['Scale'])
+    links.new(instance.outputs['Instances'], group_out.inputs['Geometry'])
+    
+    return tree
+
+def create_star_material(star_data):
+    """Shared material for point cloud stars, coloured by the star_color point attribute when the data has colours"""
+    if star_colors_linear(star_data) is None:
+        return create_glow_material()
+    # instance on points carries the point attributes over to each instance
+    return create_glow_material("star_color", 'INSTANCER')
+
+def create_glow_material(color_attribute=None, attribute_type='INSTANCER'):
+    """Create a material that glows yellow in the render, or in the colour of the given attribute"""
     mat = bpy.data.materials.new(name="GlowMaterial")
     mat.use_nodes = True
     
@@ -58,6 +311,13 @@ def create_glow_material():
     emit.inputs['Color'].default_value = (0.835078, 1, 0.000327989, 1)
     emit.inputs['Strength'].default_value = 5.0
     
+    if color_attribute:
+        # a single lookup per shading sample instead of a material per star
+        attribute = nodes.new("ShaderNodeAttribute")
+        attribute.attribute_type = attribute_type
+        attribute.attribute_name = color_attribute
+        tree.links.new(emit.inputs['Color'], attribute.outputs['Color'])
+    
     # Create output
     output = nodes.new("ShaderNodeOutputMaterial")
     
@@ -67,4 +327,13 @@ def create_glow_material():
     return mat
 
 if __name__ == "__main__":        
-    draw_sphere_from_data(csv_file_hardcode)
\ No newline at end of file
+    if use_point_cloud and visibility_file_hardcode:
+        draw_culled_point_cloud_from_data(csv_file_hardcode, visibility_file_hardcode)
+    elif use_point_cloud:
+        draw_point_cloud_from_data(csv_file_hardcode)
+    else:
+        draw_sphere_from_data(csv_file_hardcode)
+    if graph_file_hardcode:
+        draw_connections_from_data(csv_file_hardcode, graph_file_hardcode)
+    if spike_file_hardcode:
+        draw_spike_ball(spike_file_hardcode)
\ No newline at end of file
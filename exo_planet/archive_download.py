@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+import urllib.parse
+import urllib.request
+
+TAP_SYNC_URL = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync"
+DEFAULT_BANDS = 36
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+MANIFEST_NAME = "download.json"
+
+def ra_bands(bands: int) -> list:
+    """Split right ascension [0, 360] into equal (low, high) bands."""
+    edges = [360 * i / bands for i in range(bands + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+def band_query(table: str, columns: list, low: float, high: float, last: bool = False) -> str:
+    """ADQL selecting one ra band, the last band closed at the top so ra == 360 is not lost."""
+    upper = "<=" if last else "<"
+    return f"select {','.join(columns)} from {table} where ra >= {low} and ra {upper} {high}"
+
+def band_filename(band_dir: str, index: int) -> str:
+    return os.path.join(band_dir, f"band_{index:04d}.csv")
+
+def fetch_band(url: str, query: str, filename: str, retries: int = DEFAULT_RETRIES, timeout: float = 300) -> str:
+    """Download one query as csv straight to filename, through a .part file so only complete bands appear."""
+    request_url = f"{url}?{urllib.parse.urlencode({'query': query, 'format': 'csv'})}"
+    part_filename = filename + ".part"
+    for attempt in range(retries + 1):
+        try:
+            with urllib.request.urlopen(request_url, timeout=timeout) as response, open(part_filename, "wb") as file:
+                shutil.copyfileobj(response, file)
+            os.replace(part_filename, filename)
+            return filename
+        except OSError:
+            if attempt == retries:
+                raise
+            time.sleep(2 ** attempt)
+
+async def _download_bands(url: str, queries: list, filenames: list, concurrency: int, retries: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(query, filename):
+        async with semaphore:
+            # urllib blocks, so each fetch runs in a worker thread and the loop only schedules them
+            return await asyncio.to_thread(fetch_band, url, query, filename, retries)
+
+    return await asyncio.gather(*(fetch(query, filename) for query, filename in zip(queries, filenames)),
+                                return_exceptions=True)
+
+def _check_manifest(band_dir: str, manifest: dict) -> None:
+    # band files are only reusable for the exact same query split
+    path = os.path.join(band_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as file:
+            existing = json.load(file)
+        if existing != manifest:
+            raise ValueError(f"{band_dir} holds bands of a different download {existing}, use another directory")
+    else:
+        with open(path, "w") as file:
+            json.dump(manifest, file, indent=2)
+
+def download_table(table: str, columns: list, band_dir: str, bands: int = DEFAULT_BANDS,
+                   concurrency: int = DEFAULT_CONCURRENCY, url: str = TAP_SYNC_URL,
+                   retries: int = DEFAULT_RETRIES) -> list:
+    """Download table in ra bands, at most concurrency at a time, one csv per band in band_dir.
+
+    Bands already on disk are skipped, so rerunning after an interruption only fetches
+    the missing ones. Failed bands are raised after every other band has finished.
+    Returns the band filenames in ra order.
+    """
+    os.makedirs(band_dir, exist_ok=True)
+    _check_manifest(band_dir, {"url": url, "table": table, "columns": list(columns), "bands": bands})
+
+    filenames = [band_filename(band_dir, i) for i in range(bands)]
+    pending = [(band_query(table, columns, low, high, i == bands - 1), filenames[i])
+               for i, (low, high) in enumerate(ra_bands(bands)) if not os.path.exists(filenames[i])]
+    if pending:
+        queries, pending_filenames = zip(*pending)
+        results = asyncio.run(_download_bands(url, queries, pending_filenames, concurrency, retries))
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {bands} bands failed, rerun to resume") from errors[0]
+    return filenames
+
+def combine_bands(filenames: list, output_csv: str) -> None:
+    """Concatenate band csv files into one, keeping the header of the first only."""
+    with open(output_csv, "wb") as output:
+        for i, filename in enumerate(filenames):
+            with open(filename, "rb") as file:
+                header = file.readline()
+                if i == 0:
+                    output.write(header)
+                shutil.copyfileobj(file, output)
+
+def generate_download(table: str, columns: list, output_csv: str, band_dir: str = None, bands: int = DEFAULT_BANDS,
+                      concurrency: int = DEFAULT_CONCURRENCY, url: str = TAP_SYNC_URL,
+                      retries: int = DEFAULT_RETRIES) -> str:
+    """Download table into output_csv, keeping the bands in band_dir (output_csv + ".bands" by default) to resume."""
+    band_dir = band_dir or output_csv + ".bands"
+    combine_bands(download_table(table, columns, band_dir, bands, concurrency, url, retries), output_csv)
+    return band_dir
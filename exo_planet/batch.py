@@ -0,0 +1,127 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+try:
+    from .data_func import load_from_csv
+    from .scale_transform_data import (
+        SCALE_FACTOR_CONST, ST_RAD_SCALER, clean_df, compute_bounds, scale_clean_df, save_output
+    )
+except ImportError:
+    # For script execution
+    from data_func import load_from_csv
+    from scale_transform_data import (
+        SCALE_FACTOR_CONST, ST_RAD_SCALER, clean_df, compute_bounds, scale_clean_df, save_output
+    )
+
+JOB_DEFAULTS = {
+    "scale_factor": SCALE_FACTOR_CONST,
+    "st_rad_scaler": ST_RAD_SCALER,
+    "format": "csv",
+    "float32": False,
+}
+
+# cleaned inputs of the running batch inside a pool worker, set by _init_worker
+_WORKER_INPUTS = {}
+
+def load_manifest(filename: str) -> list:
+    """Load batch jobs from json.
+
+    {"defaults": {"scale_factor": 70000}, "jobs": [{"input": "a.csv", "output": "a_out.csv",
+     "scale_factor": 50000, "st_rad_scaler": 3, "format": "npy", "float32": false}, ...]}
+    Paths are relative to the manifest, defaults and every job key but input/output are optional.
+    """
+    with open(filename) as file:
+        manifest = json.load(file)
+    base_dir = os.path.dirname(os.path.abspath(filename))
+    defaults = {**JOB_DEFAULTS, **manifest.get("defaults", {})}
+
+    jobs = []
+    for job in manifest.get("jobs", []):
+        if "input" not in job or "output" not in job:
+            raise ValueError(f"batch job {job} needs an input and an output")
+        job = {**defaults, **job}
+        job["input"] = os.path.join(base_dir, job["input"])
+        job["output"] = os.path.join(base_dir, job["output"])
+        jobs.append(job)
+    return jobs
+
+def load_inputs(filenames) -> tuple:
+    """Load and clean every distinct input once.
+
+    Returns ({filename: (cleaned DataFrame, bounds)}, [{"input", "rows", "load_seconds"}]).
+    """
+    inputs, timings = {}, []
+    for filename in dict.fromkeys(filenames):
+        start = time.perf_counter()
+        df_filtered = clean_df(load_from_csv(filename))
+        inputs[filename] = (df_filtered, compute_bounds(df_filtered))
+        timings.append({"input": filename, "rows": len(df_filtered), "load_seconds": time.perf_counter() - start})
+    return inputs, timings
+
+def run_job(job: dict, inputs: dict) -> dict:
+    """Run one batch job on its input from load_inputs and return its per stage timing in seconds."""
+    start = time.perf_counter()
+    df_filtered, bounds = inputs[job["input"]]
+
+    dtype = np.float32 if job["float32"] else np.float64
+    df_scaled_cart = scale_clean_df(df_filtered, bounds, dtype, job["scale_factor"], job["st_rad_scaler"])
+    transformed = time.perf_counter()
+
+    save_output(df_scaled_cart, job["output"], job["format"])
+    saved = time.perf_counter()
+    return {
+        "input": job["input"],
+        "output": job["output"],
+        "rows": len(df_scaled_cart),
+        "transform_seconds": transformed - start,
+        "save_seconds": saved - transformed,
+        "total_seconds": saved - start,
+        "pid": os.getpid(),
+    }
+
+def _init_worker(inputs: dict) -> None:
+    global _WORKER_INPUTS
+    _WORKER_INPUTS = inputs
+
+def _run_worker_job(job: dict) -> dict:
+    return run_job(job, _WORKER_INPUTS)
+
+def run_batch(jobs: list, workers: int = None, inputs: dict = None) -> list:
+    """Run jobs across a process pool, in manifest order of results.
+
+    Every distinct input is loaded and cleaned once up front, or taken from inputs of
+    load_inputs. Workers are forked where the platform allows so they share those
+    frames copy on write instead of re-reading the csv; otherwise each worker gets
+    them pickled once. Nothing outlives the call, a later batch reads its inputs again.
+    """
+    if inputs is None:
+        inputs = load_inputs(job["input"] for job in jobs)[0]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [run_job(job, inputs) for job in jobs]
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context,
+                             initializer=_init_worker, initargs=(inputs,)) as executor:
+        return list(executor.map(_run_worker_job, jobs))
+
+def generate_batch(manifest_filename: str, workers: int = None, report_filename: str = None) -> dict:
+    """Run a batch manifest and optionally write the timing report as json.
+
+    The report has the one time load and clean of every input under inputs and the
+    transform and save of every job under jobs.
+    """
+    start = time.perf_counter()
+    jobs = load_manifest(manifest_filename)
+    inputs, timings = load_inputs(job["input"] for job in jobs)
+    results = run_batch(jobs, workers, inputs)
+    report = {"wall_seconds": time.perf_counter() - start, "inputs": timings, "jobs": results}
+
+    if report_filename:
+        with open(report_filename, "w") as file:
+            json.dump(report, file, indent=2)
+    return report
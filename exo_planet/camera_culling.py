@@ -0,0 +1,133 @@
+import json
+import numpy as np
+try:
+    from .data_func import load_output
+    from .spatial_index import KDTree, build_index_from_df, frustum_planes
+except ImportError:
+    # For script execution
+    from data_func import load_output
+    from spatial_index import KDTree, build_index_from_df, frustum_planes
+
+DEFAULT_SEGMENT_FRAMES = 24
+# projected sphere diameter in pixels at which a star drops to the next level of detail:
+# 0 = full wireframe ico sphere, 1 = coarser sphere, 2 = bare icosahedron
+LOD_PIXEL_THRESHOLDS = (8.0, 2.0)
+
+def load_camera_path(filename: str) -> dict:
+    """Load a keyframed camera path from json.
+
+    {"fov": 50, "aspect": 1.778, "resolution_y": 1080, "near": 0.1, "far": 1e6,
+     "keyframes": [{"frame": 1, "position": [x, y, z], "target": [x, y, z], "fov": 50}, ...]}
+    fov (vertical, degrees) may be set per keyframe, everything but keyframes is optional.
+    """
+    with open(filename) as file:
+        camera_path = json.load(file)
+    if not camera_path.get("keyframes"):
+        raise ValueError(f"{filename} has no camera keyframes")
+
+    camera_path["keyframes"] = sorted(camera_path["keyframes"], key=lambda key: key["frame"])
+    return camera_path
+
+def frame_range(camera_path: dict) -> tuple:
+    keyframes = camera_path["keyframes"]
+    return int(keyframes[0]["frame"]), int(keyframes[-1]["frame"])
+
+def camera_at_frame(camera_path: dict, frame: float) -> tuple:
+    """Linearly interpolated (position, target, fov) of the camera at frame, held past the end keys."""
+    keyframes = camera_path["keyframes"]
+    frames = np.array([key["frame"] for key in keyframes], dtype=np.float64)
+    positions = np.array([key["position"] for key in keyframes], dtype=np.float64)
+    targets = np.array([key["target"] for key in keyframes], dtype=np.float64)
+    fovs = np.array([key.get("fov", camera_path.get("fov", 50.0)) for key in keyframes], dtype=np.float64)
+
+    position = np.array([np.interp(frame, frames, positions[:, i]) for i in range(3)])
+    target = np.array([np.interp(frame, frames, targets[:, i]) for i in range(3)])
+    return position, target, float(np.interp(frame, frames, fovs))
+
+def projected_size(points: np.ndarray, radii: np.ndarray, position, target, fov: float, resolution_y: int) -> np.ndarray:
+    """On screen diameter in pixels of spheres of radii at points seen from the camera."""
+    forward = np.asarray(target, dtype=np.float64) - position
+    forward /= np.linalg.norm(forward)
+    depth = np.maximum((points - position) @ forward, 1e-9)
+    pixels_per_unit = resolution_y / (2 * np.tan(np.deg2rad(fov) / 2) * depth)
+    return 2 * radii * pixels_per_unit
+
+def assign_lod(size_px: np.ndarray, thresholds=LOD_PIXEL_THRESHOLDS) -> np.ndarray:
+    """Level of detail per star, 0 is most detailed."""
+    lod = np.zeros(len(size_px), dtype=np.uint8)
+    for threshold in thresholds:
+        lod += size_px < threshold
+    return lod
+
+def compute_visibility(points: np.ndarray, radii: np.ndarray, camera_path: dict, tree: KDTree = None,
+                       segment_frames: int = DEFAULT_SEGMENT_FRAMES) -> dict:
+    """Visible stars and their level of detail per segment of segment_frames frames.
+
+    A star is in a segment when it is inside the view frustum (grown by the largest
+    radius so partly visible spheres are kept) in any frame of the segment, at the most
+    detailed level it reaches there. Segments are stored flat: the stars of segment i
+    are indices[offsets[i]:offsets[i + 1]] with matching lod.
+    """
+    if tree is None:
+        tree = KDTree(points)
+    aspect = camera_path.get("aspect", 16 / 9)
+    resolution_y = camera_path.get("resolution_y", 1080)
+    near = camera_path.get("near", 0.1)
+    far = camera_path.get("far", np.inf)
+    margin = float(radii.max()) if len(radii) else 0.0
+    first, last = frame_range(camera_path)
+
+    starts, ends, offsets, indices, lods = [], [], [0], [], []
+    best_lod = np.full(len(points), 255, dtype=np.uint8)
+    for seg_start in range(first, last + 1, segment_frames):
+        seg_end = min(seg_start + segment_frames - 1, last)
+        best_lod[:] = 255
+        for frame in range(seg_start, seg_end + 1):
+            position, target, fov = camera_at_frame(camera_path, frame)
+            planes = frustum_planes(position, target, fov, aspect, near, far)
+            planes[:, 3] += margin
+            visible = tree.query_frustum(planes)
+            size_px = projected_size(points[visible], radii[visible], position, target, fov, resolution_y)
+            best_lod[visible] = np.minimum(best_lod[visible], assign_lod(size_px))
+
+        seg_indices = np.nonzero(best_lod != 255)[0]
+        starts.append(seg_start)
+        ends.append(seg_end)
+        indices.append(seg_indices.astype(np.uint32))
+        lods.append(best_lod[seg_indices])
+        offsets.append(offsets[-1] + len(seg_indices))
+
+    return {
+        "segment_start": np.array(starts, dtype=np.int32),
+        "segment_end": np.array(ends, dtype=np.int32),
+        "offsets": np.array(offsets, dtype=np.int64),
+        "indices": np.concatenate(indices) if indices else np.empty(0, dtype=np.uint32),
+        "lod": np.concatenate(lods) if lods else np.empty(0, dtype=np.uint8),
+    }
+
+def save_visibility(visibility: dict, filename: str) -> None:
+    np.savez_compressed(filename, **visibility)
+
+def load_visibility(filename: str) -> dict:
+    with np.load(filename, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+def segment_stars(visibility: dict, frame: int) -> tuple:
+    """(indices, lod) of the stars visible in the segment containing frame."""
+    segment = np.searchsorted(visibility["segment_end"], frame)
+    if segment >= len(visibility["segment_end"]) or frame < visibility["segment_start"][segment]:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint8)
+    start, end = visibility["offsets"][segment], visibility["offsets"][segment + 1]
+    return visibility["indices"][start:end], visibility["lod"][start:end]
+
+def generate_visibility(input_filename: str, camera_json: str, output_npz: str, index_npz: str = None,
+                        segment_frames: int = DEFAULT_SEGMENT_FRAMES) -> dict:
+    """Per segment visibility lists of a pipeline output file along a camera path, for the Blender loader."""
+    df = load_output(input_filename)
+    points = df[["x", "y", "z"]].to_numpy(dtype=np.float64)
+    radii = df["st_rad"].to_numpy(dtype=np.float64)
+    tree = KDTree.load(index_npz) if index_npz else build_index_from_df(df)
+
+    visibility = compute_visibility(points, radii, load_camera_path(camera_json), tree, segment_frames)
+    save_visibility(visibility, output_npz)
+    return visibility
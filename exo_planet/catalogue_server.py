@@ -0,0 +1,246 @@
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+try:
+    from .data_func import DEFAULT_CACHE_DIR, api_cache_paths, load_from_csv, pull_from_astro_api_cached
+    from .result_cache import file_digest
+    from .scale_transform_data import REQUIRED_COLUMNS, SYSTEM_KEY, convert_scale_clean_df
+    from .schema import to_records
+except ImportError:
+    # For script execution
+    from data_func import DEFAULT_CACHE_DIR, api_cache_paths, load_from_csv, pull_from_astro_api_cached
+    from result_cache import file_digest
+    from scale_transform_data import REQUIRED_COLUMNS, SYSTEM_KEY, convert_scale_clean_df
+    from schema import to_records
+
+DEFAULT_PORT = 8000
+DEFAULT_INTERVAL = 3600
+GZIP_LEVEL = 6
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+# _byte_range result for a valid range starting past the end of the body (416)
+UNSATISFIABLE = ()
+
+def _representation(body: bytes, content_type: str) -> dict:
+    """A servable body with its gzip form and their strong ETags, made once.
+
+    Both tags come from the uncompressed bytes, the gzip one with a -gz suffix since
+    strong validators must differ between content codings.
+    """
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return {
+        "content_type": content_type,
+        "body": body,
+        "gzip": gzip.compress(body, GZIP_LEVEL, mtime=0),
+        "etag": f'"{digest}"',
+        "gzip_etag": f'"{digest}-gz"',
+    }
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, by its q-values: gzip;q=0 refuses it."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+def serialize_catalogue(df) -> dict:
+    """Pipeline output as the served paths: the csv of save_to_csv and the npy of the packed schema."""
+    npy = io.BytesIO()
+    np.save(npy, to_records(df), allow_pickle=False)
+    return {
+        "/catalogue.csv": _representation(df.to_csv(index=False).encode(), "text/csv"),
+        "/catalogue.npy": _representation(npy.getvalue(), "application/octet-stream"),
+    }
+
+def _opaque_tag(tag: str) -> str:
+    """Entity tag without its W/ prefix, for the weak comparison If-None-Match uses."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+class CatalogueStore:
+    """Latest transformed catalogue, held ready to send.
+
+    refresh() hashes the current raw snapshot and only runs the pipeline when it changed.
+    The served paths are swapped in as one dict, so request threads never need a lock
+    and never see half a refresh.
+    """
+
+    def __init__(self, source):
+        # source() returns the filename of the current raw snapshot csv, fetching it first if need be
+        self.source = source
+        self.paths = {}
+        self.snapshot = None
+        self.status = {"snapshot": None, "rows": 0, "generated_at": None, "refreshes": 0, "unchanged": 0,
+                       "error": None}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Bring the catalogue up to date with the source. Returns whether it was regenerated."""
+        with self._lock:
+            self.status["refreshes"] += 1
+            try:
+                filename = self.source()
+                snapshot = file_digest(filename)
+                if snapshot == self.snapshot:
+                    self.status["unchanged"] += 1
+                    return False
+                df = convert_scale_clean_df(load_from_csv(filename))
+                self.paths = serialize_catalogue(df)
+            except Exception as error:
+                # keep serving the last good catalogue, the next refresh tries again
+                self.status["error"] = f"{type(error).__name__}: {error}"
+                raise
+            self.snapshot = snapshot
+            self.status.update(snapshot=snapshot, rows=len(df), generated_at=time.time(), error=None)
+            return True
+
+class CatalogueHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ExoPlanetCatalogue/1"
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def _respond(self, send_body: bool) -> None:
+        store = self.server.store
+        path = self.path.split("?", 1)[0]
+        if path == "/status":
+            return self._send(200, json.dumps(store.status).encode(), {"Content-Type": "application/json",
+                                                                       "Cache-Control": "no-store"}, send_body)
+        resource = store.paths.get(path)
+        if resource is None:
+            return self._send(404, b"not found\n", {"Content-Type": "text/plain"}, send_body)
+
+        byte_range = None
+        requested = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        # a different If-Range means the client's partial copy is of an earlier catalogue, send the whole current one
+        if requested and (if_range is None or if_range.strip() == resource["etag"]):
+            byte_range = self._byte_range(requested, len(resource["body"]))
+        # ranges are always of the uncompressed body
+        use_gzip = byte_range is None and _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = resource["gzip_etag"] if use_gzip else resource["etag"]
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+        match = self.headers.get("If-None-Match")
+        if match and (match.strip() == "*" or _opaque_tag(etag) in [_opaque_tag(tag) for tag in match.split(",")]):
+            return self._send(304, b"", headers, send_body)
+
+        headers["Content-Type"] = resource["content_type"]
+        body = resource["body"]
+        if byte_range is not None:
+            if byte_range == UNSATISFIABLE:
+                headers["Content-Range"] = f"bytes */{len(body)}"
+                return self._send(416, b"", headers, send_body)
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return self._send(206, body[start:end + 1], headers, send_body)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            body = resource["gzip"]
+        self._send(200, body, headers, send_body)
+
+    @staticmethod
+    def _byte_range(requested: str, size: int) -> tuple:
+        """Inclusive (start, end) of a single bytes range.
+
+        None when the header is to be ignored and the full body sent (multiple ranges,
+        other units, anything malformed), UNSATISFIABLE when the range starts past the end.
+        """
+        match = _RANGE.match(requested.strip())
+        if not match or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+        if not first:
+            # suffix range, the last n bytes
+            suffix = int(last)
+            return (max(size - suffix, 0), size - 1) if suffix and size else UNSATISFIABLE
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            return UNSATISFIABLE
+        return start, min(int(last), size - 1) if last else size - 1
+
+    def _send(self, code: int, body: bytes, headers: dict, send_body: bool) -> None:
+        self.send_response(code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if code != 304:
+            # a 304 may only repeat the length of the 200 body, it is left out instead
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and code != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class CatalogueServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, store: CatalogueStore, verbose: bool = False):
+        super().__init__(address, CatalogueHandler)
+        self.store = store
+        self.verbose = verbose
+
+def cached_pull_source(cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_INTERVAL, table: str = "ps",
+                       client=None):
+    """Source that pulls the archive into the api cache again once the cached pull is older than ttl seconds."""
+    columns = [SYSTEM_KEY] + REQUIRED_COLUMNS
+
+    def source():
+        pull_from_astro_api_cached(table, columns, cache_dir, ttl, refresh=True, client=client)
+        return api_cache_paths(cache_dir, table, columns)[0]
+    return source
+
+def schedule_refresh(store: CatalogueStore, interval: float, stop: threading.Event) -> threading.Thread:
+    """Refresh the store every interval seconds on a background thread until stop is set."""
+    def run():
+        while not stop.wait(interval):
+            try:
+                store.refresh()
+            except Exception:
+                # recorded in the store status, serve the previous catalogue meanwhile
+                pass
+
+    thread = threading.Thread(target=run, name="catalogue-refresh", daemon=True)
+    thread.start()
+    return thread
+
+def serve_catalogue(source, host: str = "127.0.0.1", port: int = DEFAULT_PORT, interval: float = DEFAULT_INTERVAL,
+                    verbose: bool = False) -> CatalogueServer:
+    """Server of the catalogue from source with its first refresh done and the schedule running.
+
+    Call serve_forever() on the result, and shutdown() then set server.stop to end it.
+    Port 0 picks a free port, see server.server_address.
+    """
+    store = CatalogueStore(source)
+    store.refresh()
+    server = CatalogueServer((host, port), store, verbose)
+    server.stop = threading.Event()
+    schedule_refresh(store, interval, server.stop)
+    return server
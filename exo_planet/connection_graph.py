@@ -0,0 +1,159 @@
+import numpy as np
+try:
+    from .data_func import load_output
+    from .spatial_index import KDTree, _ranges
+except ImportError:
+    # For script execution
+    from data_func import load_output
+    from spatial_index import KDTree, _ranges
+
+DEFAULT_NEIGHBOURS = 3
+
+def _leaves(tree: KDTree) -> tuple:
+    """Non-empty leaf nodes with the centre of their box and the radius of their points around it."""
+    leaves = np.flatnonzero((tree.node_left < 0) & (tree.node_end > tree.node_start))
+    centres = (tree.node_min[leaves] + tree.node_max[leaves]) / 2
+    owner = np.repeat(np.arange(len(leaves)), tree.node_end[leaves] - tree.node_start[leaves])
+    rows = _ranges(tree.node_start[leaves], tree.node_end[leaves])
+    spread = np.zeros(len(leaves))
+    np.maximum.at(spread, owner, np.sqrt(((tree.points[rows] - centres[owner]) ** 2).sum(axis=1)))
+    return leaves, centres, spread
+
+def _batched_candidates(tree: KDTree, centres: np.ndarray, reach: np.ndarray) -> list:
+    """Tree order rows of every leaf within reach of each centre, for all centres in one traversal.
+
+    Walks (query, node) pairs a tree level at a time, so the per query python overhead
+    of query_radius is paid once per level instead of once per leaf.
+    """
+    # a little slack so rounding never drops a leaf right on the bound, the exact test comes later
+    limit = (reach * (1 + 1e-9)) ** 2
+    query = np.arange(len(centres))
+    node = np.zeros(len(centres), dtype=np.int64)
+    found_query, found_node = [], []
+    while len(query):
+        point = centres[query]
+        gap = np.maximum(np.maximum(tree.node_min[node] - point, point - tree.node_max[node]), 0.0)
+        near = np.einsum("ij,ij->i", gap, gap) <= limit[query]
+        query, node = query[near], node[near]
+        is_leaf = tree.node_left[node] < 0
+        found_query.append(query[is_leaf])
+        found_node.append(node[is_leaf])
+        query = np.tile(query[~is_leaf], 2)
+        node = np.concatenate([tree.node_left[node[~is_leaf]], tree.node_right[node[~is_leaf]]])
+
+    query = np.concatenate(found_query)
+    node = np.concatenate(found_node)
+    rows = _ranges(tree.node_start[node], tree.node_end[node])
+    owner = np.repeat(query, tree.node_end[node] - tree.node_start[node])
+    order = np.argsort(owner, kind="stable")
+    return np.split(rows[order], np.cumsum(np.bincount(owner, minlength=len(centres)))[:-1])
+
+def _knn_reach(tree: KDTree, leaves: np.ndarray, centres: np.ndarray, k: int) -> np.ndarray:
+    """Per leaf, a distance from its centre within which every point of the leaf has its k nearest neighbours.
+
+    The kth nearest point of the same leaf bounds each point's neighbour distance, all
+    leaves are worked out together on a padded (leaves, size, size) block. Leaves with
+    k or fewer points fall back to the k + 1 points nearest their centre.
+    """
+    sizes = tree.node_end[leaves] - tree.node_start[leaves]
+    width = int(sizes.max())
+    slot = np.arange(width)
+    valid = slot[None, :] < sizes[:, None]
+    rows = np.where(valid, tree.node_start[leaves][:, None] + slot[None, :], 0)
+    leaf_points = tree.points[rows]
+    diff = leaf_points[:, :, None, :] - leaf_points[:, None, :, :]
+    dist = np.sqrt(np.einsum("lijk,lijk->lij", diff, diff))
+    # padding slots and the point itself never count as a neighbour
+    dist[~(valid[:, :, None] & valid[:, None, :])] = np.inf
+    dist[:, slot, slot] = np.inf
+    kth = np.partition(dist, k - 1, axis=2)[:, :, k - 1] if k <= width - 1 else np.full(rows.shape, np.inf)
+    from_centre = np.sqrt(((leaf_points - centres[:, None, :]) ** 2).sum(axis=2))
+    reach = np.where(valid, from_centre + kth, 0.0).max(axis=1)
+
+    for i in np.flatnonzero(sizes <= k):
+        _, nearest_dist = tree.query_knn(centres[i], k + 1)
+        reach[i] = 2 * from_centre[i, valid[i]].max() + nearest_dist[-1]
+    return reach
+
+def _block_distances(tree: KDTree, rows: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    diff = tree.points[rows][:, None, :] - tree.points[candidates][None, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+def _undirected(tree: KDTree, sources: list, targets: list, lengths: list) -> tuple:
+    """Unique (i < j) edges in original point order, sorted, with their lengths."""
+    if not sources:
+        return np.empty((0, 2), dtype=np.uint32), np.empty(0, dtype=np.float32)
+    i = tree.order[np.concatenate(sources)]
+    j = tree.order[np.concatenate(targets)]
+    lengths = np.concatenate(lengths)
+    low, high = np.minimum(i, j), np.maximum(i, j)
+    _, first = np.unique(low * len(tree) + high, return_index=True)
+    edges = np.column_stack((low[first], high[first])).astype(np.uint32)
+    return edges, lengths[first].astype(np.float32)
+
+def knn_graph(points, k: int = DEFAULT_NEIGHBOURS, tree: KDTree = None) -> tuple:
+    """Edges from every point to its k nearest neighbours, as unique undirected pairs.
+
+    Works a tree leaf at a time: the leaf's size bounds the neighbour distance of all
+    its points, one batched traversal gathers the candidate leaves within that bound
+    for every leaf together and a small dense block per leaf picks the neighbours,
+    so the build is n log n overall.
+    Returns (edges, lengths): (m, 2) uint32 point indices with i < j and float32 lengths.
+    """
+    tree = tree if tree is not None else KDTree(points)
+    k = min(k, len(tree) - 1)
+    sources, targets, lengths = [], [], []
+    if k < 1:
+        return _undirected(tree, sources, targets, lengths)
+
+    leaves, centres, _ = _leaves(tree)
+    reach = _knn_reach(tree, leaves, centres, k)
+
+    for leaf, candidates in zip(leaves, _batched_candidates(tree, centres, reach)):
+        rows = np.arange(tree.node_start[leaf], tree.node_end[leaf])
+        dist = _block_distances(tree, rows, candidates)
+        dist[rows[:, None] == candidates[None, :]] = np.inf
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        sources.append(np.repeat(rows, k))
+        targets.append(candidates[nearest].ravel())
+        lengths.append(np.take_along_axis(dist, nearest, axis=1).ravel())
+    return _undirected(tree, sources, targets, lengths)
+
+def radius_graph(points, radius: float, tree: KDTree = None) -> tuple:
+    """Edges between every pair of points at most radius apart, same (edges, lengths) form as knn_graph."""
+    tree = tree if tree is not None else KDTree(points)
+    sources, targets, lengths = [], [], []
+    if not len(tree):
+        return _undirected(tree, sources, targets, lengths)
+
+    leaves, centres, spread = _leaves(tree)
+    for leaf, candidates in zip(leaves, _batched_candidates(tree, centres, spread + radius)):
+        rows = np.arange(tree.node_start[leaf], tree.node_end[leaf])
+        # each pair once, from the point earlier in tree order
+        candidates = candidates[candidates > rows[0]]
+        dist = _block_distances(tree, rows, candidates)
+        row, col = np.nonzero((dist <= radius) & (rows[:, None] < candidates[None, :]))
+        sources.append(rows[row])
+        targets.append(candidates[col])
+        lengths.append(dist[row, col])
+    return _undirected(tree, sources, targets, lengths)
+
+def save_graph(filename: str, edges: np.ndarray, lengths: np.ndarray) -> None:
+    np.savez(filename, edges=edges, lengths=lengths)
+
+def load_graph(filename: str) -> tuple:
+    with np.load(filename) as data:
+        return data["edges"], data["lengths"]
+
+def generate_graph(input_filename: str, graph_filename: str, k: int = DEFAULT_NEIGHBOURS, radius: float = None,
+                   index_filename: str = None) -> tuple:
+    """Connection graph over pipeline output, k nearest neighbours or every pair within radius when given."""
+    df = load_output(input_filename)
+    points = df[["x", "y", "z"]].to_numpy(dtype=np.float64)
+    tree = KDTree.load(index_filename) if index_filename else KDTree(points)
+    if radius is not None:
+        edges, lengths = radius_graph(points, radius, tree)
+    else:
+        edges, lengths = knn_graph(points, k, tree)
+    save_graph(graph_filename, edges, lengths)
+    return edges, lengths
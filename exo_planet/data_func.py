@@ -1,6 +1,16 @@
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Iterable, Iterator
+
+import numpy as np
 import pandas as pd
-from astroquery.ipac.irsa import Irsa
-from astroquery.ipac.nexsci.nasa_exoplanet_archive import NasaExoplanetArchive
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "exo_planet")
+DEFAULT_CACHE_TTL = 24 * 60 * 60
 
 def load_from_csv(filename: str) -> pd.DataFrame:
     if not filename.lower().endswith("csv"):
@@ -8,13 +18,161 @@ def load_from_csv(filename: str) -> pd.DataFrame:
     
     return pd.read_csv(filename, sep=",")
 
+def load_csv_chunks(filename: str, columns: list = None, chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+    """Iterate over a csv file in DataFrames of at most chunksize rows, reading only the given columns."""
+    if not filename.lower().endswith("csv"):
+        raise ValueError(f"{filename} is not a csv file")
+
+    return pd.read_csv(filename, sep=",", usecols=columns, chunksize=chunksize)
+
 def save_to_csv(df: pd.DataFrame, filename: str) -> None:
     if filename.lower().endswith("csv"):
         df.to_csv(filename, index=False)
     else:
         df.to_csv(filename + ".csv", index=False)
 
-def pull_from_astro_api(table: str, column_list: list) -> pd.DataFrame:
+def save_csv_chunks(chunks: Iterable[pd.DataFrame], filename: str) -> None:
+    """Write DataFrame chunks one after another into a single csv file with one header."""
+    if not filename.lower().endswith("csv"):
+        filename = filename + ".csv"
+
+    with open(filename, "w", newline="") as file:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(file, index=False, header=(i == 0))
+
+def _as_records(df) -> np.ndarray:
+    # structured arrays (such as schema.to_records output) are written as they are
+    return df if isinstance(df, np.ndarray) else df.to_records(index=False)
+
+def save_to_npy(df, filename: str) -> None:
+    """Save df as a numpy structured array with one named field per column, or a structured array as is."""
+    if not filename.lower().endswith("npy"):
+        filename = filename + ".npy"
+
+    np.save(filename, _as_records(df), allow_pickle=False)
+
+def save_npy_chunks(chunks: Iterable, filename: str) -> None:
+    """Write DataFrame (or structured array) chunks into a single npy structured array without holding them all in memory.
+
+    The row count is only known once every chunk has been seen, so records are
+    appended to a raw side file first and copied under the npy header at the end.
+    """
+    if not filename.lower().endswith("npy"):
+        filename = filename + ".npy"
+
+    raw_filename = filename + ".part"
+    rows, dtype = 0, None
+    with open(raw_filename, "wb") as file:
+        for chunk in chunks:
+            records = _as_records(chunk)
+            if dtype is None:
+                dtype = records.dtype
+            records.astype(dtype, copy=False).tofile(file)
+            rows += len(records)
+
+    if rows == 0:
+        np.save(filename, np.empty(0, dtype=dtype), allow_pickle=False)
+    else:
+        output = np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=(rows,))
+        output[:] = np.memmap(raw_filename, dtype=dtype, mode="r", shape=(rows,))
+        output.flush()
+        del output
+    os.remove(raw_filename)
+
+def load_from_npy(filename: str, mmap: bool = True) -> np.ndarray:
+    """Load a structured array written by save_to_npy, memory mapped read-only by default so columns are zero-copy."""
+    if not filename.lower().endswith("npy"):
+        raise ValueError(f"{filename} is not a npy file")
+
+    return np.load(filename, mmap_mode="r" if mmap else None, allow_pickle=False)
+
+def load_output(filename: str) -> pd.DataFrame:
+    """Load pipeline output written as csv or npy into a DataFrame."""
+    if filename.lower().endswith("npy"):
+        return pd.DataFrame(load_from_npy(filename, mmap=False))
+    return load_from_csv(filename)
+
+def load_columns(filename: str, columns: list) -> dict:
+    """Only the named columns of a csv or npy file as arrays, npy fields stay memory mapped."""
+    if filename.lower().endswith("npy"):
+        records = load_from_npy(filename)
+        return {col: records[col] for col in columns}
+    df = pd.read_csv(filename, usecols=list(dict.fromkeys(columns)))
+    return {col: df[col].to_numpy() for col in columns}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def save_png_bands(bands: Iterable[np.ndarray], filename: str, width: int, height: int, level: int = 6) -> None:
+    """Write an 8 bit RGB png from horizontal bands of (rows, width, 3) uint8 pixels, top to bottom.
+
+    Each band is compressed into its own IDAT chunk as it arrives, so only one band
+    is ever held in memory whatever the size of the image.
+    """
+    if not filename.lower().endswith("png"):
+        filename = filename + ".png"
+
+    rows = 0
+    with open(filename, "wb") as file:
+        file.write(PNG_SIGNATURE)
+        file.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        compressor = zlib.compressobj(level)
+        for band in bands:
+            band = np.asarray(band, dtype=np.uint8).reshape(-1, width * 3)
+            # every scanline starts with its filter type, 0 for none
+            scanlines = np.zeros((len(band), width * 3 + 1), dtype=np.uint8)
+            scanlines[:, 1:] = band
+            data = compressor.compress(scanlines.tobytes())
+            if data:
+                file.write(_png_chunk(b"IDAT", data))
+            rows += len(band)
+        file.write(_png_chunk(b"IDAT", compressor.flush()))
+        file.write(_png_chunk(b"IEND", b""))
+    if rows != height:
+        raise ValueError(f"png {filename} declared {height} rows but got {rows}")
+
+def save_png(image: np.ndarray, filename: str) -> None:
+    """Write a (height, width, 3) uint8 image as png."""
+    save_png_bands([image], filename, image.shape[1], image.shape[0])
+
+def pull_from_astro_api(table: str, column_list: list, client=None) -> pd.DataFrame:
     """Pull data from astroquery API and return as pandas DataFrame."""
-    result = NasaExoplanetArchive.query_criteria(table=table, select=f"{','.join(column_list)}")
-    return result.to_pandas()
\ No newline at end of file
+    if client is None:
+        # astroquery pulls in astropy and takes most of the startup time, only load it to go online
+        from astroquery.ipac.nexsci.nasa_exoplanet_archive import NasaExoplanetArchive
+        client = NasaExoplanetArchive
+    result = client.query_criteria(table=table, select=f"{','.join(column_list)}")
+    return result.to_pandas()
+
+def api_cache_paths(cache_dir: str, table: str, column_list: list) -> tuple:
+    """Data and metadata paths of the cached pull for this table and column list."""
+    key = hashlib.sha256(f"{table}:{','.join(column_list)}".encode()).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"{table}_{key}")
+    return base + ".csv", base + ".json"
+
+def pull_from_astro_api_cached(table: str, column_list: list, cache_dir: str = DEFAULT_CACHE_DIR,
+                               ttl: float = DEFAULT_CACHE_TTL, refresh: bool = False, client=None) -> pd.DataFrame:
+    """Pull data through an on-disk cache keyed by table and column list.
+
+    A cached pull is always served as is, so re-runs work offline. With refresh the
+    archive is queried again, but only when the cached pull is older than ttl seconds.
+    """
+    data_path, meta_path = api_cache_paths(cache_dir, table, column_list)
+    if os.path.exists(data_path) and os.path.exists(meta_path):
+        with open(meta_path) as file:
+            fetched_at = json.load(file)["fetched_at"]
+        if not refresh or time.time() - fetched_at < ttl:
+            return pd.read_csv(data_path, sep=",")
+
+    df = pull_from_astro_api(table, column_list, client)
+
+    # write to temp files and swap in so an interrupted run never leaves a half written cache
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_csv(data_path + ".tmp", index=False)
+    with open(meta_path + ".tmp", "w") as file:
+        json.dump({"table": table, "columns": list(column_list), "fetched_at": time.time()}, file)
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(meta_path + ".tmp", meta_path)
+    return df
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+try:
+    from .result_cache import DEFAULT_RESULT_CACHE_BYTES, DEFAULT_RESULT_CACHE_DIR, load_result, result_key, store_result
+except ImportError:
+    # For script execution
+    from result_cache import DEFAULT_RESULT_CACHE_BYTES, DEFAULT_RESULT_CACHE_DIR, load_result, result_key, store_result
+
+# part of every cached report key, bump whenever the report of the same snapshot would change
+ANALYSIS_VERSION = 1
+DEFAULT_MIN_COUNT = 10
+FIT_COLUMNS = ["count", "r", "slope", "intercept", "rmse"]
+
+def load_features(filename: str, columns: list = None) -> pd.DataFrame:
+    """Numeric columns of an archive csv, read once. Columns with fewer than two values are left out."""
+    df = pd.read_csv(filename, usecols=columns, comment="#")
+    df = df.select_dtypes(include="number").astype(np.float64)
+    return df.loc[:, df.notna().sum() >= 2]
+
+def pairwise_fits(values: np.ndarray, min_count: int = DEFAULT_MIN_COUNT) -> dict:
+    """Correlation and least squares line y = slope * x + intercept for every ordered pair of columns.
+
+    Each entry [i, j] fits column j (y) on column i (x) over the rows where both are
+    present. Missing values are masked out, every pairwise sum comes from one matrix
+    product of the (rows, columns) value and presence arrays, so all pairs are fitted
+    at once. Pairs with fewer than min_count rows or a constant column are nan.
+    Returns (columns, columns) arrays count, r, slope, intercept and rmse.
+    """
+    present = ~np.isnan(values)
+    # centre every column first so the sums below do not cancel catastrophically
+    filled = np.where(present, values, 0.0)
+    column_count = present.sum(axis=0)
+    centre = np.divide(filled.sum(axis=0), column_count, out=np.zeros(values.shape[1]), where=column_count > 0)
+    centred = np.where(present, filled - centre, 0.0)
+    mask = present.astype(np.float64)
+
+    count = mask.T @ mask
+    sum_x = centred.T @ mask
+    sum_y = sum_x.T
+    sum_xx = (centred ** 2).T @ mask
+    sum_yy = sum_xx.T
+    sum_xy = centred.T @ centred
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_x = sum_xx - sum_x ** 2 / count
+        var_y = sum_yy - sum_y ** 2 / count
+        cov = sum_xy - sum_x * sum_y / count
+        valid = (count >= max(min_count, 3)) & (var_x > 0) & (var_y > 0)
+        r = np.where(valid, cov / np.sqrt(var_x * var_y), np.nan)
+        slope = np.where(valid, cov / var_x, np.nan)
+        # back from centred to original units
+        intercept = (sum_y - slope * sum_x) / count + centre[None, :] - slope * centre[:, None]
+        rmse = np.sqrt(np.maximum(var_y - slope * cov, 0.0) / (count - 2))
+    return {
+        "count": count.astype(np.int64),
+        "r": np.clip(r, -1.0, 1.0),
+        "slope": slope,
+        "intercept": np.where(valid, intercept, np.nan),
+        "rmse": np.where(valid, rmse, np.nan),
+    }
+
+def log_values(values: np.ndarray) -> np.ndarray:
+    """log10 of positive values, everything else missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.log10(np.where(values > 0, values, np.nan))
+
+def pair_report(features: pd.DataFrame, min_count: int = DEFAULT_MIN_COUNT) -> pd.DataFrame:
+    """One row per ordered (x, y) feature pair with the linear fit and the log-log (power law) fit.
+
+    The log columns are the fit of log10(y) on log10(x) over the rows where both are
+    positive, y = 10 ** log_intercept * x ** log_slope. Sorted by the larger of |r|
+    and |log_r|, strongest relationships first.
+    """
+    values = features.to_numpy(dtype=np.float64)
+    linear = pairwise_fits(values, min_count)
+    logged = pairwise_fits(log_values(values), min_count)
+
+    names = np.asarray(features.columns, dtype=object)
+    x, y = np.nonzero(~np.eye(len(names), dtype=bool))
+    report = pd.DataFrame({"feature_x": names[x], "feature_y": names[y]})
+    for column in FIT_COLUMNS:
+        report[column] = linear[column][x, y]
+    for column in FIT_COLUMNS:
+        report[f"log_{column}"] = logged[column][x, y]
+
+    strength = np.fmax(np.abs(report["r"]), np.abs(report["log_r"]))
+    order = np.argsort(-strength.fillna(-1.0).to_numpy(), kind="stable")
+    return report.iloc[order].reset_index(drop=True)
+
+def correlation_matrix(features: pd.DataFrame, min_count: int = DEFAULT_MIN_COUNT) -> pd.DataFrame:
+    """Pairwise complete Pearson correlation of every feature, same as DataFrame.corr(min_periods=min_count)."""
+    r = pairwise_fits(features.to_numpy(dtype=np.float64), min_count)["r"]
+    np.fill_diagonal(r, 1.0)
+    return pd.DataFrame(r, index=features.columns, columns=features.columns)
+
+def generate_analysis(input_csv: str, report_csv: str, columns: list = None, min_count: int = DEFAULT_MIN_COUNT,
+                      cache_dir: str = DEFAULT_RESULT_CACHE_DIR,
+                      max_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES) -> pd.DataFrame:
+    """Write the all pairs report of an archive snapshot as csv, reusing the cached report of the same snapshot."""
+    key = None
+    if cache_dir:
+        key = result_key(input_csv, {"analysis": ANALYSIS_VERSION, "columns": columns, "min_count": min_count})
+        report = load_result(cache_dir, key)
+        if report is not None:
+            report.to_csv(report_csv, index=False)
+            return report
+
+    report = pair_report(load_features(input_csv, columns), min_count)
+    if key:
+        store_result(cache_dir, key, report, max_cache_bytes)
+    report.to_csv(report_csv, index=False)
+    return report
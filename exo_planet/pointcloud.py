@@ -0,0 +1,72 @@
+import struct
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+POINTCLOUD_MAGIC = b"EXPC"
+POINTCLOUD_VERSION = 1
+# magic, version, point count, bytes per point, largest distance from the origin
+HEADER = struct.Struct("<4sIIIf")
+# one interleaved vertex per star, ready to upload as a single buffer
+POINT_DTYPE = np.dtype([
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("z", "<f4"),
+    ("size", "<f4"),
+    ("color", "u1", (4,)),
+])
+
+def to_points(df: pd.DataFrame) -> np.ndarray:
+    """Pack pipeline output into point cloud vertices: position, st_rad as size and opaque rgba colour."""
+    points = np.empty(len(df), dtype=POINT_DTYPE)
+    for axis in "xyz":
+        points[axis] = df[axis].to_numpy()
+    points["size"] = df["st_rad"].to_numpy()
+    points["color"][:, :3] = df[["color_r", "color_g", "color_b"]].to_numpy()
+    points["color"][:, 3] = 255
+    return points
+
+def _extent(points: np.ndarray) -> float:
+    if len(points) == 0:
+        return 0.0
+    xyz = np.column_stack([points[axis] for axis in "xyz"]).astype(np.float64)
+    return float(np.sqrt((xyz ** 2).sum(axis=1)).max())
+
+def _filename(filename: str) -> str:
+    return filename if filename.lower().endswith(".bin") else filename + ".bin"
+
+def save_pointcloud_chunks(chunks: Iterable[pd.DataFrame], filename: str) -> None:
+    """Stream DataFrame chunks into a packed point cloud, the header is filled in once the count is known."""
+    filename = _filename(filename)
+    count, extent = 0, 0.0
+    with open(filename, "wb") as file:
+        file.write(bytes(HEADER.size))
+        for chunk in chunks:
+            points = to_points(chunk)
+            points.tofile(file)
+            count += len(points)
+            extent = max(extent, _extent(points))
+        file.seek(0)
+        file.write(HEADER.pack(POINTCLOUD_MAGIC, POINTCLOUD_VERSION, count, POINT_DTYPE.itemsize, extent))
+
+def save_pointcloud(df: pd.DataFrame, filename: str) -> None:
+    """Write pipeline output as a packed binary point cloud.
+
+    A 20 byte little endian header (magic "EXPC", version, point count, bytes per
+    point, largest distance from the origin) is followed by one 20 byte vertex per
+    star: float32 x, y, z and size, then uint8 r, g, b, a.
+    """
+    save_pointcloud_chunks([df], filename)
+
+def load_pointcloud(filename: str) -> tuple:
+    """(header dict, memory mapped vertices) of a file written by save_pointcloud."""
+    filename = _filename(filename)
+    with open(filename, "rb") as file:
+        magic, version, count, stride, extent = HEADER.unpack(file.read(HEADER.size))
+    if magic != POINTCLOUD_MAGIC or version != POINTCLOUD_VERSION or stride != POINT_DTYPE.itemsize:
+        raise ValueError(f"{filename} is not a version {POINTCLOUD_VERSION} point cloud")
+
+    header = {"version": version, "count": count, "stride": stride, "extent": extent}
+    if count == 0:
+        return header, np.empty(0, dtype=POINT_DTYPE)
+    return header, np.memmap(filename, dtype=POINT_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
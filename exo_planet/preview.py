@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+try:
+    from .data_func import load_columns
+    from .star_color import TEFF_RANGE, teff_to_rgb
+except ImportError:
+    # For script execution
+    from data_func import load_columns
+    from star_color import TEFF_RANGE, teff_to_rgb
+
+PREVIEW_COLUMNS = ["x", "y", "z", "st_teff", "st_rad"]
+DEFAULT_MAX_POINTS = 200_000
+# finest voxel grid per axis tried when decimating
+MAX_GRID = 4096
+MARKER_SIZE_RANGE = (1.5, 8.0)
+COLORSCALE_STOPS = 64
+# significant digits kept for coordinates in the html, float64 reprs would triple its size
+COORDINATE_DIGITS = 5
+
+def voxel_groups(points: np.ndarray, max_points: int) -> np.ndarray:
+    """Voxel of every point on the finest cubic grid with at most max_points occupied voxels.
+
+    The grid resolution is binary searched, so dense regions are thinned while
+    isolated stars keep a voxel of their own. Returns voxel ids numbered 0..m-1.
+    """
+    low = points.min(axis=0)
+    span = max(float((points.max(axis=0) - low).max()), np.finfo(np.float64).tiny)
+    groups = np.zeros(len(points), dtype=np.intp)
+    lo_res, hi_res = 1, MAX_GRID
+    while lo_res < hi_res:
+        resolution = (lo_res + hi_res + 1) // 2
+        cells = np.minimum(((points - low) / span * resolution).astype(np.int64), resolution - 1)
+        keys = (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        if len(unique) <= max_points:
+            lo_res, groups = resolution, inverse
+        else:
+            hi_res = resolution - 1
+    return groups
+
+def decimate(df: pd.DataFrame, max_points: int = DEFAULT_MAX_POINTS, density: bool = False) -> pd.DataFrame:
+    """At most max_points preview points, with the number of stars each one stands for in count.
+
+    By default every voxel keeps its largest star, so giants stay visible. With density
+    every voxel becomes one point at the mean position and mean st_teff of its stars,
+    with their largest st_rad.
+    """
+    df = df[PREVIEW_COLUMNS].reset_index(drop=True)
+    if len(df) <= max_points:
+        return df.assign(count=np.ones(len(df), dtype=np.int64))
+
+    groups = voxel_groups(df[["x", "y", "z"]].to_numpy(dtype=np.float64), max_points)
+    st_rad = df["st_rad"].to_numpy(dtype=np.float64)
+    # voxels contiguous, largest star first within each
+    order = np.lexsort((-st_rad, groups))
+    starts = np.flatnonzero(np.r_[True, np.diff(groups[order]) != 0])
+    counts = np.diff(np.r_[starts, len(order)])
+
+    if not density:
+        keep = order[starts]
+        return df.iloc[keep].reset_index(drop=True).assign(count=counts)
+
+    means = {col: np.add.reduceat(df[col].to_numpy(dtype=np.float64)[order], starts) / counts
+             for col in ["x", "y", "z", "st_teff"]}
+    return pd.DataFrame({**means, "st_rad": st_rad[order][starts], "count": counts})
+
+def _rounded(values: np.ndarray, digits: int = COORDINATE_DIGITS) -> np.ndarray:
+    extent = float(np.abs(values).max()) if len(values) else 0.0
+    decimals = max(0, digits - int(np.floor(np.log10(extent))) - 1) if extent > 0 else 0
+    return np.round(values, decimals)
+
+def _marker_sizes(st_rad: np.ndarray) -> np.ndarray:
+    """st_rad mapped linearly from its range onto MARKER_SIZE_RANGE pixels.
+
+    Pipeline st_rad is already log scaled into [0, st_rad_scaler], so no second log.
+    """
+    span = st_rad.max() - st_rad.min() if len(st_rad) else 0.0
+    scaled = (st_rad - st_rad.min()) / span if span > 0 else np.zeros_like(st_rad)
+    low, high = MARKER_SIZE_RANGE
+    return np.round(low + scaled * (high - low), 1)
+
+def teff_colorscale(log_teff_min: float, log_teff_max: float, stops: int = COLORSCALE_STOPS) -> list:
+    """Plotly colorscale of blackbody colours, evenly spaced in log st_teff between the two ends."""
+    temperatures = 10 ** np.linspace(log_teff_min, log_teff_max, stops)
+    return [[i / (stops - 1), f"rgb({r},{g},{b})"] for i, (r, g, b) in enumerate(teff_to_rgb(temperatures))]
+
+def preview_figure(points: pd.DataFrame, total: int = None) -> go.Figure:
+    """WebGL Scatter3d of preview points, coloured by st_teff and sized by st_rad.
+
+    Colours are sent as log st_teff against a blackbody colorscale, one number per
+    point instead of a colour string.
+    """
+    log_teff = np.round(np.log10(np.clip(points["st_teff"].to_numpy(dtype=np.float64), *TEFF_RANGE)), 4)
+    cmin = float(log_teff.min()) if len(log_teff) else np.log10(TEFF_RANGE[0])
+    cmax = max(float(log_teff.max()) if len(log_teff) else cmin, cmin + 1e-3)
+    total = len(points) if total is None else total
+
+    scatter = go.Scatter3d(
+        x=_rounded(points["x"].to_numpy(dtype=np.float64)),
+        y=_rounded(points["y"].to_numpy(dtype=np.float64)),
+        z=_rounded(points["z"].to_numpy(dtype=np.float64)),
+        mode="markers",
+        marker=dict(
+            size=_marker_sizes(points["st_rad"].to_numpy(dtype=np.float64)),
+            color=log_teff,
+            colorscale=teff_colorscale(cmin, cmax),
+            cmin=cmin,
+            cmax=cmax,
+            opacity=1.0,
+            line=dict(width=0),
+        ),
+        hoverinfo="skip",
+    )
+    fig = go.Figure(data=[scatter])
+    fig.update_layout(
+        title=f"{len(points)} of {total} systems",
+        paper_bgcolor="black",
+        font_color="white",
+        margin=dict(l=0, r=0, t=40, b=0),
+        scene=dict(
+            aspectmode="data",
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            zaxis=dict(visible=False),
+            bgcolor="black",
+        ),
+    )
+    return fig
+
+def write_preview(fig: go.Figure, filename: str) -> None:
+    """Write the figure as one html file with plotly.js inlined, viewable offline."""
+    fig.write_html(filename, include_plotlyjs=True, full_html=True)
+
+def generate_preview(input_filename: str, output_html: str, max_points: int = DEFAULT_MAX_POINTS,
+                     density: bool = False) -> tuple:
+    """Interactive 3d preview of pipeline output (csv or npy). Returns (points shown, systems)."""
+    df = pd.DataFrame(load_columns(input_filename, PREVIEW_COLUMNS))
+    points = decimate(df, max_points, density)
+    write_preview(preview_figure(points, len(df)), output_html)
+    return len(points), len(df)
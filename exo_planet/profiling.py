@@ -0,0 +1,116 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Iterator
+
+class Profiler:
+    """Wall time, rows in/out and optionally peak traced memory per named pipeline stage.
+
+    Stages with the same name (one per chunk, say) are summed into one entry. Stages
+    may nest: seconds is inclusive, self_seconds leaves out time spent in nested stages.
+    Each stage resets the traced peak on entry; the peak a nested stage saw is carried up
+    into the stages around it, so an enclosing stage reports the peak over its whole body.
+    """
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._child_seconds = []
+        # peak traced memory of every open stage before the latest reset
+        self._peaks = []
+        self._start = time.perf_counter()
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None) -> Iterator[dict]:
+        """Time the body as stage name; the body can set rows_out on the yielded record."""
+        record = {"rows_in": rows_in, "rows_out": None}
+        if self.trace_memory:
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+        self._child_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            child_seconds = self._child_seconds.pop()
+            if self._child_seconds:
+                self._child_seconds[-1] += seconds
+            peak = None
+            if self.trace_memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            self._add(name, seconds, seconds - child_seconds, record, peak)
+
+    def _add(self, name, seconds, self_seconds, record, peak):
+        entry = self.stages.setdefault(name, {
+            "name": name, "calls": 0, "seconds": 0.0, "self_seconds": 0.0, "rows_in": None, "rows_out": None,
+        })
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["self_seconds"] += self_seconds
+        for key in ("rows_in", "rows_out"):
+            if record[key] is not None:
+                entry[key] = (entry[key] or 0) + int(record[key])
+        if peak is not None:
+            entry["peak_memory_bytes"] = max(entry.get("peak_memory_bytes", 0), peak)
+
+    def report(self) -> dict:
+        stages = []
+        for entry in self.stages.values():
+            entry = dict(entry)
+            if entry["rows_in"] is not None and entry["rows_out"] is not None:
+                entry["rows_dropped"] = entry["rows_in"] - entry["rows_out"]
+            stages.append(entry)
+        return {
+            "total_seconds": time.perf_counter() - self._start,
+            "trace_memory": self.trace_memory,
+            "stages": stages,
+        }
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def write(self, filename: str) -> dict:
+        """Stop memory tracing and write the report as json."""
+        self.close()
+        report = self.report()
+        with open(filename, "w") as file:
+            json.dump(report, file, indent=2)
+        return report
+
+class NullProfiler:
+    """Stand-in used when profiling is off, every stage is one shared no-op context."""
+    enabled = False
+    _stage = nullcontext({"rows_in": None, "rows_out": None})
+
+    def stage(self, name: str, rows_in: int = None):
+        return self._stage
+
+NULL_PROFILER = NullProfiler()
+_EXHAUSTED = object()
+
+def profiled_iter(profiler, name: str, iterable: Iterable) -> Iterator:
+    """Yield from iterable, timing the production of each item (with len(item) as rows_out) as stage name."""
+    if not profiler.enabled:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with profiler.stage(name) as record:
+            item = next(iterator, _EXHAUSTED)
+            if item is not _EXHAUSTED:
+                record["rows_out"] = len(item)
+        if item is _EXHAUSTED:
+            return
+        yield item
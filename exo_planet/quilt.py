@@ -0,0 +1,92 @@
+import numpy as np
+try:
+    from .data_func import load_columns, save_png_bands
+except ImportError:
+    # For script execution
+    from data_func import load_columns, save_png_bands
+
+DEFAULT_TILE = 4
+SPECTRUM_SIZE = 256
+# roughly how many bytes of pixels are handed to the png writer at a time
+BAND_BYTES = 1 << 22
+
+def normalize_features(features, columns: list, log_columns=()) -> np.ndarray:
+    """Min-max scale several columns into [0, 1] at once, (n, len(columns)) float32.
+
+    features is anything indexable by column name (DataFrame, dict of arrays, structured
+    array). Columns in log_columns are scaled by log, non-positive values become nan.
+    A constant column scales to 0, missing values stay nan.
+    """
+    values = np.column_stack([np.asarray(features[col], dtype=np.float64) for col in columns])
+    logged = [i for i, col in enumerate(columns) if col in log_columns]
+    if logged:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values[:, logged] = np.log(np.where(values[:, logged] > 0, values[:, logged], np.nan))
+
+    # fmin/fmax skip nan without the all-nan warnings of nanmin/nanmax
+    col_min = np.fmin.reduce(values, axis=0)
+    col_max = np.fmax.reduce(values, axis=0)
+    span = np.where(col_max > col_min, col_max - col_min, 1.0)
+    return ((values - col_min) / span).astype(np.float32)
+
+def spectrum_lut(size: int = SPECTRUM_SIZE) -> np.ndarray:
+    """(size, 3) uint8 rainbow from violet at 0 to red at 1."""
+    hue = np.linspace(0.75, 0.0, size)
+    rgb = np.clip(np.abs((hue[:, None] * 6 + [0, 4, 2]) % 6 - 3) - 1, 0, 1)
+    return np.rint(rgb * 255).astype(np.uint8)
+
+def tile_colors(normalized: np.ndarray) -> np.ndarray:
+    """(n, 3) uint8 tile colours: one feature through the spectrum, or three features as red, green and blue.
+
+    Missing values are black (or a dark channel in a composite).
+    """
+    missing = np.isnan(normalized)
+    levels = np.where(missing, 0, normalized)
+    if normalized.shape[1] == 1:
+        colors = spectrum_lut()[np.rint(levels[:, 0] * (SPECTRUM_SIZE - 1)).astype(np.intp)]
+        colors[missing[:, 0]] = 0
+        return colors
+    if normalized.shape[1] == 3:
+        return np.rint(levels * 255).astype(np.uint8)
+    raise ValueError(f"quilt colours need 1 feature (spectrum) or 3 (rgb composite), got {normalized.shape[1]}")
+
+def quilt_shape(count: int, columns: int = None) -> tuple:
+    """(rows, columns) of tiles, square-ish unless columns is given."""
+    columns = columns or max(1, int(np.ceil(np.sqrt(count))))
+    return max(1, -(-count // columns)), columns
+
+def render_quilt(colors: np.ndarray, filename: str, columns: int = None, tile: int = DEFAULT_TILE) -> tuple:
+    """Write tile colours, in order, left to right and top to bottom, as a png of tile x tile pixel squares.
+
+    The image is produced a band of tile rows at a time straight into the png writer,
+    so memory stays at one band plus the (n, 3) colours however large the quilt.
+    Unused tiles at the end of the last row are black. Returns (rows, columns).
+    """
+    rows, columns = quilt_shape(len(colors), columns)
+    width = columns * tile
+    band_tile_rows = max(1, BAND_BYTES // (width * 3 * tile))
+
+    def bands():
+        for first_row in range(0, rows, band_tile_rows):
+            band_rows = min(band_tile_rows, rows - first_row)
+            block = np.zeros((band_rows * columns, 3), dtype=np.uint8)
+            chunk = colors[first_row * columns:(first_row + band_rows) * columns]
+            block[:len(chunk)] = chunk
+            block = block.reshape(band_rows, 1, columns, 1, 3)
+            yield np.broadcast_to(block, (band_rows, tile, columns, tile, 3)).reshape(band_rows * tile, width, 3)
+
+    save_png_bands(bands(), filename, width, rows * tile)
+    return rows, columns
+
+def generate_quilt(input_filename: str, output_png: str, color_by: list, sort_by: str, tile: int = DEFAULT_TILE,
+                   columns: int = None, log_columns=(), descending: bool = False) -> tuple:
+    """Quilt of one tile per row of a csv or npy table, coloured by color_by and ordered by sort_by.
+
+    Only the named columns are read, npy input stays memory mapped. Rows with a
+    missing sort key go last.
+    """
+    data = load_columns(input_filename, list(color_by) + [sort_by])
+    key = np.asarray(data[sort_by], dtype=np.float64)
+    order = np.argsort(-key if descending else key, kind="stable")
+    colors = tile_colors(normalize_features(data, color_by, log_columns))[order]
+    return render_quilt(colors, output_png, columns, tile)
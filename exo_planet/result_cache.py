@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+try:
+    from .data_func import DEFAULT_CACHE_DIR
+except ImportError:
+    # For script execution
+    from data_func import DEFAULT_CACHE_DIR
+
+DEFAULT_RESULT_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "results")
+DEFAULT_RESULT_CACHE_BYTES = 1 << 30
+_ENTRY_SUFFIX = ".npz"
+_COLUMNS_KEY = "__columns__"
+
+def file_digest(filename: str) -> str:
+    """sha256 of a file's contents, read in blocks."""
+    with open(filename, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+def result_key(input_filename: str, params: dict) -> str:
+    """Cache key of a result: the input's contents and the json serialisable params that produced it."""
+    payload = json.dumps({"input": file_digest(input_filename), "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key + _ENTRY_SUFFIX)
+
+def _entries(cache_dir: str) -> list:
+    if not os.path.isdir(cache_dir):
+        return []
+    return [entry for entry in os.scandir(cache_dir) if entry.is_file() and entry.name.endswith(_ENTRY_SUFFIX)]
+
+def _storable(values: np.ndarray) -> np.ndarray:
+    # string columns as fixed width unicode, object arrays would need pickling
+    return values.astype(str) if values.dtype == object else values
+
+def _restored(values: np.ndarray) -> np.ndarray:
+    return values.astype(object) if values.dtype.kind == "U" else values
+
+def load_result(cache_dir: str, key: str) -> pd.DataFrame:
+    """The cached DataFrame for key, or None. A hit marks the entry as recently used."""
+    path = _entry_path(cache_dir, key)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            columns = [str(col) for col in data[_COLUMNS_KEY]]
+            df = pd.DataFrame({col: _restored(data[f"col_{i}"]) for i, col in enumerate(columns)}, columns=columns)
+    except (OSError, KeyError, ValueError):
+        # missing, or evicted/truncated under us, is a miss
+        return None
+    os.utime(path)
+    return df
+
+def store_result(cache_dir: str, key: str, df: pd.DataFrame, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES) -> None:
+    """Store df's columns losslessly under key, then evict least recently used entries over max_bytes.
+
+    Columns are kept as their own arrays with their exact dtypes (string columns as
+    str objects), the index is not kept.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(cache_dir, key)
+    arrays = {f"col_{i}": _storable(df[col].to_numpy()) for i, col in enumerate(df.columns)}
+    # write to a temp file and swap in so a reader never sees a half written entry
+    with open(path + ".tmp", "wb") as file:
+        np.savez(file, **{_COLUMNS_KEY: np.array([str(col) for col in df.columns])}, **arrays)
+    os.replace(path + ".tmp", path)
+    evict(cache_dir, max_bytes, keep=path)
+
+def evict(cache_dir: str, max_bytes: int, keep: str = None) -> int:
+    """Delete least recently used entries until the cache fits max_bytes, never keep. Returns entries deleted."""
+    entries = sorted(_entries(cache_dir), key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in entries)
+    deleted = 0
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if entry.path == keep:
+            continue
+        total -= entry.stat().st_size
+        os.remove(entry.path)
+        deleted += 1
+    return deleted
+
+def clear_cache(cache_dir: str) -> int:
+    """Delete every cached result. Returns entries deleted."""
+    entries = _entries(cache_dir)
+    for entry in entries:
+        os.remove(entry.path)
+    return len(entries)
@@ -1,59 +1,282 @@
 import argparse
+from typing import Iterator
 import numpy as np
 import pandas as pd
 try:
-    from .data_func import load_from_csv, save_to_csv, pull_from_astro_api
+    from .transform_kernel import spherical_to_cartesian
+    from .star_color import COLOR_COLUMNS, teff_to_rgb
+    from .schema import to_records
+    from .pointcloud import save_pointcloud, save_pointcloud_chunks
+    from .profiling import NULL_PROFILER, Profiler, profiled_iter
+    from .result_cache import DEFAULT_RESULT_CACHE_BYTES, DEFAULT_RESULT_CACHE_DIR, clear_cache, load_result, result_key, store_result
+    from .data_func import (
+        load_from_csv, load_csv_chunks, save_to_csv, save_csv_chunks, save_to_npy, save_npy_chunks,
+        pull_from_astro_api, pull_from_astro_api_cached, DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL
+    )
 except ImportError:
     # For script execution
-    from data_func import load_from_csv, save_to_csv, pull_from_astro_api
+    from transform_kernel import spherical_to_cartesian
+    from star_color import COLOR_COLUMNS, teff_to_rgb
+    from schema import to_records
+    from pointcloud import save_pointcloud, save_pointcloud_chunks
+    from profiling import NULL_PROFILER, Profiler, profiled_iter
+    from result_cache import DEFAULT_RESULT_CACHE_BYTES, DEFAULT_RESULT_CACHE_DIR, clear_cache, load_result, result_key, store_result
+    from data_func import (
+        load_from_csv, load_csv_chunks, save_to_csv, save_csv_chunks, save_to_npy, save_npy_chunks,
+        pull_from_astro_api, pull_from_astro_api_cached, DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL
+    )
 
 SCALE_FACTOR_CONST = 70000
+ST_RAD_SCALER = 3
+REQUIRED_COLUMNS = ["ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
+SYSTEM_KEY = "hostname"
+# decimals a host position is rounded to when there is no hostname to group planets by
+SYSTEM_ROUNDING = {"ra": 5, "dec": 5, "sy_dist": 3}
+OUTPUT_FORMATS = ["csv", "npy", "pointcloud"]
+DEFAULT_PROFILE_REPORT = "profile.json"
+# part of every result cache key, bump whenever the same input and parameters would give different output
+PIPELINE_VERSION = 1
 
-def linear_scale(df, col, scaler=1) -> pd.DataFrame:
+def linear_scale(df, col, scaler=1, bounds=None) -> pd.DataFrame:
+    """Min-max scale col into [0, scaler], using bounds=(min, max) instead of the column's own when given."""
     df = df.copy()
-    df[col] = (df[col] - df[col].min()) / (df[col].max() - df[col].min()) * scaler
+    col_min, col_max = bounds if bounds is not None else (df[col].min(), df[col].max())
+    df[col] = (df[col] - col_min) / (col_max - col_min) * scaler
     return df
 
-def convert_to_cart(df) -> pd.DataFrame:
+def convert_to_cart(df, dtype=np.float64) -> pd.DataFrame:
     df = df.copy()
-    df["x"] = df["sy_dist"] * np.cos(np.deg2rad(df["dec"])) * np.cos(np.deg2rad(df["ra"]))
-    df["y"] = df["sy_dist"] * np.cos(np.deg2rad(df["dec"])) * np.sin(np.deg2rad(df["ra"]))
-    df["z"] = df["sy_dist"] * np.sin(np.deg2rad(df["dec"]))
+    xyz = spherical_to_cartesian(df["ra"].to_numpy(), df["dec"].to_numpy(), df["sy_dist"].to_numpy(), dtype=dtype)
+    df["x"], df["y"], df["z"] = xyz
     return df
 
-def convert_scale_clean_df(input_df: pd.DataFrame) -> pd.DataFrame:
-    # ensure working with only required columns from df
-    df_filtered = input_df[["ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]].copy()
+def system_keys(df: pd.DataFrame) -> list:
+    """Group keys naming the host system of each row: hostname when present, else rounded ra/dec/dist."""
+    if SYSTEM_KEY in df.columns:
+        return [df[SYSTEM_KEY]]
+    # renamed so the key levels never clash with the columns they were rounded from
+    return [df[col].round(decimals).rename(f"system_{col}") for col, decimals in SYSTEM_ROUNDING.items()]
 
-    # delete dup planets around same star
-    df_filtered.dropna(inplace=True)
-    df_filtered.drop_duplicates(subset=["sy_dist"], inplace=True)
+def _system_aggregations(count: tuple, max_rade: tuple) -> dict:
+    # host columns from the system's first row; pl_rade from its first planet with a known radius
+    return {**{col: (col, "first") for col in REQUIRED_COLUMNS}, "planet_count": count, "max_pl_rade": max_rade}
 
-    # convert polar to cartesian coords
-    df_scaled = linear_scale(df_filtered, "sy_dist", SCALE_FACTOR_CONST)
-    df_scaled_cart = convert_to_cart(df_scaled)
+def group_systems(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per host system of a planet table, in order of first appearance, with planet_count and max_pl_rade.
 
-    # scale greater than 10 radius by log (some stars are so massive, taking artistic liberty for visualization)
-    df_scaled_cart["st_rad"] = np.log(df_scaled_cart["st_rad"])
+    A single hash grouped pass over the system keys; the result is indexed by system key.
+    """
+    grouped = df.groupby(system_keys(df), sort=False)
+    return grouped.agg(**_system_aggregations(("pl_rade", "size"), ("pl_rade", "max")))
+
+def merge_systems(parts: list) -> pd.DataFrame:
+    """Combine group_systems results of consecutive pieces of one table as if grouped in one go."""
+    systems = pd.concat(parts)
+    grouped = systems.groupby(level=list(range(systems.index.nlevels)), sort=False)
+    return grouped.agg(**_system_aggregations(("planet_count", "sum"), ("max_pl_rade", "max")))
+
+def clean_planets(input_df: pd.DataFrame, profiler=NULL_PROFILER) -> pd.DataFrame:
+    """Planet rows (required columns as float, and hostname) with a known host position, before grouping."""
+    with profiler.stage("clean", len(input_df)) as record:
+        # ensure working with only required columns from df
+        # float for every column so separately read chunks always agree on dtypes
+        df_filtered = input_df[REQUIRED_COLUMNS].astype("float64")
+        if SYSTEM_KEY in input_df.columns:
+            df_filtered[SYSTEM_KEY] = input_df[SYSTEM_KEY]
+
+        # a planet without a radius still counts towards its system, one without a host position does not
+        df_filtered.dropna(subset=[col for col in df_filtered.columns if col != "pl_rade"], inplace=True)
+        record["rows_out"] = len(df_filtered)
+    return df_filtered
+
+def _clean_systems(input_df: pd.DataFrame, profiler=NULL_PROFILER) -> pd.DataFrame:
+    df_filtered = clean_planets(input_df, profiler)
+    with profiler.stage("group_systems", len(df_filtered)) as record:
+        systems = group_systems(df_filtered)
+        record["rows_out"] = len(systems)
+    return systems
+
+def _with_known_radius(systems: pd.DataFrame, profiler=NULL_PROFILER) -> pd.DataFrame:
+    with profiler.stage("drop_unknown_radius", len(systems)) as record:
+        systems = systems[systems["pl_rade"].notna()]
+        record["rows_out"] = len(systems)
+    return systems
+
+def clean_df(input_df: pd.DataFrame, profiler=NULL_PROFILER) -> pd.DataFrame:
+    # one row per host system instead of one per planet, systems without any planet radius dropped
+    return _with_known_radius(_clean_systems(input_df, profiler), profiler)
 
+def compute_bounds(df: pd.DataFrame) -> dict:
+    """Global min/max used by linear_scale for sy_dist and log(st_rad) of a cleaned DataFrame."""
+    log_rad = np.log(df["st_rad"])
+    return {
+        "sy_dist": (df["sy_dist"].min(), df["sy_dist"].max()),
+        "st_rad": (log_rad.min(), log_rad.max()),
+    }
+
+def scale_clean_df(df: pd.DataFrame, bounds: dict, dtype=np.float64, scale_factor: float = SCALE_FACTOR_CONST,
+                   st_rad_scaler: float = ST_RAD_SCALER) -> pd.DataFrame:
+    # same result as linear_scale on sy_dist followed by convert_to_cart, but scaled and converted
+    # in one kernel pass without the intermediate DataFrame copies
+    df_scaled_cart = df.copy()
+    scaled_dist = np.empty(len(df), dtype=dtype)
+    xyz = spherical_to_cartesian(df["ra"].to_numpy(), df["dec"].to_numpy(), df["sy_dist"].to_numpy(), dtype=dtype,
+                                 dist_bounds=bounds["sy_dist"], scaler=scale_factor, scaled_dist_out=scaled_dist)
+    df_scaled_cart["sy_dist"] = scaled_dist
+    # coordinates and star colour straight after the required columns, ahead of the per system statistics
+    rgb = teff_to_rgb(df["st_teff"].to_numpy())
+    new_columns = list(zip("xyz", xyz)) + list(zip(COLOR_COLUMNS, rgb.T))
+    for position, (column, values) in enumerate(new_columns, start=len(REQUIRED_COLUMNS)):
+        df_scaled_cart.insert(position, column, values)
+
+    # scale greater than 10 radius by log (some stars are so massive, taking artistic liberty for visualization)
     # after normalizing radius, rescale to look good in scene
-    df_scaled_cart = linear_scale(df_scaled_cart, "st_rad", 3)
+    rad_min, rad_max = bounds["st_rad"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df_scaled_cart["st_rad"] = (np.log(df["st_rad"].to_numpy()) - rad_min) / (rad_max - rad_min) * st_rad_scaler
 
     return df_scaled_cart
 
-def generate_from_local_csv(input_csv_filename: str, output_csv: str) -> None:
-    df = load_from_csv(input_csv_filename)
-    df_scaled_cart = convert_scale_clean_df(df)
+def convert_scale_clean_df(input_df: pd.DataFrame, dtype=np.float64, scale_factor: float = SCALE_FACTOR_CONST,
+                           st_rad_scaler: float = ST_RAD_SCALER, profiler=NULL_PROFILER) -> pd.DataFrame:
+    df_filtered = clean_df(input_df, profiler)
+    with profiler.stage("scale_transform", len(df_filtered)) as record:
+        df_scaled_cart = scale_clean_df(df_filtered, compute_bounds(df_filtered), dtype, scale_factor, st_rad_scaler)
+        record["rows_out"] = len(df_scaled_cart)
+    return df_scaled_cart
+
+def clean_csv_chunked(input_csv_filename: str, chunksize: int, profiler=NULL_PROFILER) -> pd.DataFrame:
+    """clean_df of a csv read chunk by chunk, merging systems whose planets span chunk boundaries.
+
+    Grouped chunks are buffered and merged into the systems so far once the buffer holds
+    as many rows as they do, so every system is regrouped a logarithmic number of times
+    instead of once per chunk. Peak memory is one chunk of planets plus about two rows
+    per host system.
+    """
+    wanted = set(REQUIRED_COLUMNS + [SYSTEM_KEY])
+    systems = _clean_systems(pd.DataFrame(columns=REQUIRED_COLUMNS))
+    pending, pending_rows = [], 0
+
+    def merged():
+        parts = ([systems] if len(systems) else []) + pending
+        if len(parts) == 1:
+            return parts[0]
+        with profiler.stage("merge_systems", len(systems) + pending_rows) as record:
+            result = merge_systems(parts)
+            record["rows_out"] = len(result)
+        return result
+
+    chunks = load_csv_chunks(input_csv_filename, lambda col: col in wanted, chunksize)
+    for chunk in profiled_iter(profiler, "load", chunks):
+        part = _clean_systems(chunk, profiler)
+        pending.append(part)
+        pending_rows += len(part)
+        if pending_rows >= len(systems):
+            systems = merged()
+            pending, pending_rows = [], 0
+    if pending:
+        systems = merged()
+    return _with_known_radius(systems, profiler)
+
+def convert_scale_clean_chunks(input_csv_filename: str, chunksize: int, dtype=np.float64,
+                               profiler=NULL_PROFILER) -> Iterator[pd.DataFrame]:
+    """Stream the cleaned, scaled and converted input chunk by chunk with bounded memory.
+
+    The input is read once into per system rows, which are then scaled and yielded
+    chunksize systems at a time, so the planet table is never held whole.
+    """
+    systems = clean_csv_chunked(input_csv_filename, chunksize, profiler)
+    bounds = compute_bounds(systems)
+    # at least one chunk, so an empty input still writes its header
+    for start in range(0, max(len(systems), 1), chunksize):
+        chunk = systems.iloc[start:start + chunksize]
+        with profiler.stage("scale_transform", len(chunk)) as record:
+            chunk = scale_clean_df(chunk, bounds, dtype)
+            record["rows_out"] = len(chunk)
+        yield chunk
+
+def save_output(df: pd.DataFrame, output: str, output_format: str = "csv") -> None:
+    if output_format == "npy":
+        # packed to the versioned catalogue schema, see schema.py
+        save_to_npy(to_records(df), output)
+    elif output_format == "pointcloud":
+        save_pointcloud(df, output)
+    else:
+        save_to_csv(df, output)
+
+def pipeline_params(dtype=np.float64, scale_factor: float = SCALE_FACTOR_CONST,
+                    st_rad_scaler: float = ST_RAD_SCALER) -> dict:
+    """Everything besides the input that decides the output of convert_scale_clean_df, for result cache keys."""
+    return {
+        "version": PIPELINE_VERSION,
+        "columns": REQUIRED_COLUMNS,
+        "system_key": SYSTEM_KEY,
+        "scale_factor": scale_factor,
+        "st_rad_scaler": st_rad_scaler,
+        "dtype": np.dtype(dtype).name,
+    }
+
+def generate_from_local_csv(input_csv_filename: str, output_csv: str, chunksize: int = None,
+                            output_format: str = "csv", dtype=np.float64, profiler=NULL_PROFILER,
+                            cache_dir: str = None, max_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES) -> None:
+    """Clean, scale and write a local csv.
+
+    With cache_dir the result of an earlier run on the same input contents and
+    parameters is written straight from the cache, and new results are stored there.
+    """
+    key = None
+    if cache_dir:
+        with profiler.stage("cache_lookup") as record:
+            key = result_key(input_csv_filename, pipeline_params(dtype))
+            df_scaled_cart = load_result(cache_dir, key)
+            record["rows_out"] = 0 if df_scaled_cart is None else len(df_scaled_cart)
+        if df_scaled_cart is not None:
+            with profiler.stage("write", len(df_scaled_cart)):
+                save_output(df_scaled_cart, output_csv, output_format)
+            return
+
+    if chunksize and key is None:
+        chunks = convert_scale_clean_chunks(input_csv_filename, chunksize, dtype, profiler)
+        # streamed, so the write stage includes producing the chunks (see self_seconds for the write alone)
+        with profiler.stage("write"):
+            if output_format == "npy":
+                save_npy_chunks((to_records(chunk) for chunk in chunks), output_csv)
+            elif output_format == "pointcloud":
+                save_pointcloud_chunks(chunks, output_csv)
+            else:
+                save_csv_chunks(chunks, output_csv)
+        return
+
+    if chunksize:
+        # the whole result is needed to cache it, chunks only bound the memory of reading and cleaning
+        df_scaled_cart = pd.concat(list(convert_scale_clean_chunks(input_csv_filename, chunksize, dtype, profiler)))
+    else:
+        with profiler.stage("load") as record:
+            df = load_from_csv(input_csv_filename)
+            record["rows_out"] = len(df)
+        df_scaled_cart = convert_scale_clean_df(df, dtype, profiler=profiler)
+    if key:
+        with profiler.stage("cache_store", len(df_scaled_cart)):
+            store_result(cache_dir, key, df_scaled_cart, max_cache_bytes)
     # output new csv for blender consumption
-    save_to_csv(df_scaled_cart, output_csv)
+    with profiler.stage("write", len(df_scaled_cart)):
+        save_output(df_scaled_cart, output_csv, output_format)
 
-def generate_from_api(output_csv: str) -> None:
-    column_list = ["ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
+def generate_from_api(output_csv: str, output_format: str = "csv", cache_dir: str = None,
+                      refresh: bool = False, ttl: float = DEFAULT_CACHE_TTL, dtype=np.float64,
+                      profiler=NULL_PROFILER) -> None:
+    column_list = [SYSTEM_KEY] + REQUIRED_COLUMNS
     table = "ps"
-    df = pull_from_astro_api(table, column_list)
-    df_scaled_cart = convert_scale_clean_df(df)
+    with profiler.stage("download") as record:
+        if cache_dir:
+            df = pull_from_astro_api_cached(table, column_list, cache_dir, ttl, refresh)
+        else:
+            df = pull_from_astro_api(table, column_list)
+        record["rows_out"] = len(df)
+    df_scaled_cart = convert_scale_clean_df(df, dtype, profiler=profiler)
     # output new csv for blender consumption
-    save_to_csv(df_scaled_cart, output_csv)
+    with profiler.stage("write", len(df_scaled_cart)):
+        save_output(df_scaled_cart, output_csv, output_format)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate scaled exoplanet data for visualization")
@@ -62,17 +285,245 @@ if __name__ == "__main__":
     parser_local = subparsers.add_parser("local", help="Generate scaled data from local CSV file")
     parser_local.add_argument("input_csv", type=str, help="Input CSV filename")
     parser_local.add_argument("output_csv", type=str, help="Output CSV filename")
+    parser_local.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output format, npy writes a memory mappable structured array, pointcloud a packed vertex buffer")
+    parser_local.add_argument("--float32", action="store_true", help="Store x/y/z and scaled sy_dist as float32 for render-bound consumers")
+    parser_local.add_argument("--chunksize", type=int, default=None, help="Stream the input this many rows at a time to bound memory")
+    parser_local.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_REPORT, default=None, help="Write per stage timing and row counts as json to this file")
+    parser_local.add_argument("--profile-memory", action="store_true", help="Also record peak traced memory per stage with --profile")
+    parser_local.add_argument("--cache-dir", type=str, default=DEFAULT_RESULT_CACHE_DIR, help="Directory of cached results, keyed by input contents and parameters. The CLI caches by default, generate_from_local_csv only when given a cache_dir")
+    parser_local.add_argument("--cache-size", type=float, default=DEFAULT_RESULT_CACHE_BYTES / 2 ** 20, help="Cache size in MB, least recently used results are evicted beyond it")
+    parser_local.add_argument("--no-cache", action="store_true", help="Always recompute and do not touch the result cache")
+    parser_local.add_argument("--clear-cache", action="store_true", help="Delete every cached result before running")
     # Parser for API data 
     parser_api = subparsers.add_parser("api", help="Generate scaled data from astroquery API")
     parser_api.add_argument("output_csv", type=str, help="Output CSV filename")
+    parser_api.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output format, npy writes a memory mappable structured array, pointcloud a packed vertex buffer")
+    parser_api.add_argument("--float32", action="store_true", help="Store x/y/z and scaled sy_dist as float32 for render-bound consumers")
+    parser_api.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory for the cached raw API pull")
+    parser_api.add_argument("--no-cache", action="store_true", help="Always query the archive and do not touch the cache")
+    parser_api.add_argument("--refresh", action="store_true", help="Re-download if the cached pull is older than --ttl")
+    parser_api.add_argument("--ttl", type=float, default=DEFAULT_CACHE_TTL / 3600, help="Cache time to live in hours for --refresh")
+    parser_api.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_REPORT, default=None, help="Write per stage timing and row counts as json to this file")
+    parser_api.add_argument("--profile-memory", action="store_true", help="Also record peak traced memory per stage with --profile")
+    # Parser for the banded archive download
+    parser_download = subparsers.add_parser("download", help="Download the archive table in concurrent, resumable ra bands to a local CSV")
+    parser_download.add_argument("output_csv", type=str, help="Output CSV filename of the raw table, input for local")
+    parser_download.add_argument("--table", type=str, default="ps", help="Archive table to download")
+    parser_download.add_argument("--band-dir", type=str, default=None, help="Directory for the per band files, defaults to output_csv.bands")
+    parser_download.add_argument("--bands", type=int, default=36, help="Number of ra bands the query is split into")
+    parser_download.add_argument("--concurrency", type=int, default=4, help="Bands downloaded at the same time")
+    # Parser for incremental update between two archive snapshots
+    parser_incremental = subparsers.add_parser("incremental", help="Update a previous output from the changes between two local CSV snapshots")
+    parser_incremental.add_argument("old_csv", type=str, help="Previous snapshot CSV filename")
+    parser_incremental.add_argument("new_csv", type=str, help="New snapshot CSV filename")
+    parser_incremental.add_argument("previous_output", type=str, help="Output previously generated from old_csv")
+    parser_incremental.add_argument("output_csv", type=str, help="Output CSV filename")
+    parser_incremental.add_argument("delta_csv", type=str, help="Delta CSV filename of added, removed and changed systems")
+    parser_incremental.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Output format, npy writes a memory mappable structured array, pointcloud a packed vertex buffer")
+    # Parser for batch jobs
+    parser_batch = subparsers.add_parser("batch", help="Run a json manifest of local input to output jobs across a process pool")
+    parser_batch.add_argument("manifest", type=str, help="Manifest json with a list of jobs")
+    parser_batch.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the cpu count")
+    parser_batch.add_argument("--report", type=str, default=None, help="Write per job timing as json to this file")
+
+    # Parser for the spatial index
+    parser_index = subparsers.add_parser("index", help="Build a k-d tree spatial index over generated output")
+    parser_index.add_argument("input", type=str, help="Generated output filename (csv or npy)")
+    parser_index.add_argument("index_npz", type=str, help="Output index filename (npz)")
+    parser_index.add_argument("--leaf-size", type=int, default=16, help="Maximum points per tree leaf")
+    # Parser for the connection graph
+    parser_graph = subparsers.add_parser("graph", help="Nearest neighbour or distance threshold connections between systems")
+    parser_graph.add_argument("input", type=str, help="Generated output filename (csv or npy)")
+    parser_graph.add_argument("graph_npz", type=str, help="Output edge list filename (npz)")
+    parser_graph.add_argument("--k", type=int, default=3, help="Connect every system to this many nearest neighbours")
+    parser_graph.add_argument("--radius", type=float, default=None, help="Connect every pair of systems within this distance instead")
+    parser_graph.add_argument("--index", type=str, default=None, help="Prebuilt spatial index from the index subcommand")
+    # Parser for camera path visibility
+    parser_visibility = subparsers.add_parser("visibility", help="Per segment visible stars and level of detail along a camera path")
+    parser_visibility.add_argument("input", type=str, help="Generated output filename (csv or npy)")
+    parser_visibility.add_argument("camera_json", type=str, help="Camera path json with keyframed positions, targets and fov")
+    parser_visibility.add_argument("visibility_npz", type=str, help="Output visibility filename (npz)")
+    parser_visibility.add_argument("--index", type=str, default=None, help="Prebuilt spatial index from the index subcommand")
+    parser_visibility.add_argument("--segment-frames", type=int, default=24, help="Frames per visibility segment")
+    # Parser for the software splat fly-through preview
+    parser_splat = subparsers.add_parser("splat", help="Render numbered preview pngs of a camera path without Blender")
+    parser_splat.add_argument("input", type=str, help="Generated output filename (csv or npy)")
+    parser_splat.add_argument("camera_json", type=str, help="Camera path json with keyframed positions, targets and fov")
+    parser_splat.add_argument("output_dir", type=str, help="Directory for the frame_NNNNN.png files")
+    parser_splat.add_argument("--width", type=int, default=480, help="Frame width in pixels, height follows the camera aspect")
+    parser_splat.add_argument("--frames", type=int, nargs=2, default=None, metavar=("FIRST", "LAST"), help="Render only these frames")
+    parser_splat.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of CPUs")
+    parser_splat.add_argument("--exposure", type=float, default=1.5, help="Brightness before tone mapping")
+    parser_splat.add_argument("--glow", type=float, default=3.0, help="Strength of the glow around stars, 0 for none")
+    # Parser for the interactive 3d preview
+    parser_preview = subparsers.add_parser("preview", help="Self-contained interactive WebGL 3d html preview of generated output")
+    parser_preview.add_argument("input", type=str, help="Generated output filename (csv or npy)")
+    parser_preview.add_argument("output_html", type=str, help="Output html filename")
+    parser_preview.add_argument("--max-points", type=int, default=200_000, help="Decimate on a voxel grid down to at most this many points")
+    parser_preview.add_argument("--density", action="store_true", help="Average every voxel into one point instead of keeping its largest star")
+    # Parser for the catalogue http service
+    parser_serve = subparsers.add_parser("serve", help="Serve the latest catalogue over http, regenerated on a schedule")
+    parser_serve.add_argument("input_csv", type=str, nargs="?", default=None, help="Local raw snapshot CSV to watch, the cached API pull when omitted")
+    parser_serve.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser_serve.add_argument("--port", type=int, default=8000, help="Port to listen on, 0 for any free port")
+    parser_serve.add_argument("--interval", type=float, default=1.0, help="Hours between refreshes of the snapshot")
+    parser_serve.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory for the cached raw API pull")
+    parser_serve.add_argument("--verbose", action="store_true", help="Log every request")
+    # Parser for the all pairs feature analysis
+    parser_analyze = subparsers.add_parser("analyze", help="Correlation, linear and log-log fits of every pair of archive columns")
+    parser_analyze.add_argument("input_csv", type=str, help="Archive snapshot CSV filename, such as a PSCompPars export")
+    parser_analyze.add_argument("report_csv", type=str, help="Output report CSV filename, one row per feature pair")
+    parser_analyze.add_argument("--columns", type=str, nargs="+", default=None, help="Only analyse these columns, all numeric columns by default")
+    parser_analyze.add_argument("--min-count", type=int, default=10, help="Fewest rows with both values for a pair to be fitted")
+    parser_analyze.add_argument("--top", type=int, default=10, help="Print this many of the strongest pairs")
+    parser_analyze.add_argument("--cache-dir", type=str, default=DEFAULT_RESULT_CACHE_DIR, help="Directory of cached reports, keyed by snapshot contents")
+    parser_analyze.add_argument("--no-cache", action="store_true", help="Always recompute and do not touch the cache")
+    # Parser for the spike ball geometry
+    parser_spikes = subparsers.add_parser("spikes", help="Spike ball line buffers, one line from the origin towards every system or planet")
+    parser_spikes.add_argument("input_csv", type=str, help="Input CSV filename of the raw archive table")
+    parser_spikes.add_argument("spikes_npz", type=str, help="Output spike buffers filename (npz)")
+    parser_spikes.add_argument("--per-planet", action="store_true", help="One spike per planet instead of one per host system")
+    parser_spikes.add_argument("--length-by", type=str, default=None, help="Log scale spike lengths by this column, such as sy_dist or pl_rade")
+    parser_spikes.add_argument("--radius", type=float, default=1.0, help="Length of the longest spike")
+    # Parser for the feature quilt image
+    parser_quilt = subparsers.add_parser("quilt", help="PNG of one coloured tile per row, coloured by features and sorted by another")
+    parser_quilt.add_argument("input", type=str, help="Input filename (csv or npy), raw or generated")
+    parser_quilt.add_argument("output_png", type=str, help="Output image filename (png)")
+    parser_quilt.add_argument("--color-by", type=str, nargs="+", required=True, help="One column for a colour spectrum or three for an rgb composite")
+    parser_quilt.add_argument("--sort-by", type=str, required=True, help="Column ordering the tiles")
+    parser_quilt.add_argument("--descending", action="store_true", help="Largest sort value first")
+    parser_quilt.add_argument("--log", type=str, nargs="*", default=[], help="Colour columns to scale logarithmically")
+    parser_quilt.add_argument("--tile", type=int, default=4, help="Tile size in pixels")
+    parser_quilt.add_argument("--columns", type=int, default=None, help="Tiles per row, square by default")
 
     # parse args and call appropriate function
     args = parser.parse_args()
+    profiler = NULL_PROFILER
+    if getattr(args, "profile", None):
+        profiler = Profiler(trace_memory=args.profile_memory)
     if args.command == "local":
-        generate_from_local_csv(args.input_csv, args.output_csv)
-        print(f"Generated CSV from local data ready for blender at {args.output_csv}")
+        if args.clear_cache:
+            print(f"Cleared {clear_cache(args.cache_dir)} cached results from {args.cache_dir}")
+        cache_dir = None if args.no_cache else args.cache_dir
+        dtype = np.float32 if args.float32 else np.float64
+        generate_from_local_csv(args.input_csv, args.output_csv, args.chunksize, args.format, dtype, profiler,
+                                cache_dir, int(args.cache_size * 2 ** 20))
+        print(f"Generated {args.format} from local data ready for blender at {args.output_csv}")
     elif args.command == "api":
-        generate_from_api(args.output_csv)
-        print(f"Generated CSV from API data ready for blender at {args.output_csv}")
+        cache_dir = None if args.no_cache else args.cache_dir
+        dtype = np.float32 if args.float32 else np.float64
+        generate_from_api(args.output_csv, args.format, cache_dir, args.refresh, args.ttl * 3600, dtype, profiler)
+        print(f"Generated {args.format} from API data ready for blender at {args.output_csv}")
+    elif args.command == "download":
+        try:
+            from .archive_download import generate_download
+        except ImportError:
+            from archive_download import generate_download
+        band_dir = generate_download(args.table, [SYSTEM_KEY] + REQUIRED_COLUMNS, args.output_csv, args.band_dir, args.bands, args.concurrency)
+        print(f"Downloaded {args.table} to {args.output_csv}, bands kept in {band_dir} for resuming")
+    elif args.command == "incremental":
+        try:
+            from .snapshot_delta import generate_incremental
+        except ImportError:
+            from snapshot_delta import generate_incremental
+        counts = generate_incremental(args.old_csv, args.new_csv, args.previous_output, args.output_csv, args.delta_csv, args.format)
+        print(f"Generated incremental output at {args.output_csv} and delta at {args.delta_csv}: {counts}")
+    elif args.command == "batch":
+        try:
+            from .batch import generate_batch
+        except ImportError:
+            from batch import generate_batch
+        report = generate_batch(args.manifest, args.workers, args.report)
+        for loaded in report["inputs"]:
+            print(f"{loaded['input']}: {loaded['rows']} systems loaded and cleaned in {loaded['load_seconds']:.3f}s")
+        for job in report["jobs"]:
+            print(f"{job['output']}: {job['rows']} rows in {job['total_seconds']:.3f}s "
+                  f"(transform {job['transform_seconds']:.3f}s, save {job['save_seconds']:.3f}s)")
+        print(f"Generated {len(report['jobs'])} outputs in {report['wall_seconds']:.3f}s")
+    elif args.command == "index":
+        try:
+            from .spatial_index import generate_index
+        except ImportError:
+            from spatial_index import generate_index
+        tree = generate_index(args.input, args.index_npz, args.leaf_size)
+        print(f"Generated spatial index over {len(tree)} systems at {args.index_npz}")
+    elif args.command == "graph":
+        try:
+            from .connection_graph import generate_graph
+        except ImportError:
+            from connection_graph import generate_graph
+        edges, _ = generate_graph(args.input, args.graph_npz, args.k, args.radius, args.index)
+        print(f"Generated {len(edges)} connections at {args.graph_npz}")
+    elif args.command == "visibility":
+        try:
+            from .camera_culling import generate_visibility
+        except ImportError:
+            from camera_culling import generate_visibility
+        visibility = generate_visibility(args.input, args.camera_json, args.visibility_npz, args.index, args.segment_frames)
+        print(f"Generated visibility for {len(visibility['segment_start'])} segments at {args.visibility_npz}")
+    elif args.command == "splat":
+        try:
+            from .splat_render import generate_splat
+        except ImportError:
+            from splat_render import generate_splat
+        filenames = generate_splat(args.input, args.camera_json, args.output_dir, args.width, args.frames, args.workers,
+                                   args.exposure, args.glow)
+        print(f"Rendered {len(filenames)} frames to {args.output_dir}")
+    elif args.command == "preview":
+        try:
+            from .preview import generate_preview
+        except ImportError:
+            from preview import generate_preview
+        shown, total = generate_preview(args.input, args.output_html, args.max_points, args.density)
+        print(f"Generated preview of {shown} of {total} systems at {args.output_html}")
+    elif args.command == "serve":
+        try:
+            from .catalogue_server import cached_pull_source, serve_catalogue
+        except ImportError:
+            from catalogue_server import cached_pull_source, serve_catalogue
+        interval = args.interval * 3600
+        source = (lambda: args.input_csv) if args.input_csv else cached_pull_source(args.cache_dir, interval)
+        server = serve_catalogue(source, args.host, args.port, interval, args.verbose)
+        host, port = server.server_address[:2]
+        print(f"Serving {server.store.status['rows']} systems at http://{host}:{port}/catalogue.csv (and .npy, /status)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop.set()
+            server.server_close()
+    elif args.command == "analyze":
+        try:
+            from .feature_analysis import generate_analysis
+        except ImportError:
+            from feature_analysis import generate_analysis
+        cache_dir = None if args.no_cache else args.cache_dir
+        report = generate_analysis(args.input_csv, args.report_csv, args.columns, args.min_count, cache_dir)
+        for pair in report.head(args.top).itertuples():
+            print(f"  {pair.feature_y} ~ {pair.feature_x}: r {pair.r:.3f}, log-log r {pair.log_r:.3f} "
+                  f"(y = {10 ** pair.log_intercept:.4g} * x^{pair.log_slope:.3f}) over {pair.count} rows")
+        print(f"Wrote {len(report)} feature pairs to {args.report_csv}")
+    elif args.command == "spikes":
+        try:
+            from .spike_ball import generate_spike_ball
+        except ImportError:
+            from spike_ball import generate_spike_ball
+        buffers = generate_spike_ball(args.input_csv, args.spikes_npz, args.per_planet, args.length_by, args.radius)
+        print(f"Generated {len(buffers['edges'])} spikes at {args.spikes_npz}")
+    elif args.command == "quilt":
+        try:
+            from .quilt import generate_quilt
+        except ImportError:
+            from quilt import generate_quilt
+        rows, columns = generate_quilt(args.input, args.output_png, args.color_by, args.sort_by, args.tile,
+                                       args.columns, args.log, args.descending)
+        print(f"Generated {rows} x {columns} tile quilt at {args.output_png}")
     else:
-        parser.print_help()
\ No newline at end of file
+        parser.print_help()
+    if profiler.enabled:
+        report = profiler.write(args.profile)
+        for stage in report["stages"]:
+            rows = f", rows {stage['rows_in']} -> {stage['rows_out']}" if stage.get("rows_dropped") is not None else ""
+            print(f"  {stage['name']}: {stage['self_seconds']:.3f}s over {stage['calls']} calls{rows}")
+        print(f"Wrote profile report to {args.profile}")
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# bump whenever a field is added, removed, reordered or changes type
+SCHEMA_VERSION = 1
+
+SCHEMAS = {
+    1: np.dtype([
+        ("ra", np.float32),
+        ("dec", np.float32),
+        ("sy_dist", np.float32),
+        ("pl_rade", np.float32),
+        ("st_rad", np.float32),
+        ("st_teff", np.uint16),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("z", np.float32),
+        ("color_r", np.uint8),
+        ("color_g", np.uint8),
+        ("color_b", np.uint8),
+        ("planet_count", np.uint16),
+        ("max_pl_rade", np.float32),
+    ]),
+}
+
+def schema_dtype(version: int = SCHEMA_VERSION) -> np.dtype:
+    if version not in SCHEMAS:
+        raise ValueError(f"unknown catalogue schema version {version}")
+    return SCHEMAS[version]
+
+def schema_version(dtype: np.dtype) -> int:
+    """Version of the schema a structured dtype was written with, None when it matches none."""
+    for version, schema in SCHEMAS.items():
+        if np.dtype(dtype) == schema:
+            return version
+    return None
+
+def to_records(df: pd.DataFrame, version: int = SCHEMA_VERSION) -> np.ndarray:
+    """Pack the pipeline output into a structured array of the given schema version.
+
+    Fields are taken by name, so the column order of df does not matter and extra
+    columns are left out. Integer fields are rounded and clamped into their type's range.
+    """
+    dtype = schema_dtype(version)
+    missing = [name for name in dtype.names if name not in df.columns]
+    if missing:
+        raise ValueError(f"output is missing schema v{version} columns {missing}")
+
+    records = np.empty(len(df), dtype=dtype)
+    for name in dtype.names:
+        values = df[name].to_numpy()
+        field_type = dtype[name]
+        if np.issubdtype(field_type, np.integer):
+            limits = np.iinfo(field_type)
+            values = np.clip(np.rint(values), limits.min, limits.max)
+        records[name] = values
+    return records
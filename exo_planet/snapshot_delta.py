@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+try:
+    from .data_func import load_from_csv, load_output, save_to_csv
+    from .scale_transform_data import SYSTEM_KEY, clean_df, compute_bounds, scale_clean_df, save_output
+except ImportError:
+    # For script execution
+    from data_func import load_from_csv, load_output, save_to_csv
+    from scale_transform_data import SYSTEM_KEY, clean_df, compute_bounds, scale_clean_df, save_output
+
+POSITION_COLUMNS = ["ra", "dec", "sy_dist"]
+DELTA_STATUSES = ["added", "removed", "moved", "updated", "rescaled"]
+
+def keyed_clean_df(input_df: pd.DataFrame) -> pd.DataFrame:
+    """clean_df indexed by system key, rows in the same order as convert_scale_clean_df output."""
+    if SYSTEM_KEY not in input_df.columns:
+        raise ValueError(f"snapshot has no {SYSTEM_KEY} column to key systems on")
+
+    # clean_df already groups planets by hostname, one row per key
+    df = clean_df(input_df)
+    df.index = df.index.astype(str).rename(SYSTEM_KEY)
+    return df
+
+def diff_snapshots(old_df: pd.DataFrame, new_df: pd.DataFrame) -> dict:
+    """Split system keys of two keyed snapshots into added, removed, moved, updated and unchanged."""
+    common = old_df.index.intersection(new_df.index, sort=False)
+    columns = old_df.columns.intersection(new_df.columns, sort=False)
+    old_common = old_df.loc[common, columns]
+    new_common = new_df.loc[common, columns]
+    differs = old_common.ne(new_common)
+
+    moved = differs[POSITION_COLUMNS].any(axis=1)
+    updated = differs.any(axis=1) & ~moved
+    return {
+        "added": new_df.index.difference(old_df.index, sort=False),
+        "removed": old_df.index.difference(new_df.index, sort=False),
+        "moved": common[moved.to_numpy()],
+        "updated": common[updated.to_numpy()],
+        "unchanged": common[~differs.any(axis=1).to_numpy()],
+    }
+
+def reusable_output(previous_output: pd.DataFrame, old_df: pd.DataFrame, bounds: dict) -> pd.DataFrame:
+    """previous_output with the dtypes of scale_clean_df output, or None when its rows cannot be reused.
+
+    It has to line up with old_df row for row with the same columns and float dtypes
+    (npy output is float32, those rows would be mixed into float64 ones), and its rows
+    holding the largest sy_dist and st_rad have to come out again from scale_clean_df
+    with bounds, so output written with other scale parameters is not reused either.
+    Integer columns are cast, csv reads them back as int64.
+    """
+    if len(previous_output) != len(old_df) or not len(old_df):
+        return None
+    probe = np.unique([np.argmax(old_df["sy_dist"].to_numpy()), np.argmax(old_df["st_rad"].to_numpy())])
+    expected = scale_clean_df(old_df.iloc[probe], bounds)
+    if list(previous_output.columns) != list(expected.columns):
+        return None
+    floats = expected.select_dtypes(include="floating").columns
+    if not previous_output[floats].dtypes.equals(expected[floats].dtypes):
+        return None
+    if not np.allclose(previous_output[floats].to_numpy()[probe], expected[floats].to_numpy(), equal_nan=True):
+        return None
+    return previous_output.astype(expected.dtypes.to_dict())
+
+def apply_snapshot_delta(old_df: pd.DataFrame, new_df: pd.DataFrame, previous_output: pd.DataFrame) -> tuple:
+    """Transform new_df reusing previous_output rows of systems that did not change.
+
+    previous_output must be the pipeline output for old_df, row for row. Every row is
+    recomputed when the linear_scale bounds moved or previous_output cannot be reused
+    (see reusable_output). Returns the new output (same rows as convert_scale_clean_df
+    of the new snapshot) and a delta frame with one status row per added, removed,
+    moved, updated or rescaled system.
+    """
+    diff = diff_snapshots(old_df, new_df)
+    bounds = compute_bounds(new_df)
+    previous = reusable_output(previous_output, old_df, bounds) if compute_bounds(old_df) == bounds else None
+    rescale = previous is None
+
+    if rescale:
+        output = scale_clean_df(new_df, bounds)
+    else:
+        parts = [previous.set_axis(old_df.index, axis=0).loc[diff["unchanged"]]]
+        changed = new_df.index.difference(diff["unchanged"], sort=False)
+        if len(changed):
+            parts.append(scale_clean_df(new_df.loc[changed], bounds))
+        output = pd.concat(parts).loc[new_df.index]
+
+    statuses = [pd.Series(status, index=diff[status]) for status in ["added", "moved", "updated"]]
+    if rescale:
+        statuses.append(pd.Series("rescaled", index=diff["unchanged"]))
+    status = pd.concat(statuses)
+
+    delta = pd.concat([
+        output.loc[status.index].assign(status=status),
+        pd.DataFrame({"status": "removed"}, index=diff["removed"]),
+    ])
+    delta = delta.rename_axis(SYSTEM_KEY).reset_index()[["status", SYSTEM_KEY] + output.columns.tolist()]
+    return output.reset_index(drop=True), delta
+
+def generate_incremental(old_csv: str, new_csv: str, previous_output: str, output: str,
+                         delta_csv: str, output_format: str = "csv") -> dict:
+    """Incremental counterpart of generate_from_local_csv between two archive snapshots.
+
+    Writes the full new output plus a small delta csv for consumers that only apply
+    changes, and returns the number of systems per delta status.
+    """
+    old_df = keyed_clean_df(load_from_csv(old_csv))
+    new_df = keyed_clean_df(load_from_csv(new_csv))
+    df_output, delta = apply_snapshot_delta(old_df, new_df, load_output(previous_output))
+
+    save_output(df_output, output, output_format)
+    save_to_csv(delta, delta_csv)
+    counts = delta["status"].value_counts()
+    return {status: int(counts.get(status, 0)) for status in DELTA_STATUSES}
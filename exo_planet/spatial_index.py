@@ -0,0 +1,231 @@
+import heapq
+import numpy as np
+import pandas as pd
+try:
+    from .data_func import load_output
+except ImportError:
+    # For script execution
+    from data_func import load_output
+
+DEFAULT_LEAF_SIZE = 16
+
+class KDTree:
+    """Static k-d tree over 3d points with radius, k nearest neighbour and frustum queries.
+
+    Points are reordered so every node owns a contiguous slice [start, end) of the
+    tree ordered points, and every node keeps its axis aligned bounding box so whole
+    subtrees can be accepted or rejected at once. All queries return indices into
+    the original point order.
+    """
+
+    def __init__(self, points, leaf_size: int = DEFAULT_LEAF_SIZE):
+        points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        order = np.arange(len(points))
+        starts, ends, lefts, rights, mins, maxs = [], [], [], [], [], []
+
+        stack = [(0, len(points), -1, False)]
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                (rights if is_right else lefts)[parent] = node
+            node_points = points[order[start:end]]
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            mins.append(node_points.min(axis=0) if end > start else np.zeros(3))
+            maxs.append(node_points.max(axis=0) if end > start else np.zeros(3))
+
+            if end - start > leaf_size:
+                # split at the median of the widest axis
+                dim = int(np.argmax(maxs[-1] - mins[-1]))
+                mid = (start + end) // 2
+                part = np.argpartition(node_points[:, dim], mid - start)
+                order[start:end] = order[start:end][part]
+                stack.append((mid, end, node, True))
+                stack.append((start, mid, node, False))
+
+        self.order = order
+        self.points = points[order]
+        self.node_start = np.array(starts, dtype=np.int64)
+        self.node_end = np.array(ends, dtype=np.int64)
+        self.node_left = np.array(lefts, dtype=np.int64)
+        self.node_right = np.array(rights, dtype=np.int64)
+        self.node_min = np.array(mins, dtype=np.float64).reshape(-1, 3)
+        self.node_max = np.array(maxs, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _box_dist2(self, node: int, point: np.ndarray) -> float:
+        """Squared distance from point to the bounding box of node, 0 inside."""
+        gap = np.maximum(np.maximum(self.node_min[node] - point, point - self.node_max[node]), 0.0)
+        return float(gap @ gap)
+
+    def _collect(self, test_boxes, test_points) -> np.ndarray:
+        """Walk the tree one level at a time with vectorized box tests.
+
+        test_boxes(mins, maxs) returns (outside, inside) masks for a batch of nodes,
+        test_points(points) the mask of points kept from partially covered leaves.
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+
+        accepted, partial = [], []
+        frontier = np.zeros(1, dtype=np.int64)
+        while len(frontier):
+            outside, inside = test_boxes(self.node_min[frontier], self.node_max[frontier])
+            accepted.append(frontier[inside & ~outside])
+            frontier = frontier[~outside & ~inside]
+            is_leaf = self.node_left[frontier] < 0
+            partial.append(frontier[is_leaf])
+            frontier = np.concatenate([self.node_left[frontier[~is_leaf]], self.node_right[frontier[~is_leaf]]])
+
+        accepted = np.concatenate(accepted)
+        partial = np.concatenate(partial)
+        candidates = _ranges(self.node_start[partial], self.node_end[partial])
+        kept = candidates[test_points(self.points[candidates])]
+        rows = np.concatenate([_ranges(self.node_start[accepted], self.node_end[accepted]), kept])
+        return self.order[rows]
+
+    def query_radius(self, center, radius: float) -> np.ndarray:
+        """Indices of all points within radius of center."""
+        center = np.asarray(center, dtype=np.float64)
+        r2 = radius * radius
+
+        def test_boxes(mins, maxs):
+            gap = np.maximum(np.maximum(mins - center, center - maxs), 0.0)
+            far = np.maximum(np.abs(mins - center), np.abs(maxs - center))
+            return np.einsum("ij,ij->i", gap, gap) > r2, np.einsum("ij,ij->i", far, far) <= r2
+
+        def test_points(points):
+            diff = points - center
+            return np.einsum("ij,ij->i", diff, diff) <= r2
+
+        return self._collect(test_boxes, test_points)
+
+    def query_knn(self, point, k: int) -> tuple:
+        """Indices and distances of the k points nearest to point, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self))
+        best_idx = np.empty(0, dtype=np.int64)
+        best_d2 = np.empty(0, dtype=np.float64)
+        bound = np.inf
+
+        heap = [(0.0, 0)] if k > 0 else []
+        while heap:
+            box_d2, node = heapq.heappop(heap)
+            if box_d2 > bound:
+                break
+            if self.node_left[node] >= 0:
+                for child in (self.node_left[node], self.node_right[node]):
+                    child_d2 = self._box_dist2(child, point)
+                    if child_d2 <= bound:
+                        heapq.heappush(heap, (child_d2, child))
+                continue
+
+            start, end = self.node_start[node], self.node_end[node]
+            diff = self.points[start:end] - point
+            best_idx = np.concatenate([best_idx, np.arange(start, end)])
+            best_d2 = np.concatenate([best_d2, np.einsum("ij,ij->i", diff, diff)])
+            if len(best_d2) > k:
+                keep = np.argpartition(best_d2, k - 1)[:k]
+                best_idx, best_d2 = best_idx[keep], best_d2[keep]
+            if len(best_d2) == k:
+                bound = best_d2.max()
+
+        nearest = np.argsort(best_d2, kind="stable")
+        return self.order[best_idx[nearest]], np.sqrt(best_d2[nearest])
+
+    def query_frustum(self, planes) -> np.ndarray:
+        """Indices of all points on the inner side of every plane.
+
+        planes is an (m, 4) array of (nx, ny, nz, d) with normals pointing into the
+        volume, a point p is inside when n . p + d >= 0 for every plane.
+        """
+        planes = np.asarray(planes, dtype=np.float64).reshape(-1, 4)
+        normals, offsets = planes[:, :3], planes[:, 3]
+        positive = normals >= 0
+
+        def test_boxes(mins, maxs):
+            # box corner farthest along each normal decides if the box is fully outside a plane,
+            # the nearest corner if it is fully inside
+            mins, maxs = mins[:, None, :], maxs[:, None, :]
+            farthest = np.einsum("nij,ij->ni", np.where(positive, maxs, mins), normals) + offsets
+            nearest = np.einsum("nij,ij->ni", np.where(positive, mins, maxs), normals) + offsets
+            return np.any(farthest < 0, axis=1), np.all(nearest >= 0, axis=1)
+
+        def test_points(points):
+            return np.all(points @ normals.T + offsets >= 0, axis=1)
+
+        return self._collect(test_boxes, test_points)
+
+    def save(self, filename: str) -> None:
+        """Save the built tree as an npz file that load restores without rebuilding."""
+        np.savez(filename, order=self.order, points=self.points, node_start=self.node_start,
+                 node_end=self.node_end, node_left=self.node_left, node_right=self.node_right,
+                 node_min=self.node_min, node_max=self.node_max)
+
+    @classmethod
+    def load(cls, filename: str) -> "KDTree":
+        tree = cls.__new__(cls)
+        with np.load(filename, allow_pickle=False) as data:
+            for name in ("order", "points", "node_start", "node_end", "node_left", "node_right", "node_min", "node_max"):
+                setattr(tree, name, data[name])
+        return tree
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, end) for every pair, without a python loop."""
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+def build_index_from_df(df: pd.DataFrame, leaf_size: int = DEFAULT_LEAF_SIZE) -> KDTree:
+    """k-d tree over the x/y/z columns of convert_scale_clean_df output, indices are row positions."""
+    return KDTree(df[["x", "y", "z"]].to_numpy(dtype=np.float64), leaf_size)
+
+def generate_index(input_filename: str, index_filename: str, leaf_size: int = DEFAULT_LEAF_SIZE) -> KDTree:
+    """Build the k-d tree of a pipeline output file and save it next to it for consumers."""
+    tree = build_index_from_df(load_output(input_filename), leaf_size)
+    tree.save(index_filename)
+    return tree
+
+def camera_axes(position, target, up=(0.0, 0.0, 1.0)) -> tuple:
+    """Unit (right, up, forward) vectors of a camera at position looking at target."""
+    forward = np.asarray(target, dtype=np.float64) - np.asarray(position, dtype=np.float64)
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, up)
+    if np.linalg.norm(right) < 1e-9:
+        # looking straight along up, any perpendicular will do
+        right = np.cross(forward, (1.0, 0.0, 0.0) if abs(forward[0]) < 0.9 else (0.0, 1.0, 0.0))
+    right /= np.linalg.norm(right)
+    return right, np.cross(right, forward), forward
+
+def frustum_planes(position, target, fov: float, aspect: float = 1.0, near: float = 0.1,
+                   far: float = np.inf, up=(0.0, 0.0, 1.0)) -> np.ndarray:
+    """Inward facing planes of a perspective camera at position looking at target.
+
+    fov is the vertical field of view in degrees. Returns the (m, 4) plane array
+    used by KDTree.query_frustum, without a far plane when far is infinite.
+    """
+    position = np.asarray(position, dtype=np.float64)
+    right, cam_up, forward = camera_axes(position, target, up)
+
+    tan_v = np.tan(np.deg2rad(fov) / 2)
+    tan_h = tan_v * aspect
+    normals = [
+        forward,
+        forward * tan_h + right,
+        forward * tan_h - right,
+        forward * tan_v + cam_up,
+        forward * tan_v - cam_up,
+    ]
+    points = [position + forward * near] + [position] * 4
+    if np.isfinite(far):
+        normals.append(-forward)
+        points.append(position + forward * far)
+
+    normals = np.array([n / np.linalg.norm(n) for n in normals])
+    offsets = -np.einsum("ij,ij->i", normals, np.array(points))
+    return np.column_stack((normals, offsets))
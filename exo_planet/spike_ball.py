@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+try:
+    from .data_func import load_from_csv
+    from .scale_transform_data import clean_df, clean_planets
+    from .star_color import teff_to_rgb
+    from .transform_kernel import spherical_to_cartesian
+except ImportError:
+    # For script execution
+    from data_func import load_from_csv
+    from scale_transform_data import clean_df, clean_planets
+    from star_color import teff_to_rgb
+    from transform_kernel import spherical_to_cartesian
+
+DEFAULT_RADIUS = 1.0
+# shortest spike as a fraction of the radius when lengths follow a column
+MIN_LENGTH_FRACTION = 0.2
+
+def spike_lengths(values: np.ndarray, radius: float = DEFAULT_RADIUS) -> np.ndarray:
+    """Spike lengths log scaled from values into [MIN_LENGTH_FRACTION, 1] * radius.
+
+    Missing or non-positive values get the shortest spike.
+    """
+    if not len(values):
+        return np.empty(0, dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logged = np.log(np.where(values > 0, values, np.nan))
+    low, high = np.fmin.reduce(logged), np.fmax.reduce(logged)
+    scaled = (logged - low) / (high - low) if high > low else np.ones_like(logged)
+    fraction = MIN_LENGTH_FRACTION + (1 - MIN_LENGTH_FRACTION) * np.nan_to_num(scaled, nan=0.0)
+    return (radius * fraction).astype(np.float32)
+
+def spike_buffers(ra: np.ndarray, dec: np.ndarray, st_teff: np.ndarray, lengths=DEFAULT_RADIUS) -> dict:
+    """Every spike as one line segment from the origin towards ra/dec, in flat render buffers.
+
+    Spike i is vertices 2i (the origin) and 2i + 1 (its tip) joined by edge i, so
+    every spike has its own two vertices and can carry its own colour. Returns
+    vertices (2n, 3) float32, edges (n, 2) uint32 and colors (2n, 4) uint8 sRGB
+    of the host star temperature, opaque.
+    """
+    count = len(ra)
+    tips = spherical_to_cartesian(ra, dec, np.broadcast_to(np.asarray(lengths, dtype=np.float32), (count,)),
+                                  dtype=np.float32)
+    vertices = np.zeros((2 * count, 3), dtype=np.float32)
+    vertices[1::2] = tips.T
+    colors = np.full((2 * count, 4), 255, dtype=np.uint8)
+    colors[:, :3] = np.repeat(teff_to_rgb(st_teff), 2, axis=0)
+    return {
+        "vertices": vertices,
+        "edges": np.arange(2 * count, dtype=np.uint32).reshape(count, 2),
+        "colors": colors,
+    }
+
+def save_spike_ball(filename: str, buffers: dict) -> None:
+    np.savez(filename, **buffers)
+
+def load_spike_ball(filename: str) -> dict:
+    with np.load(filename) as data:
+        return {name: data[name] for name in ("vertices", "edges", "colors")}
+
+def spike_ball(input_df: pd.DataFrame, per_planet: bool = False, length_by: str = None,
+               radius: float = DEFAULT_RADIUS) -> dict:
+    """Spike ball buffers of a raw planet table: one spike per host system, or one per planet with per_planet.
+
+    Systems are those of the star pipeline (clean_df); per planet spikes use every
+    planet row with a known host position. Spikes are radius long, or log scaled by
+    the length_by column, such as sy_dist or pl_rade.
+    """
+    rows = clean_planets(input_df) if per_planet else clean_df(input_df)
+    lengths = radius if length_by is None else spike_lengths(rows[length_by].to_numpy(dtype=np.float64), radius)
+    return spike_buffers(rows["ra"].to_numpy(), rows["dec"].to_numpy(), rows["st_teff"].to_numpy(), lengths)
+
+def generate_spike_ball(input_csv: str, output_npz: str, per_planet: bool = False, length_by: str = None,
+                        radius: float = DEFAULT_RADIUS) -> dict:
+    """Spike ball buffers of a local archive csv saved as npz for the Blender loader."""
+    buffers = spike_ball(load_from_csv(input_csv), per_planet, length_by, radius)
+    save_spike_ball(output_npz, buffers)
+    return buffers
@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+try:
+    from .camera_culling import camera_at_frame, frame_range, load_camera_path
+    from .data_func import load_columns, save_png
+    from .spatial_index import camera_axes
+    from .star_color import srgb_decode, srgb_encode, teff_to_rgb
+except ImportError:
+    # For script execution
+    from camera_culling import camera_at_frame, frame_range, load_camera_path
+    from data_func import load_columns, save_png
+    from spatial_index import camera_axes
+    from star_color import srgb_decode, srgb_encode, teff_to_rgb
+
+DEFAULT_WIDTH = 480
+DEFAULT_EXPOSURE = 1.5
+DEFAULT_GLOW = 3.0
+# box blur radius in pixels of the glow, three passes approximate a gaussian
+GLOW_RADIUS = 3
+# stars are drawn as disks up to this radius in pixels, nearer stars are clamped to it
+MAX_SPLAT_RADIUS = 8
+# least brightness of a star smaller than a pixel, so far stars stay visible as faint dots
+DOT_FLOOR = 0.2
+# frames x stars projected in one batched product, bounds the (frames, stars, 3) temporaries
+BATCH_POINTS = 1 << 22
+
+def _disk_offsets(radius: int) -> tuple:
+    span = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(span, span)
+    inside = dx ** 2 + dy ** 2 <= radius ** 2 + radius
+    return dx[inside], dy[inside]
+
+DISK_OFFSETS = [_disk_offsets(radius) for radius in range(MAX_SPLAT_RADIUS + 1)]
+
+def star_colors(st_teff: np.ndarray) -> np.ndarray:
+    """Linear (n, 3) float32 blackbody colours, for adding light in the frame buffer."""
+    return srgb_decode(teff_to_rgb(st_teff) / 255.0).astype(np.float32)
+
+def camera_frames(camera_path: dict, frames) -> tuple:
+    """(positions (f, 3), rotations (f, 3, 3), tan of half the vertical fov (f,)) at each frame.
+
+    Rotation rows are the camera right, up and forward axes, so rotation @ (point - position)
+    is the point in camera space.
+    """
+    positions, rotations, tan_half = [], [], []
+    for frame in frames:
+        position, target, fov = camera_at_frame(camera_path, frame)
+        positions.append(position)
+        rotations.append(np.array(camera_axes(position, target)))
+        tan_half.append(np.tan(np.deg2rad(fov) / 2))
+    return np.array(positions).reshape(-1, 3), np.array(rotations).reshape(-1, 3, 3), np.array(tan_half)
+
+def project(points: np.ndarray, positions: np.ndarray, rotations: np.ndarray) -> np.ndarray:
+    """Camera space (frames, n, 3) coordinates of every point for every frame in one product."""
+    offsets = np.einsum("fij,fj->fi", rotations, positions)
+    return np.einsum("fij,nj->fni", rotations, points) - offsets[:, None, :]
+
+def splat_frame(camera_space: np.ndarray, radii: np.ndarray, colors: np.ndarray, focal: float, width: int,
+                height: int, near: float = 0.1) -> np.ndarray:
+    """Add every star in front of the camera into a (height, width, 3) linear frame buffer.
+
+    Stars are disks of their projected radius (clamped to MAX_SPLAT_RADIUS), stars
+    under a pixel give the light of their area but no less than DOT_FLOOR. All stars
+    of one disk size are added together with bincount.
+    """
+    depth = camera_space[:, 2]
+    ahead = depth > near
+    depth = np.where(ahead, depth, 1.0)
+    x = width / 2 + focal * camera_space[:, 0] / depth
+    y = height / 2 - focal * camera_space[:, 1] / depth
+    radius = radii * focal / depth
+    reach = np.minimum(radius, MAX_SPLAT_RADIUS) + 1
+    visible = np.flatnonzero(ahead & (x > -reach) & (x < width + reach) & (y > -reach) & (y < height + reach))
+
+    x, y, radius = x[visible], y[visible], radius[visible]
+    level = np.minimum(np.rint(radius), MAX_SPLAT_RADIUS).astype(np.intp)
+    brightness = np.where(level == 0, np.clip(np.pi * radius ** 2, DOT_FLOOR, 1.0), 1.0)
+    light = colors[visible] * brightness[:, None]
+    column, row = np.floor(x).astype(np.intp), np.floor(y).astype(np.intp)
+
+    buffer = np.zeros((3, height * width))
+    for disk in np.unique(level):
+        stars = np.flatnonzero(level == disk)
+        dx, dy = DISK_OFFSETS[disk]
+        pixel_x = (column[stars, None] + dx).ravel()
+        pixel_y = (row[stars, None] + dy).ravel()
+        owner = np.repeat(stars, len(dx))
+        inside = (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+        pixel = pixel_y[inside] * width + pixel_x[inside]
+        for channel in range(3):
+            buffer[channel] += np.bincount(pixel, weights=light[owner[inside], channel], minlength=height * width)
+    return buffer.reshape(3, height, width).transpose(1, 2, 0)
+
+def _box_blur(image: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    image = np.moveaxis(image, axis, 0)
+    summed = np.cumsum(np.pad(image, [(radius + 1, radius)] + [(0, 0)] * (image.ndim - 1)), axis=0)
+    blurred = (summed[2 * radius + 1:] - summed[:-2 * radius - 1]) / (2 * radius + 1)
+    return np.moveaxis(blurred, 0, axis)
+
+def add_glow(image: np.ndarray, strength: float = DEFAULT_GLOW, radius: int = GLOW_RADIUS) -> np.ndarray:
+    """The image plus strength times a wide gaussian-like blur of itself, light bleeding around bright stars."""
+    glow = image
+    for _ in range(3):
+        glow = _box_blur(_box_blur(glow, radius, 0), radius, 1)
+    return image + strength * glow
+
+def tone_map(image: np.ndarray, exposure: float = DEFAULT_EXPOSURE) -> np.ndarray:
+    """Linear light to sRGB uint8, saturating smoothly instead of clipping where stars pile up."""
+    return np.rint(srgb_encode(1.0 - np.exp(-exposure * image)) * 255).astype(np.uint8)
+
+def frame_filename(output_dir: str, frame: int) -> str:
+    return os.path.join(output_dir, f"frame_{frame:05d}.png")
+
+def render_frames(scene: dict, frames, output_dir: str, width: int, height: int, exposure: float = DEFAULT_EXPOSURE,
+                  glow: float = DEFAULT_GLOW) -> list:
+    """Render frames of scene (points, radii, colors, camera_path) to numbered pngs in output_dir.
+
+    Frames are projected in batches of as many as fit BATCH_POINTS.
+    """
+    points, camera_path = scene["points"], scene["camera_path"]
+    near = camera_path.get("near", 0.1)
+    frames = list(frames)
+    batch = max(1, BATCH_POINTS // max(len(points), 1))
+    filenames = []
+    for start in range(0, len(frames), batch):
+        batch_frames = frames[start:start + batch]
+        positions, rotations, tan_half = camera_frames(camera_path, batch_frames)
+        for frame, camera_space, tan in zip(batch_frames, project(points, positions, rotations), tan_half):
+            image = splat_frame(camera_space, scene["radii"], scene["colors"], height / (2 * tan), width, height, near)
+            filename = frame_filename(output_dir, frame)
+            save_png(tone_map(add_glow(image, glow), exposure), filename)
+            filenames.append(filename)
+    return filenames
+
+# scene of the worker processes, handed over once by the pool initializer instead of with every range
+_SCENE = {}
+
+def _init_worker(scene: dict) -> None:
+    _SCENE.update(scene)
+
+def _render_range(task: tuple) -> list:
+    first, last, *settings = task
+    return render_frames(_SCENE, range(first, last + 1), *settings)
+
+def render_path(scene: dict, output_dir: str, width: int, height: int, frames: tuple = None, workers: int = None,
+                exposure: float = DEFAULT_EXPOSURE, glow: float = DEFAULT_GLOW) -> list:
+    """Render the (first, last) frames of the scene's camera path, all of it by default, across a process pool.
+
+    The frames are split into contiguous ranges, a few per worker so uneven frames
+    balance out. Returns the png filenames in frame order.
+    """
+    first, last = frames or frame_range(scene["camera_path"])
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    count = last - first + 1
+    if workers == 1 or count <= 1:
+        return render_frames(scene, range(first, last + 1), output_dir, width, height, exposure, glow)
+
+    step = -(-count // (workers * 4))
+    tasks = [(start, min(start + step - 1, last), output_dir, width, height, exposure, glow)
+             for start in range(first, last + 1, step)]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context,
+                             initializer=_init_worker, initargs=(scene,)) as executor:
+        return [filename for filenames in executor.map(_render_range, tasks) for filename in filenames]
+
+def generate_splat(input_filename: str, camera_json: str, output_dir: str, width: int = DEFAULT_WIDTH,
+                   frames: tuple = None, workers: int = None, exposure: float = DEFAULT_EXPOSURE,
+                   glow: float = DEFAULT_GLOW) -> list:
+    """Preview pngs of pipeline output (csv or npy) along a camera path, height from the path's aspect."""
+    data = load_columns(input_filename, ["x", "y", "z", "st_rad", "st_teff"])
+    camera_path = load_camera_path(camera_json)
+    scene = {
+        "points": np.column_stack([np.asarray(data[axis], dtype=np.float64) for axis in "xyz"]),
+        "radii": np.asarray(data["st_rad"], dtype=np.float64),
+        "colors": star_colors(data["st_teff"]),
+        "camera_path": camera_path,
+    }
+    height = max(1, round(width / camera_path.get("aspect", 16 / 9)))
+    return render_path(scene, output_dir, width, height, frames, workers, exposure, glow)
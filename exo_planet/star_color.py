@@ -0,0 +1,67 @@
+from functools import lru_cache
+import numpy as np
+
+# temperatures outside this range are clamped to its ends
+TEFF_RANGE = (1000.0, 40000.0)
+LUT_STEP = 10.0
+COLOR_COLUMNS = ["color_r", "color_g", "color_b"]
+
+# visible wavelengths in nm the spectrum is integrated over
+_WAVELENGTHS = np.arange(380.0, 781.0, 5.0)
+# second radiation constant hc/k in nm K
+_PLANCK_C2 = 1.4388e7
+_XYZ_TO_LINEAR_SRGB = np.array([
+    [3.2406, -1.5372, -0.4986],
+    [-0.9689, 1.8758, 0.0415],
+    [0.0557, -0.2040, 1.0570],
+])
+
+def _lobe(wavelength, mean, sigma_low, sigma_high):
+    sigma = np.where(wavelength < mean, sigma_low, sigma_high)
+    return np.exp(-0.5 * ((wavelength - mean) / sigma) ** 2)
+
+def cie_color_matching(wavelength: np.ndarray) -> np.ndarray:
+    """CIE 1931 2 degree colour matching functions as a (3, n) array, by the multi-lobe fit of Wyman, Sloan and Shirley."""
+    x_bar = (1.056 * _lobe(wavelength, 599.8, 37.9, 31.0) + 0.362 * _lobe(wavelength, 442.0, 16.0, 26.7)
+             - 0.065 * _lobe(wavelength, 501.1, 20.4, 26.2))
+    y_bar = 0.821 * _lobe(wavelength, 568.8, 46.9, 40.5) + 0.286 * _lobe(wavelength, 530.9, 16.3, 31.1)
+    z_bar = 1.217 * _lobe(wavelength, 437.0, 11.8, 36.0) + 0.681 * _lobe(wavelength, 459.0, 26.0, 13.8)
+    return np.array([x_bar, y_bar, z_bar])
+
+def blackbody_rgb(teff: np.ndarray) -> np.ndarray:
+    """Linear sRGB colour of a blackbody at each temperature in K, (n, 3) scaled so the brightest channel is 1."""
+    teff = np.asarray(teff, dtype=np.float64)
+    # Planck's law up to a constant, which the normalisation below removes
+    radiance = _WAVELENGTHS ** -5 / np.expm1(_PLANCK_C2 / np.outer(teff, _WAVELENGTHS))
+    xyz = radiance @ cie_color_matching(_WAVELENGTHS).T
+    rgb = np.clip(xyz @ _XYZ_TO_LINEAR_SRGB.T, 0.0, None)
+    return rgb / rgb.max(axis=1, keepdims=True)
+
+def srgb_encode(linear: np.ndarray) -> np.ndarray:
+    """Apply the sRGB transfer curve to linear values in [0, 1]."""
+    return np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+
+def srgb_decode(encoded: np.ndarray) -> np.ndarray:
+    """Invert srgb_encode, sRGB values in [0, 1] back to linear."""
+    return np.where(encoded <= 0.04045, encoded / 12.92, np.power((encoded + 0.055) / 1.055, 2.4))
+
+@lru_cache(maxsize=None)
+def blackbody_lut(step: float = LUT_STEP) -> tuple:
+    """(temperatures, sRGB colours in [0, 1]) sampled every step K over TEFF_RANGE, computed once per step.
+
+    The arrays are shared between callers and made read-only.
+    """
+    temperatures = np.arange(TEFF_RANGE[0], TEFF_RANGE[1] + step, step)
+    colors = srgb_encode(blackbody_rgb(temperatures))
+    temperatures.flags.writeable = False
+    colors.flags.writeable = False
+    return temperatures, colors
+
+def teff_to_rgb(teff: np.ndarray, step: float = LUT_STEP) -> np.ndarray:
+    """sRGB uint8 colour per temperature, (n, 3), linearly interpolated from the cached lookup table."""
+    temperatures, colors = blackbody_lut(step)
+    teff = np.clip(np.asarray(teff, dtype=np.float64), *TEFF_RANGE)
+    rgb = np.empty((len(teff), 3), dtype=np.uint8)
+    for channel in range(3):
+        rgb[:, channel] = np.rint(np.interp(teff, temperatures, colors[:, channel]) * 255)
+    return rgb
@@ -0,0 +1,45 @@
+import numpy as np
+
+def spherical_to_cartesian(ra, dec, dist, out=None, dtype=np.float64, dist_bounds=None,
+                           scaler=1.0, scaled_dist_out=None) -> np.ndarray:
+    """Convert ra/dec in degrees and distance to x/y/z in a single pass over contiguous arrays.
+
+    Each trig term is computed once into preallocated buffers. Returns a (3, n) array
+    (x, y, z rows, each contiguous), written into out when given. dtype=np.float32
+    halves memory traffic for render-bound consumers. With dist_bounds=(min, max) the
+    distance is min-max scaled into [0, scaler] in the same pass, exactly like
+    linear_scale, and the scaled distance is written to scaled_dist_out when given.
+    """
+    dtype = np.dtype(dtype)
+    ra = np.asarray(ra)
+    dec = np.asarray(dec)
+    n = len(ra)
+    if out is None:
+        out = np.empty((3, n), dtype=dtype)
+    x, y, z = out
+
+    # scaled (or plain) distance, kept in its own buffer since it is used by all three axes
+    scaled = scaled_dist_out if scaled_dist_out is not None else np.empty(n, dtype=dtype)
+    np.copyto(scaled, dist, casting="same_kind")
+    if dist_bounds is not None:
+        dist_min, dist_max = dist_bounds
+        # a single distance gives 0 / 0 = nan like linear_scale, without the numpy warning
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.subtract(scaled, dist_min, out=scaled, casting="same_kind")
+            np.divide(scaled, dist_max - dist_min, out=scaled, casting="same_kind")
+            np.multiply(scaled, scaler, out=scaled, casting="same_kind")
+
+    # z = dist * sin(dec), and dist * cos(dec) shared by x and y
+    angle = np.empty(n, dtype=dtype)
+    np.deg2rad(dec, out=angle, casting="same_kind")
+    dist_cos_dec = np.cos(angle)
+    np.multiply(scaled, dist_cos_dec, out=dist_cos_dec)
+    np.sin(angle, out=z)
+    np.multiply(scaled, z, out=z)
+
+    np.deg2rad(ra, out=angle, casting="same_kind")
+    np.cos(angle, out=x)
+    np.multiply(dist_cos_dec, x, out=x)
+    np.sin(angle, out=y)
+    np.multiply(dist_cos_dec, y, out=y)
+    return out
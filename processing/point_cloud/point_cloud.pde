@@ -0,0 +1,69 @@
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+
+// written by: scale_transform_data.py local [input csv] ../../stars.bin --format pointcloud
+String POINT_CLOUD_FILE = "../../stars.bin";
+int HEADER_BYTES = 20;
+
+PShape stars;
+float extent;
+
+void setup() {
+  size(1000,1000,P3D);
+  smooth();
+  frameRate(100);
+  background(0);
+
+  stars = loadPointCloud(POINT_CLOUD_FILE);
+}
+
+void draw() {
+  background(0);
+  translate(width/2, height/2, -100);
+
+  rotateY(PI * frameCount / 1000);
+  rotateX(PI * frameCount / 5000);
+
+  noStroke();
+  fill(0,100,100);
+  directionalLight(200, 200, 200, -1, 0, 0);
+  sphere(20);
+
+  // fit the whole catalogue into the view, every star is drawn from the one retained buffer
+  scale(width / 2 / extent);
+  shape(stars);
+}
+
+// read the packed point cloud once and build a retained shape, uploaded to the gpu on first draw
+PShape loadPointCloud(String path) {
+  ByteBuffer data = ByteBuffer.wrap(loadBytes(path)).order(ByteOrder.LITTLE_ENDIAN);
+  byte[] magic = new byte[4];
+  data.get(magic);
+  if (!new String(magic).equals("EXPC")) {
+    throw new RuntimeException(path + " is not a point cloud");
+  }
+  int version = data.getInt();
+  int count = data.getInt();
+  int stride = data.getInt();
+  extent = max(data.getFloat(), 1);
+
+  PShape shape = createShape();
+  shape.beginShape(POINTS);
+  for (int i = 0; i < count; i++) {
+    data.position(HEADER_BYTES + i * stride);
+    float x = data.getFloat();
+    float y = data.getFloat();
+    float z = data.getFloat();
+    float size = data.getFloat();
+    int r = data.get() & 0xFF;
+    int g = data.get() & 0xFF;
+    int b = data.get() & 0xFF;
+    int a = data.get() & 0xFF;
+    shape.stroke(r, g, b, a);
+    shape.strokeWeight(1.0 + size);
+    shape.vertex(x, y, z);
+  }
+  shape.endShape();
+  println("loaded " + count + " stars from " + path + " (format version " + version + ")");
+  return shape;
+}
@@ -0,0 +1,139 @@
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import pandas as pd
+
+from exo_planet.archive_download import download_table, generate_download, ra_bands
+
+COLUMNS = ["hostname", "ra", "dec", "sy_dist"]
+
+
+class StubArchive:
+    """Local TAP sync endpoint answering ra band queries from a DataFrame."""
+
+    def __init__(self, df):
+        self.df = df
+        self.queries = []
+        self.fail_once = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def answer(self, query):
+        low, upper, high = re.search(r"ra >= ([\d.]+) and ra (<=?) ([\d.]+)", query).groups()
+        ra = self.df["ra"]
+        within = (ra >= float(low)) & ((ra <= float(high)) if upper == "<=" else (ra < float(high)))
+        return self.df.loc[within, COLUMNS].to_csv(index=False).encode()
+
+
+@pytest.fixture
+def stub_archive():
+    """Fixture serving a StubArchive on a free local port, yielding (archive, url)."""
+    archive = StubArchive(pd.DataFrame({
+        'hostname': [f"star {i}" for i in range(12)],
+        'ra': [0.0, 15.0, 44.9, 45.0, 90.0, 120.5, 179.9, 200.0, 250.0, 300.0, 359.0, 360.0],
+        'dec': [float(i) for i in range(12)],
+        'sy_dist': [10.0 * (i + 1) for i in range(12)],
+    }))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)["query"][0]
+            with archive.lock:
+                archive.queries.append(query)
+                archive.active += 1
+                archive.max_active = max(archive.max_active, archive.active)
+                fail = query in archive.fail_once
+                archive.fail_once.discard(query)
+            time.sleep(0.02)
+            body = archive.answer(query)
+            # no longer counted as in flight once the client can see an answer
+            with archive.lock:
+                archive.active -= 1
+            if fail:
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield archive, f"http://127.0.0.1:{server.server_address[1]}/TAP/sync"
+    server.shutdown()
+    server.server_close()
+
+
+class TestRaBands:
+    """Test suite for splitting the sky into query bands."""
+
+    def test_bands_cover_sky(self):
+        """Test that bands are contiguous from 0 to 360."""
+        bands = ra_bands(8)
+
+        assert bands[0][0] == 0 and bands[-1][1] == 360
+        assert all(a[1] == b[0] for a, b in zip(bands, bands[1:]))
+
+
+class TestDownloadTable:
+    """Test suite for the banded download against a stub archive."""
+
+    def test_combined_download_has_every_row_once(self, stub_archive, tmp_path):
+        """Test that the bands together hold the whole table, edges included."""
+        archive, url = stub_archive
+        output = tmp_path / "ps.csv"
+
+        generate_download("ps", COLUMNS, str(output), bands=8, concurrency=3, url=url)
+
+        result = pd.read_csv(output).sort_values("ra").reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, archive.df)
+        assert len(archive.queries) == 8
+
+    def test_concurrency_limit(self, stub_archive, tmp_path):
+        """Test that no more than the given number of bands are in flight at once."""
+        archive, url = stub_archive
+
+        download_table("ps", COLUMNS, str(tmp_path / "bands"), bands=12, concurrency=2, url=url)
+
+        assert 1 <= archive.max_active <= 2
+
+    def test_resume_fetches_only_missing_bands(self, stub_archive, tmp_path):
+        """Test that a rerun skips bands already on disk."""
+        archive, url = stub_archive
+        band_dir = tmp_path / "bands"
+        filenames = download_table("ps", COLUMNS, str(band_dir), bands=6, url=url)
+        (band_dir / filenames[2].split("/")[-1]).unlink()
+
+        download_table("ps", COLUMNS, str(band_dir), bands=6, url=url)
+
+        assert len(archive.queries) == 7
+
+    def test_failed_band_keeps_others(self, stub_archive, tmp_path):
+        """Test that a failing band raises, leaves no partial file and is fetched on the next run."""
+        archive, url = stub_archive
+        band_dir = tmp_path / "bands"
+        archive.fail_once.add("select hostname,ra,dec,sy_dist from ps where ra >= 90.0 and ra < 180.0")
+
+        with pytest.raises(RuntimeError):
+            download_table("ps", COLUMNS, str(band_dir), bands=4, url=url, retries=0)
+
+        assert sorted(path.name for path in band_dir.glob("band_*")) == ["band_0000.csv", "band_0002.csv", "band_0003.csv"]
+        download_table("ps", COLUMNS, str(band_dir), bands=4, url=url, retries=0)
+        assert len(archive.queries) == 5
+
+    def test_different_split_rejected(self, stub_archive, tmp_path):
+        """Test that bands of another query split are not mixed in."""
+        _, url = stub_archive
+        download_table("ps", COLUMNS, str(tmp_path / "bands"), bands=4, url=url)
+
+        with pytest.raises(ValueError):
+            download_table("ps", COLUMNS, str(tmp_path / "bands"), bands=8, url=url)
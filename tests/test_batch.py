@@ -0,0 +1,101 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.batch import load_manifest, run_batch, generate_batch
+from exo_planet.data_func import load_from_npy
+from exo_planet.scale_transform_data import convert_scale_clean_df, SCALE_FACTOR_CONST
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """Fixture writing a small archive-like input csv."""
+    df = pd.DataFrame({
+        'ra': [0.0, 45.0, 90.0, 135.0, 180.0],
+        'dec': [0.0, 30.0, -30.0, 60.0, -60.0],
+        'sy_dist': [10.0, 20.0, 30.0, 40.0, 50.0],
+        'pl_rade': [1.0, 1.5, 2.0, 0.5, 3.0],
+        'st_rad': [1.0, 2.0, 5.0, 10.0, 50.0],
+        'st_teff': [5000, 5500, 6000, 4500, 7000]
+    })
+    path = tmp_path / "input.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def manifest(tmp_path, input_csv):
+    """Fixture writing a manifest of parameter variants over one input."""
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({
+        "defaults": {"st_rad_scaler": 2},
+        "jobs": [
+            {"input": input_csv.name, "output": "default.csv"},
+            {"input": input_csv.name, "output": "far.csv", "scale_factor": 1000},
+            {"input": input_csv.name, "output": "packed.npy", "format": "npy", "float32": True},
+        ]
+    }))
+    return path
+
+
+class TestLoadManifest:
+    """Test suite for reading batch manifests."""
+
+    def test_defaults_and_relative_paths(self, manifest, tmp_path):
+        """Test that manifest defaults apply and paths resolve next to the manifest."""
+        jobs = load_manifest(str(manifest))
+
+        assert [job['scale_factor'] for job in jobs] == [SCALE_FACTOR_CONST, 1000, SCALE_FACTOR_CONST]
+        assert all(job['st_rad_scaler'] == 2 for job in jobs)
+        assert jobs[0]['output'] == str(tmp_path / "default.csv")
+
+    def test_job_without_output_raises(self, tmp_path):
+        """Test that incomplete jobs are rejected."""
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps({"jobs": [{"input": "a.csv"}]}))
+
+        with pytest.raises(ValueError):
+            load_manifest(str(path))
+
+
+class TestRunBatch:
+    """Test suite for running batch jobs."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_outputs_match_single_runs(self, manifest, input_csv, tmp_path, workers):
+        """Test that each job gives what a single run with its parameters gives, in or out of a pool."""
+        results = run_batch(load_manifest(str(manifest)), workers)
+
+        expected = convert_scale_clean_df(pd.read_csv(input_csv), scale_factor=1000, st_rad_scaler=2)
+        result = pd.read_csv(tmp_path / "far.csv")
+        np.testing.assert_allclose(result[['x', 'y', 'z', 'sy_dist', 'st_rad']], expected[['x', 'y', 'z', 'sy_dist', 'st_rad']])
+        assert result['sy_dist'].max() == 1000
+        assert [r['output'] for r in results] == [str(tmp_path / name) for name in ["default.csv", "far.csv", "packed.npy"]]
+
+    def test_job_format_and_dtype(self, manifest, tmp_path):
+        """Test that per job format and float32 options are honoured."""
+        run_batch(load_manifest(str(manifest)), 1)
+
+        packed = load_from_npy(str(tmp_path / "packed.npy"))
+        assert packed.dtype['x'] == np.float32
+
+    def test_generate_batch_report(self, manifest, tmp_path):
+        """Test that the timing report lists every job."""
+        report_path = tmp_path / "report.json"
+
+        generate_batch(str(manifest), 1, str(report_path))
+
+        report = json.loads(report_path.read_text())
+        assert len(report['jobs']) == 3
+        assert all(job['rows'] == 5 and job['total_seconds'] >= 0 for job in report['jobs'])
+        assert report['inputs'][0]['rows'] == 5 and report['inputs'][0]['load_seconds'] > 0
+
+    def test_changed_input_reloaded(self, manifest, input_csv, tmp_path):
+        """Test that a second batch in the same process reads an input rewritten since the first."""
+        generate_batch(str(manifest), 2)
+        pd.read_csv(input_csv).iloc[:3].to_csv(input_csv, index=False)
+
+        report = generate_batch(str(manifest), 2)
+
+        assert all(job['rows'] == 3 for job in report['jobs'])
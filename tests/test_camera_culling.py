@@ -0,0 +1,139 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.camera_culling import (
+    load_camera_path,
+    camera_at_frame,
+    projected_size,
+    assign_lod,
+    compute_visibility,
+    segment_stars,
+    generate_visibility,
+    load_visibility,
+)
+
+
+@pytest.fixture
+def camera_path():
+    """Fixture providing a camera dollying along +x while looking down +x."""
+    return {
+        "fov": 60,
+        "aspect": 1.0,
+        "resolution_y": 100,
+        "keyframes": [
+            {"frame": 1, "position": [0.0, 0.0, 0.0], "target": [1.0, 0.0, 0.0]},
+            {"frame": 10, "position": [90.0, 0.0, 0.0], "target": [91.0, 0.0, 0.0], "fov": 30},
+        ]
+    }
+
+
+@pytest.fixture
+def stars():
+    """Fixture providing stars ahead of, behind and beside the camera path."""
+    points = np.array([
+        [5.0, 0.0, 0.0],      # close ahead at the start, passed by frame 2
+        [200.0, 0.0, 0.0],    # far ahead for the whole path
+        [-50.0, 0.0, 0.0],    # always behind
+        [50.0, 500.0, 0.0],   # always far off to the side
+    ])
+    radii = np.array([1.0, 1.0, 1.0, 1.0])
+    return points, radii
+
+
+class TestCameraPath:
+    """Test suite for camera path loading and interpolation."""
+
+    def test_load_sorts_keyframes(self, camera_path, tmp_path):
+        """Test that keyframes are ordered by frame."""
+        camera_path["keyframes"].reverse()
+        path = tmp_path / "camera.json"
+        path.write_text(json.dumps(camera_path))
+
+        result = load_camera_path(str(path))
+
+        assert [key["frame"] for key in result["keyframes"]] == [1, 10]
+
+    def test_load_without_keyframes_raises(self, tmp_path):
+        """Test that a path without keyframes is rejected."""
+        path = tmp_path / "camera.json"
+        path.write_text(json.dumps({"fov": 50}))
+
+        with pytest.raises(ValueError):
+            load_camera_path(str(path))
+
+    def test_camera_interpolates_between_keys(self, camera_path):
+        """Test linear interpolation of position and fov, with the default fov on keys without one."""
+        position, target, fov = camera_at_frame(camera_path, 5.5)
+
+        np.testing.assert_allclose(position, [45.0, 0.0, 0.0])
+        np.testing.assert_allclose(target, [46.0, 0.0, 0.0])
+        assert fov == 45.0
+
+    def test_camera_holds_past_last_key(self, camera_path):
+        """Test that frames after the last key keep the last camera."""
+        position, _, _ = camera_at_frame(camera_path, 50)
+
+        np.testing.assert_allclose(position, [90.0, 0.0, 0.0])
+
+
+class TestLevelOfDetail:
+    """Test suite for projected size and level of detail."""
+
+    def test_projected_size_halves_with_distance(self):
+        """Test that twice as far gives half the size on screen."""
+        points = np.array([[10.0, 0.0, 0.0], [20.0, 0.0, 0.0]])
+
+        size = projected_size(points, np.array([1.0, 1.0]), np.zeros(3), [1.0, 0.0, 0.0], 90.0, 100)
+
+        np.testing.assert_allclose(size, [10.0, 5.0])
+
+    def test_assign_lod_thresholds(self):
+        """Test that larger stars on screen get more detail."""
+        lod = assign_lod(np.array([100.0, 8.0, 5.0, 2.0, 0.1]))
+
+        assert lod.tolist() == [0, 0, 1, 1, 2]
+
+
+class TestVisibility:
+    """Test suite for per segment visibility lists."""
+
+    def test_segments_cover_path(self, stars, camera_path):
+        """Test that segments split the frame range of the path."""
+        visibility = compute_visibility(*stars, camera_path, segment_frames=4)
+
+        assert visibility["segment_start"].tolist() == [1, 5, 9]
+        assert visibility["segment_end"].tolist() == [4, 8, 10]
+        assert visibility["offsets"][-1] == len(visibility["indices"]) == len(visibility["lod"])
+
+    def test_visible_stars_per_segment(self, stars, camera_path):
+        """Test that only stars in front of the camera are listed, and passed stars drop out."""
+        visibility = compute_visibility(*stars, camera_path, segment_frames=4)
+
+        first, first_lod = segment_stars(visibility, 1)
+        last, _ = segment_stars(visibility, 10)
+        assert sorted(first.tolist()) == [0, 1]
+        assert last.tolist() == [1]
+        # the close star is large on screen, the far star is tiny
+        assert dict(zip(first.tolist(), first_lod.tolist())) == {0: 0, 1: 2}
+
+    def test_segment_stars_outside_path(self, stars, camera_path):
+        """Test that frames outside the path have no visible stars."""
+        visibility = compute_visibility(*stars, camera_path, segment_frames=4)
+
+        assert len(segment_stars(visibility, 0)[0]) == 0
+        assert len(segment_stars(visibility, 11)[0]) == 0
+
+    def test_generate_visibility_round_trip(self, stars, camera_path, tmp_path):
+        """Test the file based stage from pipeline output to visibility npz."""
+        points, radii = stars
+        input_path, camera_json, output = tmp_path / "output.csv", tmp_path / "camera.json", tmp_path / "visibility.npz"
+        pd.DataFrame({'x': points[:, 0], 'y': points[:, 1], 'z': points[:, 2], 'st_rad': radii}).to_csv(input_path, index=False)
+        camera_json.write_text(json.dumps(camera_path))
+
+        expected = generate_visibility(str(input_path), str(camera_json), str(output), segment_frames=4)
+
+        result = load_visibility(str(output))
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
@@ -0,0 +1,206 @@
+import gzip
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.catalogue_server import CatalogueStore, cached_pull_source, serve_catalogue
+from exo_planet.scale_transform_data import convert_scale_clean_df
+
+SNAPSHOT = pd.DataFrame({
+    'hostname': ['a', 'a', 'b', 'c'],
+    'ra': [0.0, 0.0, 90.0, 180.0],
+    'dec': [0.0, 0.0, 30.0, -30.0],
+    'sy_dist': [10.0, 10.0, 20.0, 30.0],
+    'pl_rade': [1.0, 2.0, 1.5, 0.5],
+    'st_rad': [1.0, 1.0, 2.0, 5.0],
+    'st_teff': [3000, 3000, 5500, 6000],
+})
+
+
+@pytest.fixture
+def snapshot_csv(tmp_path):
+    """Fixture writing a raw archive snapshot."""
+    path = tmp_path / "snapshot.csv"
+    SNAPSHOT.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def server(snapshot_csv):
+    """Fixture serving the snapshot on a free local port, yielding (server, base url)."""
+    server = serve_catalogue(lambda: snapshot_csv, port=0, interval=3600)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield server, f"http://{host}:{port}"
+    server.shutdown()
+    server.stop.set()
+    server.server_close()
+
+
+def fetch(url, headers=None, method="GET"):
+    """(status, headers, body) of a request, error statuses included."""
+    request = urllib.request.Request(url, headers=headers or {}, method=method)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+class TestCatalogueStore:
+    """Test suite for the scheduled catalogue refresh."""
+
+    def test_unchanged_snapshot_not_transformed(self, snapshot_csv):
+        """Test that refreshing an unchanged snapshot skips the pipeline and keeps the same bodies."""
+        store = CatalogueStore(lambda: snapshot_csv)
+        assert store.refresh()
+        paths = store.paths
+
+        with patch('exo_planet.catalogue_server.convert_scale_clean_df') as mock_convert:
+            assert not store.refresh()
+
+        mock_convert.assert_not_called()
+        assert store.paths is paths
+        assert store.status["refreshes"] == 2 and store.status["unchanged"] == 1
+
+    def test_failed_refresh_keeps_catalogue(self, snapshot_csv, tmp_path):
+        """Test that a source failure is recorded and the previous catalogue is still served."""
+        filenames = [snapshot_csv, str(tmp_path / "missing.csv")]
+        store = CatalogueStore(lambda: filenames.pop(0))
+        store.refresh()
+        paths = store.paths
+
+        with pytest.raises(OSError):
+            store.refresh()
+
+        assert store.paths is paths
+        assert "missing.csv" in store.status["error"]
+
+    def test_cached_pull_source(self, tmp_path):
+        """Test that the api source returns the cached pull, fetching only when missing or stale."""
+        class Archive:
+            calls = 0
+
+            def query_criteria(self, table, select):
+                Archive.calls += 1
+                return type("Result", (), {"to_pandas": lambda result: SNAPSHOT[select.split(",")]})()
+
+        source = cached_pull_source(str(tmp_path), ttl=3600, client=Archive())
+        filename = source()
+        source()
+
+        assert Archive.calls == 1
+        pd.testing.assert_frame_equal(pd.read_csv(filename), SNAPSHOT)
+
+
+class TestCatalogueServer:
+    """Test suite for serving the catalogue over http."""
+
+    def test_catalogue_served(self, server):
+        """Test that the csv and npy bodies hold the pipeline output."""
+        _, url = server
+        status, headers, body = fetch(url + "/catalogue.csv")
+
+        assert status == 200 and headers["Content-Type"] == "text/csv"
+        expected = convert_scale_clean_df(SNAPSHOT)
+        pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(body)), expected.reset_index(drop=True), check_dtype=False)
+        _, _, npy = fetch(url + "/catalogue.npy")
+        assert len(np.load(io.BytesIO(npy))) == len(expected)
+
+    def test_gzip(self, server):
+        """Test that clients accepting gzip get the precompressed body."""
+        _, url = server
+        _, _, plain = fetch(url + "/catalogue.csv")
+        status, headers, body = fetch(url + "/catalogue.csv", {"Accept-Encoding": "gzip"})
+
+        assert status == 200 and headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(body) == plain
+
+    def test_gzip_refused_by_q_value(self, server):
+        """Test that gzip;q=0 gets the identity body, and other codings alone do not get gzip."""
+        _, url = server
+        _, _, plain = fetch(url + "/catalogue.csv")
+
+        for accept in ("gzip;q=0, identity", "br", "*;q=0"):
+            status, headers, body = fetch(url + "/catalogue.csv", {"Accept-Encoding": accept})
+            assert status == 200 and "Content-Encoding" not in headers and body == plain
+        assert fetch(url + "/catalogue.csv", {"Accept-Encoding": "br, gzip;q=0.5"})[1]["Content-Encoding"] == "gzip"
+
+    def test_gzip_has_own_etag(self, server):
+        """Test that the gzip body has a different strong ETag and revalidates against it."""
+        _, url = server
+        _, plain_headers, _ = fetch(url + "/catalogue.csv")
+        _, gzip_headers, _ = fetch(url + "/catalogue.csv", {"Accept-Encoding": "gzip"})
+
+        assert gzip_headers["ETag"] != plain_headers["ETag"]
+        assert fetch(url + "/catalogue.csv", {"Accept-Encoding": "gzip", "If-None-Match": gzip_headers["ETag"]})[0] == 304
+        assert fetch(url + "/catalogue.csv", {"Accept-Encoding": "gzip", "If-None-Match": plain_headers["ETag"]})[0] == 200
+
+    def test_etag_revalidation(self, server, snapshot_csv):
+        """Test that a matching ETag gets 304 until the snapshot changes."""
+        store_server, url = server
+        _, headers, _ = fetch(url + "/catalogue.csv")
+        etag = headers["ETag"]
+
+        status, headers, body = fetch(url + "/catalogue.csv", {"If-None-Match": etag})
+        assert status == 304 and body == b"" and "Content-Length" not in headers
+        assert fetch(url + "/catalogue.csv", {"If-None-Match": f'"other", W/{etag}'})[0] == 304
+
+        SNAPSHOT.assign(st_teff=[3000, 3000, 5500, 7000]).to_csv(snapshot_csv, index=False)
+        assert store_server.store.refresh()
+        status, headers, _ = fetch(url + "/catalogue.csv", {"If-None-Match": etag})
+        assert status == 200 and headers["ETag"] != etag
+
+    def test_ranges(self, server):
+        """Test single byte ranges, suffix ranges and unsatisfiable ranges."""
+        _, url = server
+        _, _, full = fetch(url + "/catalogue.csv")
+
+        status, headers, body = fetch(url + "/catalogue.csv", {"Range": "bytes=5-14"})
+        assert status == 206 and body == full[5:15]
+        assert headers["Content-Range"] == f"bytes 5-14/{len(full)}"
+        assert fetch(url + "/catalogue.csv", {"Range": "bytes=-10"})[2] == full[-10:]
+        assert fetch(url + "/catalogue.csv", {"Range": "bytes=10-"})[2] == full[10:]
+        status, headers, _ = fetch(url + "/catalogue.csv", {"Range": f"bytes={len(full)}-"})
+        assert status == 416 and headers["Content-Range"] == f"bytes */{len(full)}"
+        assert fetch(url + "/catalogue.csv", {"Range": "bytes=-0"})[0] == 416
+
+    def test_unsupported_ranges_ignored(self, server):
+        """Test that multiple, reversed or malformed ranges get the full body instead of 416."""
+        _, url = server
+        _, _, full = fetch(url + "/catalogue.csv")
+
+        for requested in ("bytes=0-9,20-29", "bytes=10-5", "items=0-9", "bytes=-"):
+            status, headers, body = fetch(url + "/catalogue.csv", {"Range": requested})
+            assert status == 200 and body == full and "Content-Range" not in headers
+
+    def test_if_range_after_refresh(self, server, snapshot_csv):
+        """Test that resuming with the ETag of an earlier catalogue gets the whole current one."""
+        store_server, url = server
+        _, headers, _ = fetch(url + "/catalogue.csv")
+        etag = headers["ETag"]
+        assert fetch(url + "/catalogue.csv", {"Range": "bytes=5-", "If-Range": etag})[0] == 206
+
+        SNAPSHOT.assign(st_teff=[3000, 3000, 5500, 7000]).to_csv(snapshot_csv, index=False)
+        store_server.store.refresh()
+        status, headers, body = fetch(url + "/catalogue.csv", {"Range": "bytes=5-", "If-Range": etag})
+
+        assert status == 200 and "Content-Range" not in headers
+        assert body == fetch(url + "/catalogue.csv")[2]
+
+    def test_head_status_and_missing(self, server):
+        """Test HEAD without a body, the status page and unknown paths."""
+        _, url = server
+        status, headers, body = fetch(url + "/catalogue.csv", method="HEAD")
+        assert status == 200 and body == b"" and int(headers["Content-Length"]) > 0
+
+        status, _, body = fetch(url + "/status")
+        assert status == 200 and json.loads(body)["rows"] == 3
+        assert fetch(url + "/other")[0] == 404
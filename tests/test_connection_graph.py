@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.connection_graph import knn_graph, radius_graph, generate_graph, load_graph
+from exo_planet.spatial_index import KDTree
+from exo_planet.scale_transform_data import generate_from_local_csv
+
+
+@pytest.fixture
+def points():
+    """Fixture providing clustered, flattened random points like a real catalogue."""
+    rng = np.random.default_rng(3)
+    return np.concatenate([rng.normal(size=(600, 3)) * [1, 5, 0.3], rng.normal(loc=20, size=(200, 3))])
+
+
+def brute_distances(points):
+    diff = points[:, None, :] - points[None, :, :]
+    dist = np.sqrt((diff ** 2).sum(axis=2))
+    np.fill_diagonal(dist, np.inf)
+    return dist
+
+
+class TestKnnGraph:
+    """Test suite for the nearest neighbour graph."""
+
+    @pytest.mark.parametrize("k", [1, 3, 20])
+    def test_matches_brute_force(self, points, k):
+        """Test that every point is linked to exactly its k nearest neighbours."""
+        dist = brute_distances(points)
+        nearest = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        expected = {(min(i, j), max(i, j)) for i in range(len(points)) for j in nearest[i]}
+
+        edges, lengths = knn_graph(points, k)
+
+        assert set(map(tuple, edges.tolist())) == expected
+        np.testing.assert_allclose(lengths, dist[edges[:, 0], edges[:, 1]], rtol=1e-6)
+
+    def test_compact_unique_edges(self, points):
+        """Test that edges are unique uint32 pairs with i < j and float32 lengths."""
+        edges, lengths = knn_graph(points, 3)
+
+        assert edges.dtype == np.uint32 and lengths.dtype == np.float32
+        assert (edges[:, 0] < edges[:, 1]).all()
+        assert len(np.unique(edges, axis=0)) == len(edges)
+
+    def test_reuses_given_tree(self, points):
+        """Test that a prebuilt tree with small leaves gives the same graph."""
+        result = knn_graph(points, 3, KDTree(points, leaf_size=2))
+
+        np.testing.assert_array_equal(result[0], knn_graph(points, 3)[0])
+
+    def test_tiny_input(self):
+        """Test that fewer points than neighbours asked for still link what there is."""
+        edges, _ = knn_graph(np.array([[0.0, 0, 0], [1.0, 0, 0]]), 5)
+
+        assert edges.tolist() == [[0, 1]]
+        assert len(knn_graph(np.empty((0, 3)), 3)[0]) == 0
+
+
+class TestRadiusGraph:
+    """Test suite for the distance threshold graph."""
+
+    def test_matches_brute_force(self, points):
+        """Test that exactly the pairs within the radius are linked."""
+        dist = brute_distances(points)
+        expected = set(zip(*np.nonzero(np.triu(dist <= 0.8, 1))))
+
+        edges, lengths = radius_graph(points, 0.8)
+
+        assert set(map(tuple, edges.tolist())) == expected
+        assert lengths.max() <= 0.8
+
+    def test_empty_input(self):
+        """Test that no points give no edges."""
+        assert len(radius_graph(np.empty((0, 3)), 1.0)[0]) == 0
+
+
+class TestGenerateGraph:
+    """Test suite for the graph pipeline stage."""
+
+    def test_graph_over_pipeline_output(self, tmp_path):
+        """Test that the stage reads pipeline output and writes the edge list."""
+        input_csv = tmp_path / "input.csv"
+        pd.DataFrame({
+            'ra': [0.0, 45.0, 90.0, 135.0, 180.0], 'dec': [0.0, 30.0, -30.0, 60.0, -60.0],
+            'sy_dist': [10.0, 20.0, 30.0, 40.0, 50.0], 'pl_rade': [1.0, 1.5, 2.0, 0.5, 3.0],
+            'st_rad': [1.0, 2.0, 5.0, 10.0, 50.0], 'st_teff': [5000, 5500, 6000, 4500, 7000]
+        }).to_csv(input_csv, index=False)
+        generate_from_local_csv(str(input_csv), str(tmp_path / "output.npy"), output_format="npy")
+
+        edges, lengths = generate_graph(str(tmp_path / "output.npy"), str(tmp_path / "graph.npz"), k=2)
+
+        saved_edges, saved_lengths = load_graph(str(tmp_path / "graph.npz"))
+        np.testing.assert_array_equal(saved_edges, edges)
+        np.testing.assert_array_equal(saved_lengths, lengths)
+        assert edges.max() < 5
@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import pandas as pd
+
+from exo_planet.data_func import (
+    api_cache_paths,
+    pull_from_astro_api,
+    pull_from_astro_api_cached,
+)
+
+
+class FakeArchive:
+    """Local stand-in for NasaExoplanetArchive that counts queries."""
+
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+
+    def query_criteria(self, table, select):
+        self.calls.append((table, select))
+        df = self.df
+
+        class Result:
+            def to_pandas(self):
+                return df.copy()
+
+        return Result()
+
+
+@pytest.fixture
+def fake_archive():
+    """Fixture providing a stand-in archive client with a small table."""
+    return FakeArchive(pd.DataFrame({
+        'ra': [0.0, 90.0],
+        'dec': [0.0, 45.0],
+        'sy_dist': [10.0, 20.0]
+    }))
+
+
+COLUMNS = ["ra", "dec", "sy_dist"]
+
+
+class TestPullFromAstroApi:
+    """Test suite for the uncached archive pull."""
+
+    def test_pull_uses_given_client(self, fake_archive):
+        """Test that the query is sent to the given client with the selected columns."""
+        result = pull_from_astro_api("ps", COLUMNS, client=fake_archive)
+
+        assert fake_archive.calls == [("ps", "ra,dec,sy_dist")]
+        pd.testing.assert_frame_equal(result, fake_archive.df)
+
+
+class TestLazyImports:
+    """Test that offline code paths do not pay for the astroquery import."""
+
+    def test_pipeline_import_does_not_load_astroquery(self):
+        """Test that importing the pipeline leaves astroquery and astropy unloaded."""
+        check = "import sys, exo_planet.scale_transform_data; print('astroquery' in sys.modules or 'astropy' in sys.modules)"
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        result = subprocess.run([sys.executable, "-c", check], cwd=repo_dir, capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "False"
+
+
+class TestPullFromAstroApiCached:
+    """Test suite for the on-disk cache around the archive pull."""
+
+    def test_first_pull_downloads_and_writes_cache(self, fake_archive, tmp_path):
+        """Test that an empty cache triggers a download that is then stored."""
+        result = pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+
+        data_path, meta_path = api_cache_paths(str(tmp_path), "ps", COLUMNS)
+        assert len(fake_archive.calls) == 1
+        pd.testing.assert_frame_equal(pd.read_csv(data_path), result)
+        with open(meta_path) as file:
+            meta = json.load(file)
+        assert meta["table"] == "ps"
+        assert meta["columns"] == COLUMNS
+
+    def test_repeated_pull_served_from_cache(self, fake_archive, tmp_path):
+        """Test that a second run does not query the archive."""
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+        result = pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+
+        assert len(fake_archive.calls) == 1
+        pd.testing.assert_frame_equal(result, fake_archive.df)
+
+    def test_stale_cache_served_without_refresh(self, fake_archive, tmp_path):
+        """Test that an expired cache is still used when refresh is not asked for."""
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), ttl=0, client=fake_archive)
+
+        assert len(fake_archive.calls) == 1
+
+    def test_refresh_skips_fresh_cache(self, fake_archive, tmp_path):
+        """Test that refresh does not re-download while the cache is within its ttl."""
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), ttl=3600, refresh=True, client=fake_archive)
+
+        assert len(fake_archive.calls) == 1
+
+    def test_refresh_redownloads_stale_cache(self, fake_archive, tmp_path):
+        """Test that refresh re-downloads once the cache is older than its ttl."""
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+        fake_archive.df = fake_archive.df.assign(sy_dist=[30.0, 40.0])
+
+        result = pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), ttl=0, refresh=True, client=fake_archive)
+
+        assert len(fake_archive.calls) == 2
+        assert result['sy_dist'].tolist() == [30.0, 40.0]
+        data_path, _ = api_cache_paths(str(tmp_path), "ps", COLUMNS)
+        assert pd.read_csv(data_path)['sy_dist'].tolist() == [30.0, 40.0]
+
+    def test_cache_keyed_by_columns(self, fake_archive, tmp_path):
+        """Test that a different column list does not reuse another pull."""
+        pull_from_astro_api_cached("ps", COLUMNS, str(tmp_path), client=fake_archive)
+        pull_from_astro_api_cached("ps", COLUMNS[:2], str(tmp_path), client=fake_archive)
+
+        assert len(fake_archive.calls) == 2
+        assert api_cache_paths(str(tmp_path), "ps", COLUMNS) != api_cache_paths(str(tmp_path), "ps", COLUMNS[:2])
@@ -0,0 +1,114 @@
+from unittest.mock import patch
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.feature_analysis import (
+    correlation_matrix,
+    generate_analysis,
+    load_features,
+    pair_report,
+    pairwise_fits,
+)
+
+
+@pytest.fixture
+def features():
+    """Fixture of noisy related columns with scattered missing values."""
+    rng = np.random.default_rng(0)
+    n = 400
+    period = rng.uniform(1.0, 1000.0, n)
+    df = pd.DataFrame({
+        'pl_orbper': period,
+        'pl_orbsmax': (period / 365.25) ** (2 / 3) * rng.lognormal(0.0, 0.01, n),
+        'st_teff': 5000 + 3 * period + rng.normal(0.0, 50.0, n),
+        'sy_dist': rng.uniform(-5.0, 100.0, n),
+    })
+    for col in df.columns:
+        df.loc[rng.random(n) < 0.2, col] = np.nan
+    return df
+
+
+@pytest.fixture
+def archive_csv(tmp_path, features):
+    """Fixture writing the features with a text column and an empty column as an archive csv."""
+    path = tmp_path / "snapshot.csv"
+    features.assign(pl_name=[f"p{i}" for i in range(len(features))], pl_eqt=np.nan).to_csv(path, index=False)
+    return str(path)
+
+
+class TestPairwiseFits:
+    """Test suite for the all pairs fits."""
+
+    def test_matches_pandas_correlation(self, features):
+        """Test that correlations use pairwise complete rows like DataFrame.corr."""
+        result = correlation_matrix(features)
+
+        pd.testing.assert_frame_equal(result, features.corr(min_periods=10), atol=1e-12)
+
+    def test_matches_per_pair_least_squares(self, features):
+        """Test that every fit agrees with polyfit over the rows where both values are present."""
+        fits = pairwise_fits(features.to_numpy())
+        for i, x in enumerate(features.columns):
+            for j, y in enumerate(features.columns):
+                if i == j:
+                    continue
+                both = features[[x, y]].dropna()
+                slope, intercept = np.polyfit(both[x], both[y], 1)
+                residual = both[y] - (slope * both[x] + intercept)
+                assert fits['count'][i, j] == len(both)
+                assert fits['slope'][i, j] == pytest.approx(slope)
+                assert fits['intercept'][i, j] == pytest.approx(intercept)
+                assert fits['rmse'][i, j] == pytest.approx(np.sqrt((residual ** 2).sum() / (len(both) - 2)))
+
+    def test_too_few_rows_and_constant_columns(self):
+        """Test that pairs under min_count or with a constant column are not fitted."""
+        values = np.array([[1.0, 2.0, 5.0], [2.0, 4.0, 5.0], [3.0, 6.5, 5.0], [np.nan, 1.0, 5.0]])
+        fits = pairwise_fits(values, min_count=3)
+
+        assert fits['slope'][0, 1] == pytest.approx(2.25)
+        assert np.isnan(fits['r'][0, 2]) and np.isnan(fits['slope'][2, 1])
+        assert np.isnan(pairwise_fits(values, min_count=4)['r'][0, 1])
+
+
+class TestPairReport:
+    """Test suite for the pair report."""
+
+    def test_power_law_found(self, features):
+        """Test that the log-log fit recovers Kepler's third law and is ranked first."""
+        report = pair_report(features)
+        kepler = report[(report['feature_x'] == 'pl_orbper') & (report['feature_y'] == 'pl_orbsmax')].iloc[0]
+
+        assert len(report) == 12
+        assert kepler['log_slope'] == pytest.approx(2 / 3, abs=0.01)
+        assert kepler['log_r'] > 0.99
+        assert {report.iloc[0]['feature_x'], report.iloc[0]['feature_y']} == {'pl_orbper', 'pl_orbsmax'}
+
+    def test_log_fit_skips_non_positive(self, features):
+        """Test that log fits only count rows where both values are positive."""
+        report = pair_report(features)
+        pair = report[(report['feature_x'] == 'sy_dist') & (report['feature_y'] == 'st_teff')].iloc[0]
+        both = features[['sy_dist', 'st_teff']].dropna()
+
+        assert pair['count'] == len(both)
+        assert pair['log_count'] == (both['sy_dist'] > 0).sum()
+
+
+class TestGenerateAnalysis:
+    """Test suite for the cached report of a snapshot."""
+
+    def test_numeric_columns_loaded(self, archive_csv):
+        """Test that text and empty columns are left out."""
+        assert list(load_features(archive_csv).columns) == ['pl_orbper', 'pl_orbsmax', 'st_teff', 'sy_dist']
+
+    def test_report_cached_per_snapshot(self, archive_csv, tmp_path):
+        """Test that a second run on the same snapshot reads the report from the cache."""
+        cache_dir = str(tmp_path / "cache")
+        first = generate_analysis(archive_csv, str(tmp_path / "first.csv"), cache_dir=cache_dir)
+
+        with patch('exo_planet.feature_analysis.pair_report') as mock_report:
+            second = generate_analysis(archive_csv, str(tmp_path / "second.csv"), cache_dir=cache_dir)
+
+        mock_report.assert_not_called()
+        pd.testing.assert_frame_equal(second, first)
+        assert open(tmp_path / "second.csv").read() == open(tmp_path / "first.csv").read()
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.pointcloud import HEADER, POINT_DTYPE, load_pointcloud, save_pointcloud
+from exo_planet.scale_transform_data import convert_scale_clean_df, generate_from_local_csv
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """Fixture writing a small planet table."""
+    path = tmp_path / "input.csv"
+    pd.DataFrame({
+        'ra': [0.0, 45.0, 90.0, 135.0, 180.0],
+        'dec': [0.0, 30.0, -30.0, 60.0, -60.0],
+        'sy_dist': [10.0, 20.0, 30.0, 40.0, 50.0],
+        'pl_rade': [1.0, 1.5, 2.0, 0.5, 3.0],
+        'st_rad': [1.0, 2.0, 5.0, 10.0, 50.0],
+        'st_teff': [3000, 5500, 6000, 4500, 12000]
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+class TestPointCloud:
+    """Test suite for the packed binary point cloud export."""
+
+    def test_round_trip(self, input_csv, tmp_path):
+        """Test that vertices hold the output positions, sizes and colours."""
+        expected = convert_scale_clean_df(pd.read_csv(input_csv))
+
+        save_pointcloud(expected, str(tmp_path / "stars.bin"))
+
+        header, points = load_pointcloud(str(tmp_path / "stars.bin"))
+        assert header["count"] == 5 and header["stride"] == 20
+        np.testing.assert_allclose(points["x"], expected["x"], rtol=1e-6)
+        np.testing.assert_allclose(points["size"], expected["st_rad"], rtol=1e-6)
+        np.testing.assert_array_equal(points["color"][:, :3], expected[['color_r', 'color_g', 'color_b']])
+        assert (points["color"][:, 3] == 255).all()
+        assert header["extent"] == pytest.approx(np.sqrt(expected['x'] ** 2 + expected['y'] ** 2 + expected['z'] ** 2).max(), rel=1e-6)
+
+    def test_file_layout(self, input_csv, tmp_path):
+        """Test that the file is exactly a header plus one packed vertex per star."""
+        generate_from_local_csv(input_csv, str(tmp_path / "stars"), output_format="pointcloud")
+
+        assert (tmp_path / "stars.bin").stat().st_size == HEADER.size + 5 * POINT_DTYPE.itemsize
+
+    def test_chunked_matches_full(self, input_csv, tmp_path):
+        """Test that streaming the export gives the same file as writing it in one go."""
+        generate_from_local_csv(input_csv, str(tmp_path / "full.bin"), output_format="pointcloud")
+        generate_from_local_csv(input_csv, str(tmp_path / "chunked.bin"), chunksize=2, output_format="pointcloud")
+
+        assert (tmp_path / "full.bin").read_bytes() == (tmp_path / "chunked.bin").read_bytes()
+
+    def test_other_file_rejected(self, tmp_path):
+        """Test that a file without the point cloud header is refused."""
+        path = tmp_path / "other.bin"
+        path.write_bytes(bytes(40))
+
+        with pytest.raises(ValueError):
+            load_pointcloud(str(path))
@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.preview import MARKER_SIZE_RANGE, decimate, generate_preview, preview_figure, voxel_groups
+from exo_planet.scale_transform_data import convert_scale_clean_df, save_output
+
+
+@pytest.fixture
+def stars():
+    """Fixture of two tight clusters and one isolated star."""
+    rng = np.random.default_rng(0)
+    cluster = rng.normal(0.0, 0.01, (500, 3))
+    points = np.vstack([cluster, cluster + 5.0, [[-5.0, 5.0, 0.0]]])
+    return pd.DataFrame({
+        'x': points[:, 0],
+        'y': points[:, 1],
+        'z': points[:, 2],
+        'st_teff': rng.uniform(3000, 10000, len(points)),
+        'st_rad': rng.uniform(0.1, 10.0, len(points)),
+    })
+
+
+class TestDecimate:
+    """Test suite for the voxel decimation."""
+
+    def test_small_input_unchanged(self, stars):
+        """Test that input under the limit is kept whole with a count of one each."""
+        result = decimate(stars, max_points=len(stars))
+
+        assert len(result) == len(stars)
+        assert (result['count'] == 1).all()
+
+    def test_voxel_groups_respect_limit(self, stars):
+        """Test that the grid never has more occupied voxels than allowed."""
+        groups = voxel_groups(stars[['x', 'y', 'z']].to_numpy(), 50)
+
+        assert 3 <= groups.max() + 1 <= 50
+
+    def test_keeps_largest_star_per_voxel(self, stars):
+        """Test that decimation keeps the isolated star, the largest stars and accounts for every star."""
+        result = decimate(stars, max_points=50)
+
+        assert len(result) <= 50
+        assert result['count'].sum() == len(stars)
+        assert ((result['x'] == -5.0) & (result['y'] == 5.0)).any()
+        assert stars['st_rad'].max() in result['st_rad'].values
+
+    def test_density_means(self, stars):
+        """Test that density binning averages positions and preserves the centre of each cluster."""
+        result = decimate(stars, max_points=50, density=True)
+
+        assert result['count'].sum() == len(stars)
+        weighted = (result['x'] * result['count']).sum() / len(stars)
+        assert weighted == pytest.approx(stars['x'].mean())
+        assert result['st_rad'].max() == stars['st_rad'].max()
+
+
+class TestPreview:
+    """Test suite for the preview figure and html."""
+
+    def test_figure_is_webgl_scatter(self, stars):
+        """Test that the trace is a Scatter3d coloured by st_teff and sized by st_rad."""
+        fig = preview_figure(decimate(stars, 50), len(stars))
+        trace = fig.data[0]
+
+        assert trace.type == 'scatter3d'
+        assert len(trace.x) == len(trace.marker.color) == len(trace.marker.size)
+        assert trace.marker.cmin <= min(trace.marker.color) and max(trace.marker.color) <= trace.marker.cmax
+        assert f"of {len(stars)} systems" in fig.layout.title.text
+
+    def test_marker_size_linear_in_st_rad(self, stars):
+        """Test that the already log scaled st_rad maps linearly onto the marker size range."""
+        points = stars.iloc[:3].assign(st_rad=[0.0, 1.5, 3.0])
+        sizes = preview_figure(points).data[0].marker.size
+
+        np.testing.assert_allclose(sizes, [MARKER_SIZE_RANGE[0], sum(MARKER_SIZE_RANGE) / 2, MARKER_SIZE_RANGE[1]], atol=0.05)
+
+    def test_html_from_output(self, tmp_path):
+        """Test that the preview of npy pipeline output is one self contained html file."""
+        df = pd.DataFrame({
+            'ra': [0.0, 45.0, 90.0],
+            'dec': [0.0, 30.0, -30.0],
+            'sy_dist': [10.0, 20.0, 30.0],
+            'pl_rade': [1.0, 1.5, 2.0],
+            'st_rad': [1.0, 2.0, 5.0],
+            'st_teff': [3000, 5500, 6000],
+        })
+        save_output(convert_scale_clean_df(df), str(tmp_path / "output.npy"), "npy")
+
+        shown, total = generate_preview(str(tmp_path / "output.npy"), str(tmp_path / "preview.html"))
+        html = (tmp_path / "preview.html").read_text()
+
+        assert (shown, total) == (3, 3)
+        assert "scatter3d" in html
+        assert '<script src="http' not in html
@@ -0,0 +1,113 @@
+import json
+import pytest
+import pandas as pd
+
+from exo_planet.profiling import Profiler, NULL_PROFILER, profiled_iter
+from exo_planet.scale_transform_data import generate_from_local_csv
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """Fixture writing a planet table with a two planet system and a row without a position."""
+    path = tmp_path / "input.csv"
+    pd.DataFrame({
+        'hostname': ['A', 'A', 'B', 'C', 'D'],
+        'ra': [0.0, 0.0, 90.0, None, 180.0],
+        'dec': [0.0, 0.0, 45.0, 10.0, -45.0],
+        'sy_dist': [10.0, 10.0, 20.0, 25.0, 30.0],
+        'pl_rade': [1.0, 2.0, 3.0, 1.0, 4.0],
+        'st_rad': [1.0, 1.0, 2.0, 3.0, 5.0],
+        'st_teff': [5000, 5000, 6000, 5500, 4500]
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+class TestProfiler:
+    """Test suite for the stage profiler."""
+
+    def test_repeated_stages_summed(self):
+        """Test that stages of one name accumulate calls and rows."""
+        profiler = Profiler()
+        for rows in (10, 20):
+            with profiler.stage("clean", rows) as record:
+                record["rows_out"] = rows - 1
+
+        stage, = profiler.report()["stages"]
+        assert stage["calls"] == 2
+        assert (stage["rows_in"], stage["rows_out"], stage["rows_dropped"]) == (30, 28, 2)
+
+    def test_nested_self_time(self):
+        """Test that nested stage time is left out of the enclosing stage's self time."""
+        profiler = Profiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                sum(range(100000))
+
+        stages = {stage["name"]: stage for stage in profiler.report()["stages"]}
+        assert stages["outer"]["seconds"] >= stages["inner"]["seconds"]
+        assert stages["outer"]["self_seconds"] == pytest.approx(stages["outer"]["seconds"] - stages["inner"]["seconds"])
+
+    def test_trace_memory(self):
+        """Test that peak memory is only recorded when asked for."""
+        traced = Profiler(trace_memory=True)
+        with traced.stage("allocate"):
+            data = [0] * 100000
+        traced.close()
+        plain = Profiler()
+        with plain.stage("allocate"):
+            data = [0] * 100000
+
+        assert traced.report()["stages"][0]["peak_memory_bytes"] >= 800000
+        assert "peak_memory_bytes" not in plain.report()["stages"][0]
+
+    def test_nested_peak_carried_up(self):
+        """Test that an enclosing stage reports the peak of a nested stage, not only what came after it."""
+        profiler = Profiler(trace_memory=True)
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                data = [0] * 1000000
+                del data
+            with profiler.stage("small"):
+                small = [0] * 10
+        profiler.close()
+
+        stages = {stage["name"]: stage for stage in profiler.report()["stages"]}
+        assert stages["outer"]["peak_memory_bytes"] >= stages["inner"]["peak_memory_bytes"] >= 8000000
+        assert stages["small"]["peak_memory_bytes"] < 8000000
+
+    def test_profiled_iter(self):
+        """Test that iterating through profiled_iter records each item's length."""
+        profiler = Profiler()
+
+        items = list(profiled_iter(profiler, "load", [[1, 2], [3]]))
+
+        assert items == [[1, 2], [3]]
+        assert profiler.report()["stages"][0]["rows_out"] == 3
+
+    def test_null_profiler_records_nothing(self):
+        """Test that the disabled profiler is a shared no-op."""
+        with NULL_PROFILER.stage("clean", 10) as record:
+            record["rows_out"] = 5
+
+        assert NULL_PROFILER.stage("a") is NULL_PROFILER.stage("b")
+        assert list(profiled_iter(NULL_PROFILER, "load", [1, 2])) == [1, 2]
+
+
+class TestPipelineProfile:
+    """Test suite for profiling pipeline runs."""
+
+    @pytest.mark.parametrize("chunksize", [None, 2])
+    def test_report_counts_dropped_rows(self, input_csv, tmp_path, chunksize):
+        """Test that a profiled run reports each stage with the rows it dropped and leaves the output unchanged."""
+        profiler = Profiler()
+        generate_from_local_csv(input_csv, str(tmp_path / "profiled.csv"), chunksize, profiler=profiler)
+        generate_from_local_csv(input_csv, str(tmp_path / "plain.csv"), chunksize)
+
+        report = profiler.write(str(tmp_path / "profile.json"))
+
+        stages = {stage["name"]: stage for stage in report["stages"]}
+        assert {"load", "clean", "group_systems", "scale_transform", "write"} <= set(stages)
+        assert stages["clean"]["rows_dropped"] == 1
+        assert stages["scale_transform"]["rows_out"] == 3
+        assert json.loads((tmp_path / "profile.json").read_text())["stages"] == report["stages"]
+        assert (tmp_path / "profiled.csv").read_text() == (tmp_path / "plain.csv").read_text()
@@ -0,0 +1,171 @@
+import struct
+import zlib
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.data_func import save_png, save_png_bands
+from exo_planet.quilt import (
+    generate_quilt,
+    normalize_features,
+    render_quilt,
+    spectrum_lut,
+    tile_colors,
+)
+
+
+def read_png(path) -> np.ndarray:
+    """Decode an 8 bit RGB png written without scanline filters."""
+    data = open(path, "rb").read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    offset, idat = 8, b""
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        assert struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])[0] == zlib.crc32(kind + body)
+        if kind == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+            assert body[8:10] == bytes([8, 2])
+        elif kind == b"IDAT":
+            idat += body
+        offset += 12 + length
+    scanlines = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, width * 3 + 1)
+    assert (scanlines[:, 0] == 0).all()
+    return scanlines[:, 1:].reshape(height, width, 3)
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """Fixture writing a small table with a missing value."""
+    path = tmp_path / "input.csv"
+    pd.DataFrame({
+        'sy_dist': [30.0, 10.0, 20.0, 40.0, np.nan],
+        'st_teff': [3000.0, 6000.0, 4500.0, np.nan, 5000.0],
+        'st_rad': [1.0, 10.0, 100.0, 1.0, 1.0],
+        'pl_rade': [1.0, 2.0, 3.0, 4.0, 5.0],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+class TestPng:
+    """Test suite for the streaming png writer."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that pixels decode back unchanged."""
+        image = np.random.default_rng(0).integers(0, 256, (7, 5, 3), dtype=np.uint8)
+        save_png(image, str(tmp_path / "image.png"))
+
+        np.testing.assert_array_equal(read_png(tmp_path / "image.png"), image)
+
+    def test_bands_match_single_write(self, tmp_path):
+        """Test that writing in bands gives the same image as one write."""
+        image = np.random.default_rng(1).integers(0, 256, (9, 4, 3), dtype=np.uint8)
+        save_png_bands([image[:2], image[2:7], image[7:]], str(tmp_path / "bands.png"), 4, 9)
+
+        np.testing.assert_array_equal(read_png(tmp_path / "bands.png"), image)
+
+    def test_wrong_height_raises(self, tmp_path):
+        """Test that a band total different from the declared height is an error."""
+        with pytest.raises(ValueError):
+            save_png_bands([np.zeros((2, 4, 3), dtype=np.uint8)], str(tmp_path / "short.png"), 4, 3)
+
+
+class TestNormalizeFeatures:
+    """Test suite for the multi column min-max scaling."""
+
+    def test_columns_scaled_independently(self):
+        """Test that every column spans [0, 1] and missing values stay nan."""
+        result = normalize_features({'a': [1.0, 3.0, 2.0], 'b': [10.0, np.nan, 30.0]}, ['a', 'b'])
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result[:, 0], [0.0, 1.0, 0.5])
+        np.testing.assert_allclose(result[:, 1], [0.0, np.nan, 1.0])
+
+    def test_log_columns(self):
+        """Test that log columns are scaled by order of magnitude and non-positive values are missing."""
+        result = normalize_features({'a': [1.0, 10.0, 100.0, 0.0]}, ['a'], log_columns=['a'])
+
+        np.testing.assert_allclose(result[:, 0], [0.0, 0.5, 1.0, np.nan], atol=1e-6)
+
+    def test_constant_and_empty_columns(self):
+        """Test that a constant column scales to 0 and an all missing column stays missing."""
+        result = normalize_features({'a': [5.0, 5.0], 'b': [np.nan, np.nan]}, ['a', 'b'])
+
+        np.testing.assert_array_equal(result[:, 0], [0.0, 0.0])
+        assert np.isnan(result[:, 1]).all()
+
+
+class TestTileColors:
+    """Test suite for mapping normalized features to colours."""
+
+    def test_spectrum_ends(self):
+        """Test that the spectrum runs from violet to red."""
+        lut = spectrum_lut()
+
+        assert lut[-1].tolist() == [255, 0, 0]
+        assert lut[0][2] == 255 and lut[0][1] == 0
+
+    def test_single_feature_uses_spectrum(self):
+        """Test that one feature looks its colour up in the spectrum, missing is black."""
+        colors = tile_colors(np.array([[0.0], [1.0], [np.nan]], dtype=np.float32))
+
+        np.testing.assert_array_equal(colors, [spectrum_lut()[0], spectrum_lut()[-1], [0, 0, 0]])
+
+    def test_three_features_are_rgb(self):
+        """Test that three features become the red, green and blue channels."""
+        colors = tile_colors(np.array([[1.0, 0.0, 0.5], [np.nan, 1.0, 0.0]], dtype=np.float32))
+
+        np.testing.assert_array_equal(colors, [[255, 0, 128], [0, 255, 0]])
+
+    def test_other_feature_counts_raise(self):
+        """Test that two features are rejected."""
+        with pytest.raises(ValueError):
+            tile_colors(np.zeros((3, 2), dtype=np.float32))
+
+
+class TestRenderQuilt:
+    """Test suite for the quilt image."""
+
+    def test_tiles_in_reading_order(self, tmp_path):
+        """Test that tiles fill rows left to right, pad the last row in black and span tile pixels."""
+        colors = np.array([[10, 0, 0], [20, 0, 0], [30, 0, 0], [40, 0, 0], [50, 0, 0]], dtype=np.uint8)
+        shape = render_quilt(colors, str(tmp_path / "quilt.png"), columns=3, tile=2)
+        image = read_png(tmp_path / "quilt.png")
+
+        assert shape == (2, 3)
+        assert image.shape == (4, 6, 3)
+        np.testing.assert_array_equal(image[::2, ::2, 0], [[10, 20, 30], [40, 50, 0]])
+        np.testing.assert_array_equal(image[1::2, 1::2], image[::2, ::2])
+
+    def test_small_bands_match(self, tmp_path, monkeypatch):
+        """Test that rendering a band per tile row gives the same image."""
+        colors = np.random.default_rng(2).integers(0, 256, (50, 3), dtype=np.uint8)
+        render_quilt(colors, str(tmp_path / "whole.png"), tile=3)
+        monkeypatch.setattr("exo_planet.quilt.BAND_BYTES", 1)
+        render_quilt(colors, str(tmp_path / "banded.png"), tile=3)
+
+        np.testing.assert_array_equal(read_png(tmp_path / "banded.png"), read_png(tmp_path / "whole.png"))
+
+
+class TestGenerateQuilt:
+    """Test suite for the quilt from a table."""
+
+    def test_sorted_spectrum(self, input_csv, tmp_path):
+        """Test that tiles are ordered by the sort column with missing keys last."""
+        generate_quilt(input_csv, str(tmp_path / "quilt.png"), ['st_teff'], 'sy_dist', tile=1, columns=5)
+        image = read_png(tmp_path / "quilt.png")
+
+        lut = spectrum_lut()
+        # sy_dist order 10, 20, 30, 40, nan -> st_teff 6000, 4500, 3000, nan, 5000
+        np.testing.assert_array_equal(image[0], [lut[-1], lut[128], lut[0], [0, 0, 0], lut[170]])
+
+    def test_descending_rgb_from_npy(self, input_csv, tmp_path):
+        """Test an rgb composite sorted largest first, read from a structured npy file."""
+        df = pd.read_csv(input_csv)
+        np.save(tmp_path / "input.npy", df.to_records(index=False))
+        generate_quilt(str(tmp_path / "input.npy"), str(tmp_path / "quilt.png"), ['pl_rade', 'st_rad', 'st_teff'],
+                       'pl_rade', tile=1, columns=5, log_columns=['st_rad'], descending=True)
+        image = read_png(tmp_path / "quilt.png")
+
+        np.testing.assert_array_equal(image[0, :, 0], [255, 191, 128, 64, 0])
+        np.testing.assert_array_equal(image[0, :, 1], [0, 0, 255, 128, 0])
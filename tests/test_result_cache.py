@@ -0,0 +1,113 @@
+import os
+from unittest.mock import patch
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.result_cache import clear_cache, evict, load_result, result_key, store_result
+from exo_planet.scale_transform_data import generate_from_local_csv, pipeline_params
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    """Fixture writing a small planet table with two planets in one system."""
+    path = tmp_path / "input.csv"
+    pd.DataFrame({
+        'hostname': ['a', 'a', 'b', 'c'],
+        'ra': [0.0, 0.0, 90.0, 180.0],
+        'dec': [0.0, 0.0, 30.0, -30.0],
+        'sy_dist': [10.0, 10.0, 20.0, 30.0],
+        'pl_rade': [1.0, 2.0, 1.5, 0.5],
+        'st_rad': [1.0, 1.0, 2.0, 5.0],
+        'st_teff': [3000, 3000, 5500, 6000],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def entry_bytes(cache_dir):
+    return [os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)]
+
+
+class TestResultCache:
+    """Test suite for the content addressed result cache."""
+
+    def test_key_follows_contents_and_params(self, input_csv, tmp_path):
+        """Test that the key changes with the file contents and the parameters, not the file name."""
+        key = result_key(input_csv, pipeline_params())
+        copy = tmp_path / "copy.csv"
+        copy.write_bytes(open(input_csv, "rb").read())
+
+        assert result_key(str(copy), pipeline_params()) == key
+        assert result_key(input_csv, pipeline_params(scale_factor=1)) != key
+        assert result_key(input_csv, pipeline_params(np.float32)) != key
+        copy.write_bytes(open(input_csv, "rb").read() + b"d,1,1,1,1,1,1\n")
+        assert result_key(str(copy), pipeline_params()) != key
+
+    def test_round_trip_is_lossless(self, tmp_path):
+        """Test that columns come back with the same values, dtypes and order."""
+        df = pd.DataFrame({
+            'x': np.array([0.1, 1 / 3], dtype=np.float64),
+            'y': np.array([0.1, 2.5], dtype=np.float32),
+            'color_r': np.array([1, 255], dtype=np.uint8),
+            'planet_count': np.array([1, 3], dtype=np.int64),
+        })
+        store_result(str(tmp_path), "key", df)
+
+        pd.testing.assert_frame_equal(load_result(str(tmp_path), "key"), df)
+        assert load_result(str(tmp_path), "missing") is None
+
+    def test_string_columns_round_trip(self, tmp_path):
+        """Test that string columns are stored without pickling and come back as strings."""
+        df = pd.DataFrame({'feature': ['pl_rade', 'st_teff'], 'r': [0.5, -0.25]})
+        store_result(str(tmp_path), "key", df)
+
+        pd.testing.assert_frame_equal(load_result(str(tmp_path), "key"), df)
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        """Test that going over the size evicts the entry used longest ago."""
+        cache_dir = str(tmp_path)
+        df = pd.DataFrame({'x': np.arange(1000, dtype=np.float64)})
+        store_result(cache_dir, "a", df)
+        store_result(cache_dir, "b", df)
+        os.utime(os.path.join(cache_dir, "a.npz"), (1, 1))
+        os.utime(os.path.join(cache_dir, "b.npz"), (2, 2))
+        load_result(cache_dir, "a")
+
+        store_result(cache_dir, "c", df, max_bytes=sum(entry_bytes(cache_dir)))
+
+        assert sorted(os.listdir(cache_dir)) == ["a.npz", "c.npz"]
+
+    def test_evict_and_clear(self, tmp_path):
+        """Test that evicting to zero bytes and clearing delete every entry."""
+        df = pd.DataFrame({'x': np.zeros(10)})
+        for key in "abc":
+            store_result(str(tmp_path), key, df)
+
+        assert evict(str(tmp_path), 0, keep=os.path.join(str(tmp_path), "c.npz")) == 2
+        assert clear_cache(str(tmp_path)) == 1
+        assert clear_cache(str(tmp_path / "missing")) == 0
+
+
+class TestCachedGenerate:
+    """Test suite for the cache in generate_from_local_csv."""
+
+    def test_hit_skips_pipeline(self, input_csv, tmp_path):
+        """Test that a second run writes the same output without running the pipeline."""
+        cache_dir = str(tmp_path / "cache")
+        generate_from_local_csv(input_csv, str(tmp_path / "first.csv"), cache_dir=cache_dir)
+
+        with patch('exo_planet.scale_transform_data.convert_scale_clean_df') as mock_convert:
+            generate_from_local_csv(input_csv, str(tmp_path / "second.csv"), cache_dir=cache_dir)
+
+        mock_convert.assert_not_called()
+        assert open(tmp_path / "second.csv").read() == open(tmp_path / "first.csv").read()
+
+    def test_cached_result_serves_other_formats(self, input_csv, tmp_path):
+        """Test that a chunked run and an npy run reuse the cached result bit for bit."""
+        cache_dir = str(tmp_path / "cache")
+        generate_from_local_csv(input_csv, str(tmp_path / "plain.npy"), output_format="npy")
+        generate_from_local_csv(input_csv, str(tmp_path / "chunked.csv"), chunksize=2, cache_dir=cache_dir)
+        generate_from_local_csv(input_csv, str(tmp_path / "cached.npy"), output_format="npy", cache_dir=cache_dir)
+
+        assert len(os.listdir(cache_dir)) == 1
+        np.testing.assert_array_equal(np.load(tmp_path / "cached.npy"), np.load(tmp_path / "plain.npy"))
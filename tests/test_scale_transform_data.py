@@ -8,10 +8,16 @@ from exo_planet.scale_transform_data import (
     linear_scale,
     convert_to_cart,
     convert_scale_clean_df,
+    clean_df,
+    compute_bounds,
+    clean_csv_chunked,
+    group_systems,
+    merge_systems,
     generate_from_local_csv,
     generate_from_api,
     SCALE_FACTOR_CONST
 )
+from exo_planet.data_func import load_from_npy
 
 
 class TestLinearScale:
@@ -199,21 +205,22 @@ class TestConvertScaleCleanDf:
         assert len(result) == 2
     
     def test_convert_scale_clean_df_removes_duplicates(self):
-        """Test that duplicate sy_dist values are removed."""
+        """Test that planets of one system collapse into one row while systems sharing a distance stay apart."""
         df = pd.DataFrame({
-            'ra': [0.0, 90.0, 180.0],
-            'dec': [0.0, 0.0, 0.0],
-            'sy_dist': [10.0, 10.0, 20.0],  # Two duplicates
-            'pl_rade': [1.0, 2.0, 3.0],
-            'st_rad': [1.0, 10.0, 5.0],
-            'st_teff': [5000, 6000, 5500]
+            'ra': [0.0, 0.0, 90.0, 180.0],
+            'dec': [0.0, 0.0, 0.0, 0.0],
+            'sy_dist': [10.0, 10.0, 10.0, 20.0],  # Two planets of one system, a second system at the same distance
+            'pl_rade': [1.0, 4.0, 2.0, 3.0],
+            'st_rad': [1.0, 1.0, 10.0, 5.0],
+            'st_teff': [5000, 5000, 6000, 5500]
         })
         
         result = convert_scale_clean_df(df)
         
-        # Should have 2 rows (one duplicate removed)
-        assert len(result) == 2
-        assert result['sy_dist'].nunique() == 2
+        # Should have 3 rows (the second planet of the first system merged)
+        assert len(result) == 3
+        assert result['planet_count'].tolist() == [2, 1, 1]
+        assert result['max_pl_rade'].tolist() == [4.0, 2.0, 3.0]
     
     def test_convert_scale_clean_df_log_transform_radius(self):
         """Test that stellar radius is log-transformed."""
@@ -346,7 +353,7 @@ class TestGenerateFromApi:
         # Verify pull_from_astro_api was called with correct arguments
         mock_pull.assert_called_once_with(
             'ps',
-            ["ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
+            ["hostname", "ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
         )
         
         # Verify save_to_csv was called
@@ -373,7 +380,7 @@ class TestGenerateFromApi:
         
         # Check that the correct column list was passed
         call_args = mock_pull.call_args[0]
-        expected_columns = ["ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
+        expected_columns = ["hostname", "ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"]
         assert call_args[1] == expected_columns
     
     @patch('exo_planet.scale_transform_data.save_to_csv')
@@ -398,6 +405,33 @@ class TestGenerateFromApi:
         assert len(saved_df) == 1
 
 
+    @patch('exo_planet.scale_transform_data.save_to_csv')
+    @patch('exo_planet.scale_transform_data.pull_from_astro_api')
+    @patch('exo_planet.scale_transform_data.pull_from_astro_api_cached')
+    def test_generate_from_api_uses_cache(self, mock_cached, mock_pull, mock_save):
+        """Test that a cache directory routes the pull through the cache."""
+        mock_cached.return_value = pd.DataFrame({
+            'ra': [45.0],
+            'dec': [30.0],
+            'sy_dist': [15.0],
+            'pl_rade': [1.5],
+            'st_rad': [2.0],
+            'st_teff': [5500]
+        })
+
+        generate_from_api('output.csv', cache_dir='cache', refresh=True, ttl=60)
+
+        mock_pull.assert_not_called()
+        mock_cached.assert_called_once_with(
+            'ps',
+            ["hostname", "ra", "dec", "sy_dist", "pl_rade", "st_rad", "st_teff"],
+            'cache',
+            60,
+            True
+        )
+        mock_save.assert_called_once()
+
+
 class TestEdgeCases:
     """Test suite for edge cases and error conditions."""
     
@@ -472,4 +506,149 @@ class TestIntegration:
                 assert 'x' in saved_df.columns
                 assert 'y' in saved_df.columns
                 assert 'z' in saved_df.columns
-                assert len(saved_df) <= len(sample_exoplanet_data)
\ No newline at end of file
+                assert len(saved_df) <= len(sample_exoplanet_data)
+
+
+@pytest.fixture
+def archive_csv(tmp_path):
+    """Write an archive-like csv with extra columns, NaNs and repeated systems across chunk boundaries."""
+    df = pd.DataFrame({
+        'pl_name': ['a b', 'a c', 'b b', 'c b', 'c c', 'd b', 'e b'],
+        'ra': [0.0, 0.0, 45.0, 90.0, 90.0, 135.0, 180.0],
+        'dec': [0.0, 0.0, 30.0, -30.0, -30.0, np.nan, -60.0],
+        'sy_dist': [10.0, 10.0, 20.0, 30.0, 30.0, 40.0, 50.0],
+        'pl_rade': [1.0, 1.2, 1.5, 2.0, 2.2, 0.5, 3.0],
+        'st_rad': [1.0, 1.0, 2.0, 5.0, 5.0, 10.0, 50.0],
+        'st_teff': [5000, 5000, 5500, 6000, 6000, 4500, 7000]
+    })
+    path = tmp_path / "archive.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+class TestGroupSystems:
+    """Tests for grouping planet rows into host systems."""
+
+    def test_grouped_by_hostname(self):
+        """Test that hostname decides the system even when positions differ slightly."""
+        df = pd.DataFrame({
+            'hostname': ['A', 'B', 'A'],
+            'ra': [0.0, 45.0, 0.001],
+            'dec': [0.0, 30.0, 0.0],
+            'sy_dist': [10.0, 10.0, 10.5],
+            'pl_rade': [1.0, 2.0, 3.0],
+            'st_rad': [1.0, 2.0, 1.0],
+            'st_teff': [5000.0, 5500.0, 5000.0]
+        })
+
+        result = group_systems(df)
+
+        assert result.index.tolist() == ['A', 'B']
+        assert result['planet_count'].tolist() == [2, 1]
+        assert result['max_pl_rade'].tolist() == [3.0, 2.0]
+        assert result.loc['A', 'sy_dist'] == 10.0
+
+    def test_planet_without_radius_still_counted(self):
+        """Test that a missing pl_rade counts the planet and takes the radius from the next one."""
+        df = pd.DataFrame({
+            'hostname': ['A', 'A', 'B'],
+            'ra': [0.0, 0.0, 45.0],
+            'dec': [0.0, 0.0, 30.0],
+            'sy_dist': [10.0, 10.0, 20.0],
+            'pl_rade': [np.nan, 3.0, np.nan],
+            'st_rad': [1.0, 1.0, 2.0],
+            'st_teff': [5000, 5000, 5500]
+        })
+
+        result = clean_df(df)
+
+        assert result.index.tolist() == ['A']
+        assert result['pl_rade'].tolist() == [3.0]
+        assert result['planet_count'].tolist() == [2]
+
+    def test_merge_matches_single_grouping(self, archive_csv):
+        """Test that merging per piece groupings gives the grouping of the whole table."""
+        df = pd.read_csv(archive_csv).dropna()
+
+        result = merge_systems([group_systems(df.iloc[:3]), group_systems(df.iloc[3:])])
+
+        pd.testing.assert_frame_equal(result, group_systems(df))
+
+
+class TestChunkedStreaming:
+    """Tests for the chunked streaming mode of the local pipeline."""
+
+    def test_chunked_bounds_match_full_bounds(self, archive_csv):
+        """Test that cleaning in chunks gives the same global bounds as the in-memory path."""
+        expected = compute_bounds(clean_df(pd.read_csv(archive_csv)))
+
+        result = compute_bounds(clean_csv_chunked(archive_csv, chunksize=2))
+
+        assert result == expected
+
+    @pytest.mark.parametrize("chunksize", [1, 2, 3, 100])
+    def test_chunked_output_matches_full_output(self, archive_csv, tmp_path, chunksize):
+        """Test that streaming produces the same rows as loading the whole file."""
+        full_output = tmp_path / "full.csv"
+        chunked_output = tmp_path / "chunked.csv"
+
+        generate_from_local_csv(archive_csv, str(full_output))
+        generate_from_local_csv(archive_csv, str(chunked_output), chunksize=chunksize)
+
+        pd.testing.assert_frame_equal(pd.read_csv(chunked_output), pd.read_csv(full_output))
+
+    def test_chunked_output_groups_systems_across_chunks(self, archive_csv, tmp_path):
+        """Test that a system split over two chunks is grouped into one row with all its planets."""
+        output = tmp_path / "chunked.csv"
+
+        generate_from_local_csv(archive_csv, str(output), chunksize=1)
+
+        result = pd.read_csv(output)
+        assert len(result) == 4
+        assert result['planet_count'].tolist() == [2, 1, 2, 1]
+        assert result['max_pl_rade'].tolist() == [1.2, 1.5, 2.2, 3.0]
+
+
+class TestNpyOutput:
+    """Tests for the memory mappable npy output format."""
+
+    def test_npy_output_matches_csv_output(self, archive_csv, tmp_path):
+        """Test that npy output holds the same named columns and values as csv output."""
+        csv_output = tmp_path / "output.csv"
+        npy_output = tmp_path / "output.npy"
+
+        generate_from_local_csv(archive_csv, str(csv_output))
+        generate_from_local_csv(archive_csv, str(npy_output), output_format="npy")
+
+        expected = pd.read_csv(csv_output)
+        result = load_from_npy(str(npy_output))
+        assert list(result.dtype.names) == expected.columns.tolist()
+        for col in ['x', 'y', 'z', 'st_rad', 'st_teff']:
+            np.testing.assert_allclose(result[col], expected[col])
+
+    def test_npy_output_is_memory_mapped(self, archive_csv, tmp_path):
+        """Test that consumers get a read-only memory map rather than a parsed copy."""
+        npy_output = tmp_path / "output.npy"
+
+        generate_from_local_csv(archive_csv, str(npy_output), output_format="npy")
+
+        result = load_from_npy(str(npy_output))
+        assert isinstance(result, np.memmap)
+        assert not result.flags.writeable
+
+    def test_npy_extension_added(self, archive_csv, tmp_path):
+        """Test that the npy extension is appended when missing."""
+        generate_from_local_csv(archive_csv, str(tmp_path / "output"), output_format="npy")
+
+        assert (tmp_path / "output.npy").exists()
+
+    def test_chunked_npy_output_matches_full_output(self, archive_csv, tmp_path):
+        """Test that streaming into npy gives the same array as the in-memory path."""
+        full_output = tmp_path / "full.npy"
+        chunked_output = tmp_path / "chunked.npy"
+
+        generate_from_local_csv(archive_csv, str(full_output), output_format="npy")
+        generate_from_local_csv(archive_csv, str(chunked_output), chunksize=2, output_format="npy")
+
+        np.testing.assert_array_equal(load_from_npy(str(chunked_output)), load_from_npy(str(full_output)))
+        assert not (tmp_path / "chunked.npy.part").exists()
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.schema import SCHEMA_VERSION, schema_dtype, schema_version, to_records
+from exo_planet.scale_transform_data import convert_scale_clean_df, generate_from_local_csv
+from exo_planet.data_func import load_from_npy
+
+
+@pytest.fixture
+def output_df():
+    """Fixture providing pipeline output for a few systems."""
+    return convert_scale_clean_df(pd.DataFrame({
+        'hostname': ['A', 'A', 'B', 'C'],
+        'ra': [0.0, 0.0, 90.0, 180.0],
+        'dec': [0.0, 0.0, 45.0, -45.0],
+        'sy_dist': [10.0, 10.0, 20.0, 30.0],
+        'pl_rade': [1.0, 2.0, 3.0, 4.0],
+        'st_rad': [1.0, 1.0, 2.0, 5.0],
+        'st_teff': [5000.4, 5000.4, 6000.6, 4500.0]
+    }))
+
+
+class TestToRecords:
+    """Test suite for packing output into the versioned schema."""
+
+    def test_packed_dtype(self, output_df):
+        """Test that the packed array has the current schema's dtype."""
+        result = to_records(output_df)
+
+        assert result.dtype == schema_dtype()
+        assert result.dtype['x'] == np.float32
+        assert result.dtype['st_teff'] == np.uint16
+
+    def test_at_least_halves_size(self, output_df):
+        """Test that the packed records take at most half the bytes of the unpacked ones."""
+        result = to_records(output_df)
+
+        assert result.nbytes * 2 <= output_df.to_records(index=False).nbytes
+
+    def test_fields_taken_by_name(self, output_df):
+        """Test that column order and extra columns do not change the packed result."""
+        shuffled = output_df[output_df.columns[::-1]].assign(extra=1.0)
+
+        np.testing.assert_array_equal(to_records(shuffled), to_records(output_df))
+
+    def test_values_preserved(self, output_df):
+        """Test that float fields keep float32 precision and integers are rounded."""
+        result = to_records(output_df)
+
+        np.testing.assert_allclose(result['x'], output_df['x'], rtol=1e-6)
+        assert result['st_teff'].tolist() == [5000, 6001, 4500]
+        assert result['planet_count'].tolist() == [2, 1, 1]
+
+    def test_integers_clamped(self, output_df):
+        """Test that out of range integer values saturate instead of wrapping."""
+        result = to_records(output_df.assign(st_teff=[-5.0, 70000.0, 100.0]))
+
+        assert result['st_teff'].tolist() == [0, 65535, 100]
+
+    def test_missing_column_raises(self, output_df):
+        """Test that output without a schema column is rejected."""
+        with pytest.raises(ValueError):
+            to_records(output_df.drop(columns=['x']))
+
+
+class TestSchemaVersion:
+    """Test suite for recognising the schema of stored arrays."""
+
+    def test_npy_output_detected(self, tmp_path):
+        """Test that npy pipeline output is recognised as the current schema."""
+        input_csv = tmp_path / "input.csv"
+        pd.DataFrame({
+            'ra': [0.0, 90.0], 'dec': [0.0, 0.0], 'sy_dist': [10.0, 20.0],
+            'pl_rade': [1.0, 2.0], 'st_rad': [1.0, 2.0], 'st_teff': [5000, 6000]
+        }).to_csv(input_csv, index=False)
+
+        generate_from_local_csv(str(input_csv), str(tmp_path / "output.npy"), output_format="npy")
+
+        assert schema_version(load_from_npy(str(tmp_path / "output.npy")).dtype) == SCHEMA_VERSION
+
+    def test_unknown_dtype(self, output_df):
+        """Test that an unpacked array matches no schema."""
+        assert schema_version(output_df.to_records(index=False).dtype) is None
+
+    def test_unknown_version_raises(self):
+        """Test that asking for a schema that does not exist fails."""
+        with pytest.raises(ValueError):
+            schema_dtype(SCHEMA_VERSION + 1)
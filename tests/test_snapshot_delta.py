@@ -0,0 +1,165 @@
+import warnings
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.scale_transform_data import convert_scale_clean_df, save_output
+from exo_planet.data_func import load_output
+from exo_planet.snapshot_delta import (
+    keyed_clean_df,
+    diff_snapshots,
+    apply_snapshot_delta,
+    generate_incremental,
+)
+
+
+@pytest.fixture
+def old_snapshot():
+    """Fixture providing an archive snapshot with one host listed twice (two planets)."""
+    return pd.DataFrame({
+        'hostname': ['A', 'A', 'B', 'C', 'D'],
+        'ra': [0.0, 0.0, 45.0, 90.0, 135.0],
+        'dec': [0.0, 0.0, 30.0, -30.0, 60.0],
+        'sy_dist': [10.0, 10.0, 20.0, 30.0, 50.0],
+        'pl_rade': [1.0, 1.1, 1.5, 2.0, 0.5],
+        'st_rad': [1.0, 1.0, 2.0, 5.0, 10.0],
+        'st_teff': [5000, 5000, 5500, 6000, 4500]
+    })
+
+
+@pytest.fixture
+def new_snapshot(old_snapshot):
+    """Fixture providing the next snapshot: B removed, C moved, D updated, E added, bounds unchanged."""
+    new = old_snapshot[old_snapshot['hostname'] != 'B'].copy()
+    new.loc[new['hostname'] == 'C', 'ra'] = 91.0
+    new.loc[new['hostname'] == 'D', 'st_teff'] = 4600
+    added = pd.DataFrame({
+        'hostname': ['E'], 'ra': [180.0], 'dec': [-60.0], 'sy_dist': [40.0],
+        'pl_rade': [3.0], 'st_rad': [5.0], 'st_teff': [7000]
+    })
+    return pd.concat([new, added], ignore_index=True)
+
+
+class TestKeyedCleanDf:
+    """Test suite for keying cleaned snapshots by system."""
+
+    def test_keyed_rows_match_pipeline_rows(self, old_snapshot):
+        """Test that keyed rows line up with convert_scale_clean_df output."""
+        result = keyed_clean_df(old_snapshot)
+
+        assert result.index.tolist() == ['A', 'B', 'C', 'D']
+        assert len(result) == len(convert_scale_clean_df(old_snapshot))
+
+    def test_missing_key_raises(self, old_snapshot):
+        """Test that snapshots without a system key are rejected."""
+        with pytest.raises(ValueError):
+            keyed_clean_df(old_snapshot.drop(columns=['hostname']))
+
+    def test_host_grouped_into_one_key(self):
+        """Test that one host listed at two distances stays a single system."""
+        df = pd.DataFrame({
+            'hostname': ['A', 'A'], 'ra': [0.0, 0.0], 'dec': [0.0, 0.0], 'sy_dist': [10.0, 11.0],
+            'pl_rade': [1.0, 1.0], 'st_rad': [1.0, 1.0], 'st_teff': [5000, 5000]
+        })
+
+        result = keyed_clean_df(df)
+
+        assert result.index.tolist() == ['A']
+        assert result['planet_count'].tolist() == [2]
+
+
+class TestDiffSnapshots:
+    """Test suite for diffing two keyed snapshots."""
+
+    def test_diff_classifies_systems(self, old_snapshot, new_snapshot):
+        """Test that each system lands in the right change class."""
+        diff = diff_snapshots(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot))
+
+        assert diff['added'].tolist() == ['E']
+        assert diff['removed'].tolist() == ['B']
+        assert diff['moved'].tolist() == ['C']
+        assert diff['updated'].tolist() == ['D']
+        assert diff['unchanged'].tolist() == ['A']
+
+
+class TestApplySnapshotDelta:
+    """Test suite for the incremental transform."""
+
+    def test_incremental_output_matches_full_recompute(self, old_snapshot, new_snapshot):
+        """Test that reusing unchanged rows gives the same output as a full run."""
+        previous_output = convert_scale_clean_df(old_snapshot)
+
+        output, delta = apply_snapshot_delta(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot), previous_output)
+
+        pd.testing.assert_frame_equal(output, convert_scale_clean_df(new_snapshot).reset_index(drop=True))
+        assert sorted(delta['status']) == ['added', 'moved', 'removed', 'updated']
+
+    def test_unchanged_rows_are_reused(self, old_snapshot, new_snapshot):
+        """Test that unchanged systems are copied from the previous output, not recomputed."""
+        previous_output = convert_scale_clean_df(old_snapshot)
+        previous_output.iloc[0, previous_output.columns.get_loc('x')] = -1.0
+
+        output, _ = apply_snapshot_delta(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot), previous_output)
+
+        assert output.loc[0, 'x'] == -1.0
+
+    def test_shifted_bounds_rescale_everything(self, old_snapshot, new_snapshot):
+        """Test that a new farthest system forces a full recompute reported as rescaled rows."""
+        new_snapshot.loc[new_snapshot['hostname'] == 'E', 'sy_dist'] = 100.0
+        previous_output = convert_scale_clean_df(old_snapshot)
+
+        output, delta = apply_snapshot_delta(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot), previous_output)
+
+        pd.testing.assert_frame_equal(output, convert_scale_clean_df(new_snapshot).reset_index(drop=True))
+        assert delta.loc[delta['hostname'] == 'A', 'status'].tolist() == ['rescaled']
+
+    def test_identical_snapshot_reuses_everything(self, old_snapshot):
+        """Test that an unchanged snapshot gives the previous output and an empty delta, without warnings."""
+        previous_output = convert_scale_clean_df(old_snapshot)
+        keyed = keyed_clean_df(old_snapshot)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            output, delta = apply_snapshot_delta(keyed, keyed, previous_output)
+
+        pd.testing.assert_frame_equal(output, previous_output.reset_index(drop=True))
+        assert delta.empty
+
+    def test_other_dtypes_or_parameters_rescale(self, old_snapshot, new_snapshot, tmp_path):
+        """Test that float32 npy output or output of other scale parameters is recomputed, not mixed in."""
+        save_output(convert_scale_clean_df(old_snapshot), str(tmp_path / "prev.npy"), "npy")
+        expected = convert_scale_clean_df(new_snapshot).reset_index(drop=True)
+
+        for previous_output in (load_output(str(tmp_path / "prev.npy")), convert_scale_clean_df(old_snapshot, scale_factor=1000)):
+            output, delta = apply_snapshot_delta(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot), previous_output)
+
+            pd.testing.assert_frame_equal(output, expected)
+            assert delta.loc[delta['hostname'] == 'A', 'status'].tolist() == ['rescaled']
+
+    def test_removed_rows_have_no_coordinates(self, old_snapshot, new_snapshot):
+        """Test that removed systems are listed by key only."""
+        previous_output = convert_scale_clean_df(old_snapshot)
+
+        _, delta = apply_snapshot_delta(keyed_clean_df(old_snapshot), keyed_clean_df(new_snapshot), previous_output)
+
+        removed = delta[delta['status'] == 'removed']
+        assert removed['hostname'].tolist() == ['B']
+        assert removed[['x', 'y', 'z']].isna().all().all()
+
+
+class TestGenerateIncremental:
+    """Integration test for the incremental files."""
+
+    def test_generate_incremental_writes_output_and_delta(self, old_snapshot, new_snapshot, tmp_path):
+        """Test the full incremental run from snapshot files to output and delta files."""
+        old_csv, new_csv = tmp_path / "old.csv", tmp_path / "new.csv"
+        previous_output, output, delta_csv = tmp_path / "prev.csv", tmp_path / "out.csv", tmp_path / "delta.csv"
+        old_snapshot.to_csv(old_csv, index=False)
+        new_snapshot.to_csv(new_csv, index=False)
+        convert_scale_clean_df(old_snapshot).to_csv(previous_output, index=False)
+
+        counts = generate_incremental(str(old_csv), str(new_csv), str(previous_output), str(output), str(delta_csv))
+
+        assert counts == {'added': 1, 'removed': 1, 'moved': 1, 'updated': 1, 'rescaled': 0}
+        np.testing.assert_allclose(pd.read_csv(output)[['x', 'y', 'z']], convert_scale_clean_df(new_snapshot)[['x', 'y', 'z']])
+        assert len(pd.read_csv(delta_csv)) == 4
@@ -0,0 +1,124 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.spatial_index import (
+    KDTree,
+    build_index_from_df,
+    frustum_planes,
+    generate_index,
+)
+
+
+@pytest.fixture
+def points():
+    """Fixture providing a clustered random point cloud like the scaled catalogue."""
+    rng = np.random.default_rng(42)
+    return rng.normal(scale=[500.0, 300.0, 200.0], size=(2000, 3))
+
+
+@pytest.fixture
+def tree(points):
+    """Fixture providing a tree with small leaves so queries cross many nodes."""
+    return KDTree(points, leaf_size=8)
+
+
+def brute_force_radius(points, center, radius):
+    return np.nonzero(((points - center) ** 2).sum(axis=1) <= radius ** 2)[0]
+
+
+class TestKDTreeBuild:
+    """Test suite for building the tree."""
+
+    def test_order_is_permutation(self, tree, points):
+        """Test that every point is stored exactly once."""
+        assert len(tree) == len(points)
+        assert np.array_equal(np.sort(tree.order), np.arange(len(points)))
+        np.testing.assert_array_equal(tree.points, points[tree.order])
+
+    def test_empty_tree(self):
+        """Test that queries on an empty tree return nothing."""
+        tree = KDTree(np.empty((0, 3)))
+
+        assert len(tree.query_radius([0, 0, 0], 1.0)) == 0
+        assert len(tree.query_knn([0, 0, 0], 3)[0]) == 0
+
+    def test_build_from_df(self):
+        """Test that indices refer to DataFrame row positions."""
+        df = pd.DataFrame({'x': [0.0, 10.0, 20.0], 'y': [0.0, 0.0, 0.0], 'z': [0.0, 0.0, 0.0], 'st_rad': [1.0, 2.0, 3.0]})
+
+        tree = build_index_from_df(df)
+
+        idx, _ = tree.query_knn([19.0, 0.0, 0.0], 1)
+        assert idx.tolist() == [2]
+
+
+class TestKDTreeQueries:
+    """Test suite comparing tree queries with linear scans."""
+
+    @pytest.mark.parametrize("radius", [0.0, 50.0, 200.0, 5000.0])
+    def test_query_radius_matches_brute_force(self, tree, points, radius):
+        """Test radius queries from a catalogue point."""
+        center = points[7]
+
+        result = tree.query_radius(center, radius)
+
+        assert np.array_equal(np.sort(result), brute_force_radius(points, center, radius))
+
+    @pytest.mark.parametrize("k", [1, 5, 40])
+    def test_query_knn_matches_brute_force(self, tree, points, k):
+        """Test that the k nearest neighbours are found nearest first."""
+        query = np.array([10.0, -20.0, 5.0])
+        expected = np.sort(np.sqrt(((points - query) ** 2).sum(axis=1)))[:k]
+
+        idx, dist = tree.query_knn(query, k)
+
+        np.testing.assert_allclose(dist, expected)
+        np.testing.assert_allclose(np.sqrt(((points[idx] - query) ** 2).sum(axis=1)), dist)
+
+    def test_query_knn_more_than_points(self):
+        """Test that k larger than the tree returns every point."""
+        tree = KDTree(np.arange(9.0).reshape(3, 3))
+
+        idx, _ = tree.query_knn([0, 0, 0], 10)
+
+        assert idx.tolist() == [0, 1, 2]
+
+    def test_query_frustum_matches_brute_force(self, tree, points):
+        """Test frustum culling against testing every point on every plane."""
+        planes = frustum_planes([0, 0, 0], [1, 0.2, 0.1], fov=50, aspect=16 / 9, near=10, far=800)
+
+        result = tree.query_frustum(planes)
+
+        inside = np.all(points @ planes[:, :3].T + planes[:, 3] >= 0, axis=1)
+        assert np.array_equal(np.sort(result), np.nonzero(inside)[0])
+
+    def test_frustum_planes_contain_target_only(self):
+        """Test that the camera target is inside and a point behind the camera is outside."""
+        planes = frustum_planes([0, 0, 0], [10, 0, 0], fov=30)
+
+        assert np.all(planes[:, :3] @ [10, 0, 0] + planes[:, 3] >= 0)
+        assert np.any(planes[:, :3] @ [-10, 0, 0] + planes[:, 3] < 0)
+        assert np.any(planes[:, :3] @ [10, 10, 0] + planes[:, 3] < 0)
+
+
+class TestKDTreeSerialization:
+    """Test suite for the on-disk form of the tree."""
+
+    def test_save_load_round_trip(self, tree, points, tmp_path):
+        """Test that a loaded tree answers queries like the original."""
+        path = tmp_path / "index.npz"
+        tree.save(str(path))
+
+        loaded = KDTree.load(str(path))
+
+        assert np.array_equal(np.sort(loaded.query_radius(points[0], 300.0)), np.sort(tree.query_radius(points[0], 300.0)))
+
+    def test_generate_index_from_output_csv(self, tmp_path):
+        """Test building the index from a pipeline output file."""
+        input_path, index_path = tmp_path / "output.csv", tmp_path / "index.npz"
+        pd.DataFrame({'x': [0.0, 1.0], 'y': [0.0, 1.0], 'z': [0.0, 1.0]}).to_csv(input_path, index=False)
+
+        generate_index(str(input_path), str(index_path))
+
+        assert len(KDTree.load(str(index_path))) == 2
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.spike_ball import generate_spike_ball, load_spike_ball, spike_buffers, spike_lengths
+from exo_planet.star_color import teff_to_rgb
+
+
+@pytest.fixture
+def planets():
+    """Fixture of three systems, one with two planets and one without a position."""
+    return pd.DataFrame({
+        'hostname': ['a', 'a', 'b', 'c', 'd'],
+        'ra': [0.0, 0.0, 90.0, 0.0, np.nan],
+        'dec': [0.0, 0.0, 0.0, 90.0, 0.0],
+        'sy_dist': [10.0, 10.0, 100.0, 1000.0, 5.0],
+        'pl_rade': [1.0, 2.0, 1.5, 0.5, 1.0],
+        'st_rad': [1.0, 1.0, 2.0, 5.0, 1.0],
+        'st_teff': [3000, 3000, 5500, 9000, 4000],
+    })
+
+
+class TestSpikeBuffers:
+    """Test suite for the spike geometry buffers."""
+
+    def test_segments_from_origin(self):
+        """Test that every spike runs from its own origin vertex to a unit tip towards ra/dec."""
+        buffers = spike_buffers(np.array([0.0, 90.0, 0.0]), np.array([0.0, 0.0, 90.0]), np.array([3000, 5500, 9000]))
+
+        np.testing.assert_array_equal(buffers['edges'], [[0, 1], [2, 3], [4, 5]])
+        np.testing.assert_array_equal(buffers['vertices'][::2], np.zeros((3, 3)))
+        np.testing.assert_allclose(np.abs(buffers['vertices'][1::2]), np.eye(3), atol=1e-6)
+        assert buffers['vertices'].dtype == np.float32 and buffers['edges'].dtype == np.uint32
+
+    def test_colors_per_vertex(self):
+        """Test that both ends of a spike carry the opaque host star colour."""
+        teff = np.array([3000, 9000])
+        colors = spike_buffers(np.zeros(2), np.zeros(2), teff)['colors']
+
+        np.testing.assert_array_equal(colors[:, :3], np.repeat(teff_to_rgb(teff), 2, axis=0))
+        assert (colors[:, 3] == 255).all()
+
+    def test_lengths_log_scaled(self):
+        """Test that lengths span the shortest fraction to the radius by order of magnitude, missing shortest."""
+        lengths = spike_lengths(np.array([10.0, 100.0, 1000.0, np.nan]), radius=2.0)
+
+        np.testing.assert_allclose(lengths, [0.4, 1.2, 2.0, 0.4], rtol=1e-6)
+
+
+class TestGenerateSpikeBall:
+    """Test suite for spike balls from an archive table."""
+
+    def test_one_spike_per_system(self, planets, tmp_path):
+        """Test that systems get one spike each and the buffers round trip through npz."""
+        planets.to_csv(tmp_path / "input.csv", index=False)
+        buffers = generate_spike_ball(str(tmp_path / "input.csv"), str(tmp_path / "spikes.npz"))
+        loaded = load_spike_ball(str(tmp_path / "spikes.npz"))
+
+        assert len(buffers['edges']) == 3
+        for name in ('vertices', 'edges', 'colors'):
+            np.testing.assert_array_equal(loaded[name], buffers[name])
+
+    def test_per_planet_spikes(self, planets, tmp_path):
+        """Test that per planet spikes keep every planet with a host position, scaled by a column."""
+        planets.to_csv(tmp_path / "input.csv", index=False)
+        buffers = generate_spike_ball(str(tmp_path / "input.csv"), str(tmp_path / "spikes.npz"), per_planet=True,
+                                      length_by='pl_rade')
+
+        tips = buffers['vertices'][1::2]
+        assert len(buffers['edges']) == 4
+        np.testing.assert_allclose(tips[:2, 1:], 0.0, atol=1e-6)
+        assert np.linalg.norm(tips[1]) == pytest.approx(1.0)
+        assert np.linalg.norm(tips[0]) < np.linalg.norm(tips[1])
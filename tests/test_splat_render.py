@@ -0,0 +1,128 @@
+import json
+import os
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.splat_render import (
+    DOT_FLOOR,
+    add_glow,
+    camera_frames,
+    generate_splat,
+    project,
+    render_path,
+    splat_frame,
+    star_colors,
+    tone_map,
+)
+from exo_planet.scale_transform_data import convert_scale_clean_df, save_output
+
+
+@pytest.fixture
+def camera_path():
+    """Fixture providing a camera dollying along +x while looking down +x."""
+    return {
+        "fov": 90,
+        "aspect": 2.0,
+        "keyframes": [
+            {"frame": 1, "position": [0.0, 0.0, 0.0], "target": [1.0, 0.0, 0.0]},
+            {"frame": 6, "position": [5.0, 0.0, 0.0], "target": [6.0, 0.0, 0.0]},
+        ]
+    }
+
+
+@pytest.fixture
+def scene(camera_path):
+    """Fixture of a few stars ahead of and one behind the camera."""
+    points = np.array([[20.0, 0.0, 0.0], [20.0, 5.0, 3.0], [30.0, -8.0, -2.0], [-10.0, 0.0, 0.0]])
+    return {
+        "points": points,
+        "radii": np.array([0.01, 1.0, 0.5, 1.0]),
+        "colors": star_colors(np.array([5800.0, 3000.0, 10000.0, 5800.0])),
+        "camera_path": camera_path,
+    }
+
+
+class TestProjection:
+    """Test suite for the batched camera projection."""
+
+    def test_camera_space(self, camera_path):
+        """Test that points land on the right, up and forward axes of each frame's camera."""
+        positions, rotations, tan_half = camera_frames(camera_path, [1, 6])
+        camera_space = project(np.array([[10.0, -2.0, 3.0]]), positions, rotations)
+
+        np.testing.assert_allclose(camera_space[:, 0], [[2.0, 3.0, 10.0], [2.0, 3.0, 5.0]], atol=1e-12)
+        np.testing.assert_allclose(tan_half, [1.0, 1.0])
+
+    def test_star_ahead_lands_in_centre(self):
+        """Test that a star on the view axis lights the centre pixel and one behind lights nothing."""
+        colors = np.ones((2, 3), dtype=np.float32)
+        image = splat_frame(np.array([[0.0, 0.0, 10.0], [0.0, 0.0, -10.0]]), np.array([0.001, 5.0]), colors,
+                            focal=50.0, width=101, height=51)
+
+        assert image.shape == (51, 101, 3)
+        np.testing.assert_allclose(image[25, 50], DOT_FLOOR)
+        assert image.sum() == pytest.approx(3 * DOT_FLOOR)
+
+    def test_near_star_is_a_disk(self):
+        """Test that a star with a projected radius of several pixels covers a disk of pixels."""
+        image = splat_frame(np.array([[0.0, 0.0, 10.0]]), np.array([1.0]), np.ones((1, 3), dtype=np.float32),
+                            focal=30.0, width=41, height=41)
+
+        lit = image[:, :, 0] > 0
+        assert lit[20, 17] and lit[20, 23] and lit[17, 20] and lit[23, 20]
+        assert not lit[20, 10] and not lit[16, 16]
+
+
+class TestImage:
+    """Test suite for glow and tone mapping."""
+
+    def test_glow_keeps_light(self):
+        """Test that the glow spreads light around without creating or losing any away from the edges."""
+        image = np.zeros((41, 41, 3))
+        image[20, 20] = 1.0
+        glowing = add_glow(image, strength=2.0)
+
+        assert glowing.sum() == pytest.approx(3 * image.sum())
+        assert glowing[20, 25, 0] > 0 and glowing[20, 20, 0] > 1.0
+
+    def test_tone_map(self):
+        """Test that no light is black and more light is brighter, saturating at white."""
+        result = tone_map(np.array([0.0, 0.1, 1.0, 1e6]), exposure=1.0)
+
+        assert result.tolist()[0] == 0 and result.tolist()[-1] == 255
+        assert (np.diff(result.astype(int)) > 0).all()
+
+
+class TestRenderPath:
+    """Test suite for rendering frame ranges."""
+
+    def test_pool_matches_single_process(self, scene, tmp_path):
+        """Test that frames rendered across workers are identical to a single process render."""
+        single = render_path(scene, str(tmp_path / "single"), 64, 32, workers=1)
+        pooled = render_path(scene, str(tmp_path / "pooled"), 64, 32, workers=2)
+
+        assert [os.path.basename(name) for name in single] == [f"frame_{i:05d}.png" for i in range(1, 7)]
+        assert [os.path.basename(name) for name in pooled] == [os.path.basename(name) for name in single]
+        for a, b in zip(single, pooled):
+            assert open(a, "rb").read() == open(b, "rb").read()
+
+    def test_generate_from_output(self, camera_path, tmp_path):
+        """Test a frame range rendered from csv pipeline output."""
+        df = pd.DataFrame({
+            'ra': [0.0, 10.0, 350.0],
+            'dec': [0.0, 5.0, -5.0],
+            'sy_dist': [10.0, 20.0, 30.0],
+            'pl_rade': [1.0, 1.5, 2.0],
+            'st_rad': [1.0, 2.0, 5.0],
+            'st_teff': [3000, 5500, 6000],
+        })
+        save_output(convert_scale_clean_df(df, scale_factor=100), str(tmp_path / "output.csv"))
+        with open(tmp_path / "camera.json", "w") as file:
+            json.dump(camera_path, file)
+
+        filenames = generate_splat(str(tmp_path / "output.csv"), str(tmp_path / "camera.json"), str(tmp_path / "frames"),
+                                   width=32, frames=(2, 3), workers=1)
+
+        assert [os.path.basename(name) for name in filenames] == ["frame_00002.png", "frame_00003.png"]
+        assert all(os.path.getsize(name) > 0 for name in filenames)
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.star_color import blackbody_lut, blackbody_rgb, srgb_encode, teff_to_rgb, TEFF_RANGE
+from exo_planet.scale_transform_data import convert_scale_clean_df
+
+
+class TestBlackbodyLut:
+    """Test suite for the cached temperature to colour table."""
+
+    def test_lut_computed_once(self):
+        """Test that repeated lookups share one table."""
+        assert blackbody_lut() is blackbody_lut()
+
+    def test_lut_covers_range(self):
+        """Test that the table spans the clamped temperature range with colours in [0, 1]."""
+        temperatures, colors = blackbody_lut()
+
+        assert temperatures[0] == TEFF_RANGE[0] and temperatures[-1] >= TEFF_RANGE[1]
+        assert colors.shape == (len(temperatures), 3)
+        assert colors.min() >= 0 and colors.max() <= 1
+
+    def test_lut_read_only(self):
+        """Test that callers cannot corrupt the shared table."""
+        _, colors = blackbody_lut()
+
+        with pytest.raises(ValueError):
+            colors[0, 0] = 0.5
+
+
+class TestTeffToRgb:
+    """Test suite for colouring stars by temperature."""
+
+    def test_cool_stars_red_hot_stars_blue(self):
+        """Test the familiar red to white to blue progression."""
+        cool, sun, hot = teff_to_rgb([3000, 5800, 15000]).astype(int)
+
+        assert cool[0] > cool[1] > cool[2]
+        assert sun.min() > 220
+        assert hot[2] > hot[1] > hot[0]
+
+    def test_matches_direct_computation(self):
+        """Test that interpolating the table stays within one step of computing the colour directly."""
+        teff = np.array([2750.0, 4321.0, 6543.0, 12345.0])
+
+        direct = np.rint(srgb_encode(blackbody_rgb(teff)) * 255)
+
+        np.testing.assert_allclose(teff_to_rgb(teff), direct, atol=1)
+
+    def test_out_of_range_clamped(self):
+        """Test that temperatures outside the table take its end colours."""
+        result = teff_to_rgb([10.0, 1e6])
+
+        np.testing.assert_array_equal(result, teff_to_rgb(list(TEFF_RANGE)))
+
+    def test_pipeline_writes_uint8_colour_columns(self):
+        """Test that the transform stage adds one byte per colour channel."""
+        df = pd.DataFrame({
+            'ra': [0.0, 90.0], 'dec': [0.0, 0.0], 'sy_dist': [10.0, 20.0],
+            'pl_rade': [1.0, 2.0], 'st_rad': [1.0, 2.0], 'st_teff': [3000, 10000]
+        })
+
+        result = convert_scale_clean_df(df)
+
+        assert all(result[col].dtype == np.uint8 for col in ['color_r', 'color_g', 'color_b'])
+        np.testing.assert_array_equal(result[['color_r', 'color_g', 'color_b']], teff_to_rgb([3000, 10000]))
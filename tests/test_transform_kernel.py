@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from exo_planet.transform_kernel import spherical_to_cartesian
+from exo_planet.scale_transform_data import convert_scale_clean_df, linear_scale, SCALE_FACTOR_CONST
+
+
+@pytest.fixture
+def sky():
+    """Fixture providing random sky positions and distances."""
+    rng = np.random.default_rng(7)
+    n = 1000
+    return rng.uniform(0, 360, n), rng.uniform(-90, 90, n), rng.uniform(1, 5000, n)
+
+
+def reference_cart(ra, dec, dist):
+    """The original pandas-era formula."""
+    return np.array([
+        dist * np.cos(np.deg2rad(dec)) * np.cos(np.deg2rad(ra)),
+        dist * np.cos(np.deg2rad(dec)) * np.sin(np.deg2rad(ra)),
+        dist * np.sin(np.deg2rad(dec)),
+    ])
+
+
+class TestSphericalToCartesian:
+    """Test suite for the coordinate transform kernel."""
+
+    def test_matches_reference_formula_exactly(self, sky):
+        """Test that float64 results are bit for bit those of the original formula."""
+        result = spherical_to_cartesian(*sky)
+
+        np.testing.assert_array_equal(result, reference_cart(*sky))
+
+    def test_rows_are_contiguous(self, sky):
+        """Test that each axis is a contiguous array."""
+        x, y, z = spherical_to_cartesian(*sky)
+
+        assert x.flags.c_contiguous and y.flags.c_contiguous and z.flags.c_contiguous
+
+    def test_float32_mode(self, sky):
+        """Test that float32 output stays close to the float64 result."""
+        result = spherical_to_cartesian(*sky, dtype=np.float32)
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, reference_cart(*sky), rtol=1e-5, atol=1e-2)
+
+    def test_writes_into_preallocated_output(self, sky):
+        """Test that a given output buffer is filled and returned."""
+        out = np.empty((3, len(sky[0])))
+
+        result = spherical_to_cartesian(*sky, out=out)
+
+        assert result is out
+        np.testing.assert_array_equal(out, reference_cart(*sky))
+
+    def test_distance_scaled_in_same_pass(self, sky):
+        """Test that dist_bounds gives the same result as linear_scale first."""
+        ra, dec, dist = sky
+        bounds = (dist.min(), dist.max())
+        scaled_dist = np.empty(len(dist))
+
+        result = spherical_to_cartesian(ra, dec, dist, dist_bounds=bounds, scaler=SCALE_FACTOR_CONST, scaled_dist_out=scaled_dist)
+
+        expected_dist = linear_scale(pd.DataFrame({'d': dist}), 'd', SCALE_FACTOR_CONST)['d'].to_numpy()
+        np.testing.assert_array_equal(scaled_dist, expected_dist)
+        np.testing.assert_array_equal(result, reference_cart(ra, dec, expected_dist))
+
+    def test_empty_input(self):
+        """Test that empty input gives an empty result."""
+        result = spherical_to_cartesian(np.empty(0), np.empty(0), np.empty(0))
+
+        assert result.shape == (3, 0)
+
+
+class TestFloat32Pipeline:
+    """Test suite for the float32 option of the pipeline."""
+
+    def test_float32_coordinates(self, sky):
+        """Test that float32 mode stores coordinates and scaled distance as float32."""
+        ra, dec, dist = sky
+        df = pd.DataFrame({'ra': ra, 'dec': dec, 'sy_dist': dist, 'pl_rade': 1.0, 'st_rad': 1.0 + dist / 100, 'st_teff': 5000.0})
+
+        result = convert_scale_clean_df(df, dtype=np.float32)
+
+        assert all(result[col].dtype == np.float32 for col in ['x', 'y', 'z', 'sy_dist'])
+        np.testing.assert_allclose(result['x'], convert_scale_clean_df(df)['x'], rtol=1e-4, atol=1e-1)